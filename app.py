@@ -1,17 +1,49 @@
+import logging
+import threading
 from dotenv import load_dotenv
 import gradio as gr
-from app import current_picks, welcome, evaluation,current_passes
-load_dotenv() 
+from src.clients.sqllite import SQLiteClient
+from src.clients.migrations import migrate
+from app import current_picks, welcome, evaluation,current_passes, performance
+load_dotenv()
+
+# Events of each group running at once; the rest wait in the queue. The handlers are async and
+# hand their blocking I/O to a bounded executor (src/utils/blocking.py), so a slow group only
+# holds up its own viewers
+CONCURRENCY_LIMITS = {
+    "latest_run": 32,  # picks and passes tables, served from memory
+    "quotes": 16,  # ticker details and prices from the quote service
+    "evaluation": 8,  # daily aggregates and charts, rebuilt only after evaluate() writes
+    "performance": 2,  # run metrics
+}
+# Requests waiting in the queue beyond which new ones are turned away
+QUEUE_MAX_SIZE = 256
+
+def warm_caches():
+    """Upgrades the database and preloads each tab's data, off the request path."""
+    try:
+        migrate(SQLiteClient())
+    except Exception as e:
+        logging.getLogger(__name__).error(f"Error upgrading the database: {e}")
+    for tab in (current_picks, current_passes, evaluation):
+        try:
+            tab.warm()
+        except Exception as e:
+            logging.getLogger(__name__).error(f"Error warming {tab.__name__}: {e}")
 
 def create_gradio_interface():
+    # Tabs load their data when first viewed; nothing here waits on the database or the network
     with gr.Blocks() as demo:
         with gr.Tabs():
             welcome.create_tab(),
-            current_picks.create_tab(),
-            current_passes.create_tab(),
-            evaluation.create_tab(),
+            current_picks.create_tab(CONCURRENCY_LIMITS),
+            current_passes.create_tab(CONCURRENCY_LIMITS),
+            evaluation.create_tab(CONCURRENCY_LIMITS),
+            performance.create_tab(CONCURRENCY_LIMITS),
+    demo.queue(max_size=QUEUE_MAX_SIZE)
+    threading.Thread(target=warm_caches, name="warm-caches", daemon=True).start()
     return demo
 
 if __name__ == "__main__":
     demo = create_gradio_interface() # Create the interface
-    demo.launch() # Launch the interface
\ No newline at end of file
+    demo.launch() # Launch the interface
@@ -1,139 +1,153 @@
-from src.clients.sqllite import SQLiteClient
+from src.clients.sqllite import get_app_client
+from src.clients.benchmark_store import BenchmarkStore
+from src.clients.daily_performance import get_daily_performance, ROLLING_WIN_RATE_DATES
+from src.utils.blocking import run_blocking
+from src.utils.lazy import lazy_singleton
 import gradio as gr
 import pandas as pd
-import plotly.express as px
-import yfinance as yf
-from datetime import datetime, timedelta
-
-# Example query - replace with your actual query
-quadrant_query = """
-SELECT
-    ticker,
-    action,
-    evaluation,
-    percent_change,
-    record_date as date,
-    count(ticker) as value
-FROM
-    data
-WHERE
-    (evaluation is not NULL OR percent_change is not NULL)
-GROUP BY
-    ticker,record_date
-ORDER BY
-    record_date desc;
-"""
-
-client = SQLiteClient("main.db")
+
+# Columns of the daily performance table, as shown in the tab
+TABLE_COLUMNS = {
+    "record_date": "date",
+    "picks": "picks",
+    "wins": "wins",
+    "buys": "BUY picks",
+    "buy_return": "BUY return %",
+    "sp500_change": "S&P 500 %",
+    "cumulative_return": "cumulative %",
+    "sp500_cumulative_return": "S&P 500 cumulative %",
+    "rolling_win_rate": f"win rate % (last {ROLLING_WIN_RATE_DATES} dates)",
+}
+
+# Outputs of the last successful load, shown when a refresh times out
+_last_result = None
+# (aggregates hash, pie chart, cumulative chart); the charts only change when evaluate() writes
+_charts = None
+
+@lazy_singleton
+def get_benchmark_store():
+    """The tab's S&P 500 store, created on first use so that importing or building the tab touches no database."""
+    return BenchmarkStore(get_app_client())
 
 def get_sp500_return(start_date, end_date):
     """
-    Get S&P 500 return between two dates by only fetching those specific dates.
-    Includes retry logic for market closed days, looking backwards.
+    Get S&P 500 return between two dates from the local benchmark price store.
+    Market closed days fall back to the previous session.
     """
     try:
-        # Convert strings to datetime objects
-        start = pd.to_datetime(start_date)
-        end = pd.to_datetime(end_date)
-        
-        # Download start date (try up to 5 business days before)
-        for i in range(5):
-            start_check = start - timedelta(days=i)
-            start_data = yf.download(
-                "^GSPC",
-                start=start_check.strftime('%Y-%m-%d'),
-                end=(start_check + timedelta(days=1)).strftime('%Y-%m-%d'),
-                progress=False,
-                auto_adjust=True
-            )
-            if not start_data.empty:
-                start_price = float(start_data['Close'].iloc[0])
-                break
-        else:
-            return "No start date data available"
-
-        # Download end date (try up to 5 business days before)
-        for i in range(5):
-            end_check = end - timedelta(days=i)
-            end_data = yf.download(
-                "^GSPC",
-                start=end_check.strftime('%Y-%m-%d'),
-                end=(end_check + timedelta(days=1)).strftime('%Y-%m-%d'),
-                progress=False,
-                auto_adjust=True
-            )
-            if not end_data.empty:
-                end_price = float(end_data['Close'].iloc[0])
-                break
-        else:
-            return "No end date data available"
-
-        # Calculate return
-        sp500_change = ((end_price - start_price) / start_price) * 100
+        benchmark_store = get_benchmark_store()
+        benchmark_store.ensure(start_date, end_date)
+        sp500_change = benchmark_store.return_between(start_date, end_date)
+        if sp500_change is None:
+            return "No S&P 500 data available"
         return f"{sp500_change:.2f}%"
 
     except Exception as e:
         print(f"S&P 500 Error details: {e}")
         return "Error fetching S&P 500 data"
 
-def create_tab():
-    with gr.TabItem("Evaluation"):
-        with gr.Row():
-            refresh_button = gr.Button("Refresh Data")
-        with gr.Row():
-            output_table = gr.DataFrame()
-            plot_output = gr.Plot()
-        with gr.Row():
-            percent_change_display = gr.Textbox(label="Wanderer AI Return")
-            sp500_change_display = gr.Textbox(label="S&P 500 Return")
-
-        def refresh_data():
-            try:
-                results = client.query(quadrant_query)
-                df = pd.DataFrame(results) if isinstance(results, list) else results
-                # Filter for "buy" actions
-                buy_df = df[df['action'] == 'BUY']
+def load_data():
+    """
+    Daily performance table, evaluation pie chart, cumulative return chart, summed BUY return and
+    S&P 500 return, all from the daily aggregates that evaluate() maintains.
+    """
+    global _last_result
 
-                # Calculate total percent change for buy actions only
-                total_percent_change = buy_df['percent_change'].astype(float).sum()
+    try:
+        daily = get_daily_performance().daily()
+        if daily is None or daily.empty:
+            return pd.DataFrame({"Message": ["No evaluated picks yet"]}), None, None, "", ""
+        counts = get_daily_performance().evaluation_counts()
 
-                # Create pie chart
-                fig = px.pie(df, values='value', names='evaluation', title='Distribution by evaluation')
+        # Sum of the BUY picks' percent changes: each day's mean return times its BUY picks
+        total_percent_change = (daily['buy_return'].fillna(0) * daily['buys']).sum()
 
-                # Prepare table data
-                table_df = df.drop('value', axis=1)
+        # Get date range
+        min_date = daily['record_date'].iloc[0]
+        max_date = daily['record_date'].iloc[-1]
 
-                # Get date range
-                dates = pd.to_datetime(df['date'])
-                min_date = dates.min().strftime('%Y-%m-%d')
-                max_date = dates.max().strftime('%Y-%m-%d')
+        fig, cumulative_fig = charts(daily, counts)
 
-                # Update plot title
-                fig.update_layout(title_text=f'Distribution by evaluation ({min_date} to {max_date})')
+        # Newest dates first
+        table_df = daily[list(TABLE_COLUMNS)].iloc[::-1].round(2).rename(columns=TABLE_COLUMNS)
 
-                # Get S&P 500 return using optimized function
-                sp500_change_str = get_sp500_return(min_date, max_date)
+        # Get S&P 500 return using optimized function
+        sp500_change_str = get_sp500_return(min_date, max_date)
 
-                return (
-                    table_df,
-                    fig,
-                    f"{total_percent_change:.2f}%",
-                    sp500_change_str
-                )
+        _last_result = (
+            table_df,
+            fig,
+            cumulative_fig,
+            f"{total_percent_change:.2f}%",
+            sp500_change_str
+        )
+        return _last_result
 
-            except Exception as e:
-                print(f"Error: {e}")
-                return pd.DataFrame({"Error": [str(e)]}), None, "Error", "Error"
+    except Exception as e:
+        print(f"Error: {e}")
+        return pd.DataFrame({"Error": [str(e)]}), None, None, "Error", "Error"
+
+def charts(daily, counts):
+    """Evaluation pie chart and cumulative return chart, rebuilt only when the aggregates have changed."""
+    global _charts
+    import plotly.express as px  # Only needed once the tab is viewed
+
+    key = tuple(int(pd.util.hash_pandas_object(df, index=False).sum()) for df in (daily, counts))
+    if _charts is not None and _charts[0] == key:
+        return _charts[1], _charts[2]
+
+    min_date = daily['record_date'].iloc[0]
+    max_date = daily['record_date'].iloc[-1]
+    fig = px.pie(counts, values='picks', names='evaluation', title=f'Distribution by evaluation ({min_date} to {max_date})')
+
+    # Equal-weight BUY picks of each day against the S&P 500 over the same sessions, compounded
+    cumulative = daily.rename(columns={"cumulative_return": "Wanderer AI (BUY)", "sp500_cumulative_return": "S&P 500"})
+    cumulative_fig = px.line(
+        cumulative, x='record_date', y=["Wanderer AI (BUY)", "S&P 500"],
+        title='Cumulative return (%)', labels={"record_date": "date", "value": "%", "variable": ""},
+    )
+    _charts = (key, fig, cumulative_fig)
+    return fig, cumulative_fig
+
+async def refresh_data():
+    """load_data() off the event loop; when it is slow, the last results (or what is on screen) stay up."""
+    try:
+        return await run_blocking(load_data)
+    except TimeoutError:
+        return _last_result or (gr.skip(),) * 5
+
+def warm():
+    """Reads the tab's aggregates and fetches its S&P 500 range ahead of the first view."""
+    load_data()
+
+def create_tab(concurrency_limits=None):
+    """`concurrency_limits` maps the tab's concurrency group (evaluation) to its limit."""
+    limits = concurrency_limits or {}
+    with gr.TabItem("Evaluation") as tab:
+        with gr.Row():
+            refresh_button = gr.Button("Refresh Data")
+        with gr.Row():
+            output_table = gr.DataFrame()
+            plot_output = gr.Plot()
+        with gr.Row():
+            cumulative_plot = gr.Plot()
+        with gr.Row():
+            percent_change_display = gr.Textbox(label="Wanderer AI Return")
+            sp500_change_display = gr.Textbox(label="S&P 500 Return")
 
-        # Initialize the display
-        initial_df, initial_plot, initial_percent_change, initial_sp500_change = refresh_data()
-        output_table.value = initial_df
-        plot_output.value = initial_plot
-        percent_change_display.value = initial_percent_change
-        sp500_change_display.value = initial_sp500_change
+        # Load the data when the tab is selected rather than while the app starts
+        tab.select(
+            fn=refresh_data,
+            outputs=[output_table, plot_output, cumulative_plot, percent_change_display, sp500_change_display],
+            api_name="evaluation",
+            concurrency_id="evaluation",
+            concurrency_limit=limits.get("evaluation", "default"),
+        )
 
         # Set up refresh button callback
         refresh_button.click(
             fn=refresh_data,
-            outputs=[output_table, plot_output, percent_change_display, sp500_change_display]
+            outputs=[output_table, plot_output, cumulative_plot, percent_change_display, sp500_change_display],
+            concurrency_id="evaluation",
+            concurrency_limit=limits.get("evaluation", "default"),
         )
\ No newline at end of file
@@ -0,0 +1,121 @@
+from src.clients.latest_run import get_latest_run
+import gradio as gr
+import pandas as pd
+from src.clients.quote_service import get_quote_service
+from src.utils.blocking import run_blocking
+
+def warm(action):
+    """Loads the latest run and prefetches the prices of its `action` tickers, so the first view of the tab is served from memory."""
+    get_quote_service().watch(get_latest_run().tickers(action), group=action)
+
+def create_tab(action, title, table_label, api_name, concurrency_limits=None):
+    """
+    Tab listing the latest run's tickers given `action`, with each ticker's price, action and
+    explanation. Its events are exposed as `api_name` (the table) and `<api_name>_details`;
+    `concurrency_limits` maps the tab's concurrency groups (latest_run, quotes) to their limits.
+    """
+    limits = concurrency_limits or {}
+    with gr.TabItem(title) as tab:
+        with gr.Row():
+            # Left column (1/3 width)
+            with gr.Column(scale=1):
+                refresh_button = gr.Button("Refresh Data")
+                output_table = gr.DataFrame(label=table_label)
+                
+                def refresh_table():
+                    try:
+                        tickers = get_latest_run().tickers(action)
+                        # Prices of the listed tickers are fetched ahead of the dropdown, in one request
+                        get_quote_service().watch(tickers, group=action)
+                        return pd.DataFrame({"ticker": tickers})
+                    except Exception as e:
+                        print(f"Error executing query: {e}")
+                        return pd.DataFrame({"Error": [str(e)]})
+
+                # Choices are filled in when the tab is first viewed
+                ticker_dropdown = gr.Dropdown(
+                    choices=["select ticker"],
+                    label="Select a Ticker",
+                    value="select ticker"
+                )
+            
+            # Right column (2/3 width)
+            with gr.Column(scale=2):
+                date_text = gr.Textbox(label="Date of pick")
+                price_text = gr.Textbox(label="Current Price (Provided by Yahoo Finance)")
+                action_text = gr.Textbox(label="Action (Generated by LLM)")
+                additional_data_text = gr.Textbox(label="Explanation (Generated by LLM)")
+
+        async def get_stock_price_and_data(selected_ticker):
+            if selected_ticker == "select ticker":
+                return "", "Please select a ticker", "", "Please select a ticker from the dropdown."
+            
+            try:
+                # Get stock price (today's price so far, or the last close), from memory once prefetched
+                try:
+                    current_price = await run_blocking(lambda: get_quote_service().get(selected_ticker))
+                except TimeoutError:
+                    # Yahoo is slow: show the last price fetched, if any, while the fetch completes in the background
+                    current_price = get_quote_service().cached(selected_ticker)
+                if current_price is None:
+                    current_price = 'Price not available'
+                
+                price_display = f"${current_price:.2f}" if isinstance(current_price, (float, int)) else str(current_price)
+                
+                # Get explanation and action from the latest run snapshot
+                latest = await run_blocking(lambda: get_latest_run().get(selected_ticker))
+                
+                explanation_text = ""
+                action_text = ""
+                date_text = ""
+                if latest is not None:
+                    date_text = latest['record_date']
+                    explanation_text = latest['explanation']
+                    action_text = latest['action']
+                else:
+                    date_text = "No date found"
+                    explanation_text = "No explanation found for this ticker for the most recent date." # More specific message
+                    action_text = "No action found for this ticker for the most recent date."
+                
+                return date_text, price_display, action_text, explanation_text
+                
+            except Exception as e:
+                print(f"Error fetching data: {e}")
+                return "", "Error fetching price", "", f"Error: {e}"
+
+        # Function to update dropdown choices
+        async def update_dropdown_choices():
+            try:
+                df = await run_blocking(refresh_table)
+            except TimeoutError:
+                # Keep showing the current table and choices rather than hang the tab
+                return gr.skip(), gr.skip()
+            choices = ["select ticker"] + df['ticker'].tolist() if not df.empty and 'ticker' in df.columns else ["select ticker"]
+            return df, gr.Dropdown(choices=choices) # Return the updated dropdown
+
+        # Load the table and dropdown when the tab is selected rather than while the app starts
+        tab.select(
+            fn=update_dropdown_choices,
+            outputs=[output_table, ticker_dropdown],
+            api_name=api_name,
+            concurrency_id="latest_run",
+            concurrency_limit=limits.get("latest_run", "default"),
+        )
+
+        # Connect the refresh button to update both table and dropdown
+        refresh_button.click(
+            fn=update_dropdown_choices,
+            outputs=[output_table, ticker_dropdown], # Output the dropdown
+            concurrency_id="latest_run",
+            concurrency_limit=limits.get("latest_run", "default"),
+        )
+
+        # Connect the ticker dropdown to update both price, explanation, and action
+        ticker_dropdown.change(
+            fn=get_stock_price_and_data,
+            inputs=ticker_dropdown,
+            outputs=[date_text, price_text, action_text, additional_data_text],
+            api_name=f"{api_name}_details",
+            concurrency_id="quotes",
+            concurrency_limit=limits.get("quotes", "default"),
+        )
\ No newline at end of file
@@ -0,0 +1,68 @@
+from src.clients.sqllite import get_app_client
+from src.utils.blocking import run_blocking
+import gradio as gr
+import pandas as pd
+
+# Per-stage totals of the most recent run of each job (identify, evaluate)
+last_run_query = """
+SELECT
+    m.run_name AS run,
+    MIN(m.started_at) AS started_at,
+    m.stage,
+    COUNT(*) AS calls,
+    ROUND(SUM(m.duration_ms) / 1000, 2) AS total_seconds,
+    ROUND(MAX(m.duration_ms), 1) AS max_ms,
+    SUM(m.tokens_in) AS tokens_in,
+    SUM(m.tokens_out) AS tokens_out,
+    SUM(m.retries) AS retries,
+    SUM(m.cache_hits) AS cache_hits,
+    SUM(m.status != 'ok') AS errors
+FROM
+    run_metrics m
+    JOIN (
+        -- SQLite takes run_id from the row holding MAX(started_at)
+        SELECT run_name, run_id, MAX(started_at)
+        FROM run_metrics
+        WHERE stage = 'run'
+        GROUP BY run_name
+    ) latest ON latest.run_id = m.run_id
+GROUP BY
+    m.run_name, m.stage
+ORDER BY
+    m.run_name, total_seconds DESC;
+"""
+
+
+def create_tab(concurrency_limits=None):
+    """`concurrency_limits` maps the tab's concurrency group (performance) to its limit."""
+    limits = concurrency_limits or {}
+    with gr.TabItem("Performance") as tab:
+        with gr.Row():
+            refresh_button = gr.Button("Refresh Data")
+        with gr.Row():
+            output_table = gr.DataFrame()
+
+        async def refresh_data():
+            try:
+                df = await run_blocking(lambda: get_app_client().query(last_run_query))
+            except TimeoutError:
+                # Keep showing the current table
+                return gr.skip()
+            if df is None or df.empty:
+                return pd.DataFrame({"Message": ["No traced runs yet"]})
+            return df
+
+        tab.select(
+            fn=refresh_data,
+            outputs=[output_table],
+            api_name="performance",
+            concurrency_id="performance",
+            concurrency_limit=limits.get("performance", "default"),
+        )
+
+        refresh_button.click(
+            fn=refresh_data,
+            outputs=[output_table],
+            concurrency_id="performance",
+            concurrency_limit=limits.get("performance", "default"),
+        )
@@ -0,0 +1,72 @@
+"""
+Micro-benchmark for the per-call overhead of zero_shot_agent.invoke_agent.
+
+Uses a stub LLM and a local prompt, so it measures only agent construction and invocation.
+"before" builds a fresh AgentRuntime for every call (LLM, tool binding, graph compile and
+prompt load each time, as invoke_agent used to); "after" reuses one runtime.
+
+Usage:
+    python -m benchmarks.agent_runtime_overhead [--calls 200]
+"""
+import argparse
+import time
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.prompts import ChatPromptTemplate
+from src.agents.zero_shot_agent import AgentRuntime
+
+RESPONSE = '{"explanation": "stub", "sentiment": "NEUTRAL"}'
+
+
+class StubChatModel(FakeListChatModel):
+    """Chat model that answers instantly with a canned JSON response."""
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def invoke(self, messages, config=None, **kwargs):
+        return AIMessage(content=RESPONSE)
+
+
+def stub_llm_factory(model, temperature):
+    return StubChatModel(responses=[RESPONSE])
+
+
+def stub_prompt_loader(prompt_name):
+    return ChatPromptTemplate.from_messages([
+        ("system", "You rate news sentiment for {ticker}."),
+        ("human", "Title: {title}\nSummary: {summary}"),
+    ])
+
+
+def _call(runtime):
+    runtime.invoke(
+        "article_sentiment",
+        {"title": "Shares rise", "summary": "The company beat estimates."},
+        system_variables={"ticker": "NVDA"},
+        model="stub",
+    )
+
+
+def measure(calls, shared):
+    runtime = AgentRuntime(llm_factory=stub_llm_factory, prompt_loader=stub_prompt_loader, use_llm_cache=False)
+    _call(runtime)  # Warm-up: imports and first compile
+    start = time.perf_counter()
+    for _ in range(calls):
+        if not shared:
+            runtime = AgentRuntime(llm_factory=stub_llm_factory, prompt_loader=stub_prompt_loader, use_llm_cache=False)
+        _call(runtime)
+    return (time.perf_counter() - start) / calls * 1000
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+
+    before = measure(args.calls, shared=False)
+    after = measure(args.calls, shared=True)
+    print(f"Per-call overhead over {args.calls} calls (stub LLM):")
+    print(f"  before (build + compile every call): {before:.3f} ms")
+    print(f"  after  (compiled agent reused):      {after:.3f} ms")
+    print(f"  speedup: {before / after:.1f}x")
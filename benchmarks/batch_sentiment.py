@@ -0,0 +1,93 @@
+"""
+Compares per-article sentiment calls with batched sentiment scoring.
+
+Runs src.workflows.sentiment.score_articles against a stub LLM that sleeps for a fixed
+round-trip latency plus a per-token cost, and counts LLM calls and prompt tokens
+(approximated as characters / 4). The single-article path uses a stand-in for the
+hub's article_sentiment prompt; the batch path uses the registry's article_sentiment_batch.
+
+Usage:
+    python -m benchmarks.batch_sentiment [--tickers 20] [--articles 2] [--batch-size 8] [--latency-ms 300]
+"""
+import re
+import json
+import time
+import argparse
+import threading
+from langchain_core.messages import AIMessage
+from langchain_core.prompts import ChatPromptTemplate
+from src.agents import zero_shot_agent
+from src.agents.zero_shot_agent import AgentRuntime
+from src.llm.prompt_registry import get_prompt
+from src.workflows.sentiment import score_articles
+from benchmarks.agent_runtime_overhead import StubChatModel
+
+SINGLE_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", "You are a financial news analyst. Decide whether the news article is POSITIVE, NEGATIVE or NEUTRAL "
+               "for {ticker}'s share price over the next trading day, and explain why in two or three sentences. "
+               "Respond with JSON only, in exactly this format:\n"
+               "```json\n{{\"sentiment\": \"POSITIVE\", \"explanation\": \"...\"}}\n```"),
+    ("human", "Title: {title}\nSummary: {summary}"),
+])
+
+DESCRIPTION = ("Shares of the company moved sharply in early trading after it reported quarterly results "
+               "and updated its full-year guidance, while analysts debated whether the recent rally in the "
+               "sector can continue given higher rates and slowing consumer demand across key markets.")
+
+
+# Simulated model cost: fixed round trip plus prompt processing per token
+LATENCY = {"round_trip": 0.3, "per_token": 0.0002}
+_stats = {"calls": 0, "prompt_tokens": 0}
+_stats_lock = threading.Lock()
+
+
+class CountingStub(StubChatModel):
+    """Stub LLM that answers both sentiment prompts, sleeping to simulate a remote model."""
+
+    def invoke(self, messages, config=None, **kwargs):
+        prompt = "".join(message.content for message in messages)
+        tokens = len(prompt) // 4
+        with _stats_lock:
+            _stats["calls"] += 1
+            _stats["prompt_tokens"] += tokens
+        time.sleep(LATENCY["round_trip"] + tokens * LATENCY["per_token"])
+        count = len(re.findall(r"^Article \d+$", messages[-1].content, re.MULTILINE))
+        if count:
+            results = [{"index": index, "sentiment": "NEUTRAL", "explanation": "stub"} for index in range(1, count + 1)]
+            return AIMessage(content=json.dumps({"results": results}))
+        return AIMessage(content='{"sentiment": "NEUTRAL", "explanation": "stub"}')
+
+
+def prompt_loader(prompt_name):
+    return SINGLE_PROMPT if prompt_name == "article_sentiment" else get_prompt(prompt_name)
+
+
+def run(items, batch_size):
+    zero_shot_agent.runtime = AgentRuntime(llm_factory=lambda model, temperature: CountingStub(responses=[""]), prompt_loader=prompt_loader, use_llm_cache=False)
+    _stats.update(calls=0, prompt_tokens=0)
+    start = time.perf_counter()
+    results = score_articles(items, "stub", 0.1, batch_size=batch_size)
+    elapsed = time.perf_counter() - start
+    assert all(result is not None for result in results)
+    return {**_stats, "seconds": elapsed}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickers", type=int, default=20)
+    parser.add_argument("--articles", type=int, default=2)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=300)
+    args = parser.parse_args()
+    LATENCY["round_trip"] = args.latency_ms / 1000
+
+    items = [
+        (f"TICK{ticker}", {"title": f"TICK{ticker} headline {article}", "description": DESCRIPTION, "link": f"https://example.com/{ticker}/{article}"})
+        for ticker in range(args.tickers) for article in range(args.articles)
+    ]
+    single = run(items, 1)
+    batched = run(items, args.batch_size)
+    print(f"{len(items)} articles, serial calls, {args.latency_ms:.0f} ms stub round trip")
+    print(f"{'':>22}{'calls':>8}{'prompt tokens':>15}{'wall s':>9}")
+    print(f"{'per-article':>22}{single['calls']:>8}{single['prompt_tokens']:>15}{single['seconds']:>9.2f}")
+    print(f"{f'batched (size {args.batch_size})':>22}{batched['calls']:>8}{batched['prompt_tokens']:>15}{batched['seconds']:>9.2f}")
@@ -0,0 +1,112 @@
+"""
+Import-time budget of the cron entry points (identify.py, evaluate.py).
+
+Both check is_us_market_open() first, so on market-closed days (and for --help) they should
+exit without loading the analysis stack. For each entry point this runs, in a fresh interpreter
+with -X importtime, what a market-closed run does: import the script and check the market.
+Reported per entry point (median of --runs):
+
+    import_ms      time spent importing modules, Python's own startup excluded
+    help_ms        wall time of `python <script> --help`, minus a bare `python -c pass`
+    heavy          heavy dependencies (LangChain, pandas, SQLAlchemy, ...) that got imported
+
+An entry point over --budget milliseconds or importing any heavy dependency fails the check:
+the slowest imports are listed and the exit status is 1. tests/test_import_time.py checks only
+that no heavy dependency is imported, since a wall-clock budget is too noisy for a shared CI runner.
+
+Usage:
+    python -m benchmarks.import_time [--budget 100] [--runs 5] [--top 10]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ENTRY_POINTS = ("identify", "evaluate")
+
+# Import time allowed per entry point, in milliseconds
+IMPORT_BUDGET_MS = 100
+
+# Packages that only the work done on market days needs
+HEAVY = ("pandas", "numpy", "sqlalchemy", "langchain", "langchain_core", "langchain_community",
+         "langgraph", "litellm", "yfinance", "gradio", "plotly")
+
+MARKER = "--import-time-start--"
+
+# Imports the entry point and checks the market, as a market-closed run does, then lists heavy packages
+SCRIPT = f"""
+import sys
+sys.stderr.write({MARKER!r} + "\\n")
+import {{module}}
+{{module}}.is_us_market_open()
+print(__import__("json").dumps(sorted(name for name in sys.modules if name in {HEAVY!r})))
+"""
+
+
+def _importtime(module):
+    """Runs SCRIPT for `module`; returns (import lines after startup, heavy packages imported)."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", SCRIPT.format(module=module)],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    lines = result.stderr.split(MARKER, 1)[1].splitlines()
+    imports = []
+    for line in lines:
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if self_us.strip().isdigit():
+            # One space separates the columns; deeper indentation marks nested imports
+            imports.append((name[1:].rstrip(), int(self_us), int(cumulative_us)))
+    return imports, json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def _wall(args):
+    start = time.perf_counter()
+    subprocess.run([sys.executable] + args, cwd=ROOT, capture_output=True, check=True)
+    return time.perf_counter() - start
+
+
+def measure(module, runs, help_timing=True):
+    """Median import time, --help overhead (None without help_timing) and heavy packages of one entry point."""
+    import_ms, help_ms, heavy, imports = [], [], set(), []
+    for _ in range(runs):
+        imports, loaded = _importtime(module)
+        # Top-level lines (no indentation) are the modules imported directly; their cumulative times add up
+        import_ms.append(sum(cumulative for name, _, cumulative in imports if not name.startswith(" ")) / 1000)
+        heavy.update(loaded)
+        if help_timing:
+            help_ms.append((_wall([f"{module}.py", "--help"]) - _wall(["-c", "pass"])) * 1000)
+    return {
+        "entry_point": module,
+        "import_ms": statistics.median(import_ms),
+        "help_ms": statistics.median(help_ms) if help_ms else None,
+        "heavy": sorted(heavy),
+        "slowest": sorted(((name.strip(), self_us / 1000) for name, self_us, _ in imports), key=lambda item: -item[1]),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget", type=float, default=IMPORT_BUDGET_MS, help="Milliseconds of imports allowed per entry point")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports listed for an entry point over budget")
+    args = parser.parse_args()
+
+    failed = False
+    for module in ENTRY_POINTS:
+        result = measure(module, args.runs)
+        over = result["import_ms"] > args.budget or result["heavy"]
+        failed = failed or over
+        print(f"{module:<10} import {result['import_ms']:7.1f}ms  --help {result['help_ms']:7.1f}ms  "
+              f"heavy {', '.join(result['heavy']) or '-'}  {'OVER BUDGET' if over else 'ok'}")
+        if over:
+            for name, self_ms in result["slowest"][:args.top]:
+                print(f"    {self_ms:7.1f}ms  {name}")
+    print(f"budget {args.budget:.0f}ms per entry point, no heavy dependencies before the market check")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,206 @@
+"""
+Load test of the Gradio app: N concurrent viewers clicking through the tabs.
+
+The app runs in a subprocess against a database of --rows stand-in picks, with Yahoo replaced
+by the stand-in cassette (--latency per call, and --slow-fraction of calls taking --slow-latency
+instead, to see how the handlers cope with a stalling Yahoo). Once its caches are warm (or right
+away with --cold), each of --viewers threads runs --sessions sessions of:
+
+    picks tab, a pick's details, passes tab, a pass's details, evaluation tab, performance tab
+
+through Gradio's HTTP API (POST /gradio_api/call/<event>, then its event stream), so every
+request goes through the app's queue like a browser's does, in one session per viewer. The
+viewers use plain HTTP rather than gradio_client, which costs more CPU than the app itself and
+skews results on small machines. Reported per event: requests, errors, p50 and p99 latency
+in milliseconds, and overall requests per second.
+
+Usage:
+    python -m benchmarks.load_test [--viewers 20] [--sessions 5] [--rows 1000] [--latency 0.1]
+        [--slow-fraction 0.05] [--slow-latency 10] [--quote-ttl 5] [--cold] [--root PATH]
+
+--root measures another checkout of the repository (e.g. a git worktree of an older revision).
+"""
+import os
+import sys
+import json
+import time
+import random
+import sqlite3
+import argparse
+import tempfile
+import threading
+import subprocess
+import urllib.request
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# One viewer session, as (API name of the tab's event, argument): a ticker of the given action in the latest run, or nothing
+SESSION = (
+    ("current_picks", None),
+    ("current_picks_details", "BUY"),
+    ("current_passes", None),
+    ("current_passes_details", "HOLD"),
+    ("evaluation", None),
+    ("performance", None),
+)
+
+
+def _serve(root, port, latency, slow_fraction, slow_latency, cold, report):
+    """Child process: starts the app behind the stand-in cassette and reports its API names (once warm unless `cold`)."""
+    sys.path.insert(0, root)
+    os.chdir(root)
+    import runpy
+    from src.utils.cassette import set_cassette
+    from benchmarks.stand_ins import StandInCassette
+
+    rng = random.Random(0)
+    rng_lock = threading.Lock()
+
+    def sleep(seconds):
+        with rng_lock:
+            slow = rng.random() < slow_fraction
+        time.sleep(slow_latency if slow else seconds)
+
+    set_cassette(StandInCassette(latency={"yahoo": latency}, sleep=sleep))
+    demo = runpy.run_path(os.path.join(root, "app.py"), run_name="load_test")["create_gradio_interface"]()
+    demo.launch(server_name="127.0.0.1", server_port=port, prevent_thread_lock=True, quiet=True)
+    for thread in threading.enumerate():
+        if thread.name == "warm-caches" and not cold:
+            thread.join()
+    with open(report, "w") as f:
+        json.dump([block_fn.api_name for block_fn in demo.fns.values()], f)
+    while True:
+        time.sleep(60)
+
+
+def _free_port():
+    import socket
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of `values` (q in 0-100)."""
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, round(q / 100 * len(ordered) + 0.5) - 1))]
+
+
+def call(url, api_name, args, session, timeout=120):
+    """Queues one call of a handler in `session` and reads its event stream until it completes."""
+    request = urllib.request.Request(
+        f"{url}gradio_api/call/{api_name}",
+        data=json.dumps({"data": list(args), "session_hash": session}).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+    )
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        event_id = json.load(response)["event_id"]
+    with urllib.request.urlopen(f"{url}gradio_api/call/{api_name}/{event_id}", timeout=timeout) as response:
+        for line in response:
+            if line.startswith(b"event: complete"):
+                return
+            if line.startswith(b"event: error"):
+                raise RuntimeError(f"{api_name} failed")
+    raise RuntimeError(f"{api_name} did not complete")
+
+
+def run_viewers(url, tickers, viewers, sessions):
+    """Runs the viewers to completion; returns (latencies by handler, errors by handler, seconds)."""
+    latencies, errors = defaultdict(list), defaultdict(int)
+    lock = threading.Lock()
+    start_line = threading.Barrier(viewers)
+
+    def viewer(number):
+        rng = random.Random(number)
+        start_line.wait()
+        for _ in range(sessions):
+            for name, action in SESSION:
+                args = (rng.choice(tickers[action]),) if action else ()
+                start = time.perf_counter()
+                try:
+                    # The session keeps the dropdown choices loaded by the tab, as in a browser
+                    call(url, name, args, f"viewer-{number}")
+                    failed = False
+                except Exception:
+                    failed = True
+                elapsed = time.perf_counter() - start
+                with lock:
+                    latencies[name].append(elapsed)
+                    errors[name] += failed
+
+    threads = [threading.Thread(target=viewer, args=(number,)) for number in range(viewers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors, time.perf_counter() - start
+
+
+def load_test(root, database, args, workdir, timeout=120):
+    port = _free_port()
+    report = os.path.join(workdir, f"load-{port}.json")
+    env = {**os.environ, "SQLITE_DB_PATH": database, "GRADIO_ANALYTICS_ENABLED": "False",
+           "HTTP_CACHE_DISABLED": "1", "ALPHA_VANTAGE_API": "stand-in", "NEWSDATA_API": "stand-in",
+           "QUOTE_TTL_SECONDS": str(args.quote_ttl)}
+    env.pop("CASSETTE_MODE", None)
+    process = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.load_test", "--serve", str(port), "--root", root,
+         "--latency", str(args.latency), "--slow-fraction", str(args.slow_fraction),
+         "--slow-latency", str(args.slow_latency), "--report", report] + (["--cold"] if args.cold else []),
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        start = time.perf_counter()
+        while not os.path.exists(report):
+            if process.poll() is not None:
+                raise RuntimeError(f"The app exited with status {process.returncode}")
+            if time.perf_counter() - start > timeout:
+                raise TimeoutError(f"The app was not ready within {timeout}s")
+            time.sleep(0.1)
+        time.sleep(0.1)
+        with open(report) as f:
+            missing = {name for name, _ in SESSION} - set(json.load(f))
+        if missing:
+            raise RuntimeError(f"The app has no events named {', '.join(sorted(missing))}")
+        with sqlite3.connect(database) as connection:
+            rows = connection.execute("SELECT ticker, action FROM latest_run").fetchall()
+        tickers = {action: [ticker for ticker, row_action in rows if row_action == action] for action in ("BUY", "HOLD")}
+        return run_viewers(f"http://127.0.0.1:{port}/", tickers, args.viewers, args.sessions)
+    finally:
+        process.kill()
+        process.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--viewers", type=int, default=20)
+    parser.add_argument("--sessions", type=int, default=5, help="Sessions per viewer")
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.1, help="Seconds per Yahoo call")
+    parser.add_argument("--slow-fraction", type=float, default=0.05, help="Share of Yahoo calls that stall")
+    parser.add_argument("--slow-latency", type=float, default=10.0, help="Seconds a stalled Yahoo call takes")
+    parser.add_argument("--quote-ttl", type=float, default=5.0, help="QUOTE_TTL_SECONDS of the app")
+    parser.add_argument("--cold", action="store_true", help="Start the viewers without waiting for the cache warm-up")
+    parser.add_argument("--root", default=ROOT)
+    parser.add_argument("--serve", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--report", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        _serve(os.path.abspath(args.root), args.serve, args.latency, args.slow_fraction, args.slow_latency, args.cold, args.report)
+
+    from benchmarks.stand_ins import build_database
+
+    with tempfile.TemporaryDirectory() as workdir:
+        database = build_database(os.path.join(workdir, "load.db"), args.rows)
+        latencies, errors, seconds = load_test(os.path.abspath(args.root), database, args, workdir)
+
+    total = sum(len(values) for values in latencies.values())
+    print(f"{args.viewers} viewers x {args.sessions} sessions: {total} requests in {seconds:.1f}s ({total / seconds:.1f}/s)")
+    print(f"{'event':<42} {'requests':>8} {'errors':>6} {'p50 ms':>8} {'p99 ms':>8}")
+    for name, _ in SESSION:
+        values = latencies.get(name)
+        if values:
+            print(f"{name:<42} {len(values):>8} {errors[name]:>6} {percentile(values, 50) * 1000:>8.0f} {percentile(values, 99) * 1000:>8.0f}")
@@ -0,0 +1,81 @@
+"""
+Measures the near-duplicate index on synthetic news descriptions.
+
+Stores --stored random 60-word descriptions in a temporary SQLite database, then times
+NearDuplicateIndex.assign for --probes syndicated copies (a few words changed) and --probes
+unrelated articles, one batch each as in a pipeline run, and reports how many copies found
+their original's cluster.
+
+Usage:
+    python -m benchmarks.near_duplicates [--stored 50000] [--probes 1000] [--edits 3]
+"""
+import os
+import time
+import random
+import argparse
+import tempfile
+from src.clients.sqllite import SQLiteClient
+from src.clients.duplicate_index import NearDuplicateIndex
+
+VOCABULARY = [f"word{index}" for index in range(5000)]
+
+
+def description(rng, words=60):
+    return " ".join(rng.choice(VOCABULARY) for _ in range(words))
+
+
+def syndicated_copy(rng, text, edits):
+    words = text.split()
+    for _ in range(edits):
+        words[rng.randrange(len(words))] = rng.choice(VOCABULARY)
+    return "Reuters - " + " ".join(words)
+
+
+def run(stored, probes, edits, seed=7):
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory() as directory:
+        client = SQLiteClient(os.path.join(directory, "near_duplicates.db"))
+        originals = [{"article_id": f"a{index}", "description": description(rng)} for index in range(stored)]
+
+        start = time.perf_counter()
+        NearDuplicateIndex(client).assign(originals)
+        index_seconds = time.perf_counter() - start
+
+        # A fresh index loads everything from SQLite, as a new pipeline run would
+        index = NearDuplicateIndex(client)
+        start = time.perf_counter()
+        index.assign([])
+        load_seconds = time.perf_counter() - start
+
+        sampled = rng.sample(originals, probes)
+        copies = [{"article_id": f"c{n}", "description": syndicated_copy(rng, original["description"], edits)} for n, original in enumerate(sampled)]
+        unrelated = [{"article_id": f"u{n}", "description": description(rng)} for n in range(probes)]
+
+        start = time.perf_counter()
+        copy_clusters = index.assign(copies)
+        copy_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        unrelated_clusters = index.assign(unrelated)
+        unrelated_seconds = time.perf_counter() - start
+        client.close()
+
+    return {
+        "stored": stored,
+        "index_ms_per_article": 1000 * index_seconds / stored,
+        "load_seconds": load_seconds,
+        "duplicate_ms_per_article": 1000 * copy_seconds / probes,
+        "new_ms_per_article": 1000 * unrelated_seconds / probes,
+        "duplicates_found": sum(cluster == original["article_id"] for cluster, original in zip(copy_clusters, sampled)) / probes,
+        "false_matches": sum(cluster != article["article_id"] for cluster, article in zip(unrelated_clusters, unrelated)) / probes,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stored", type=int, default=50000)
+    parser.add_argument("--probes", type=int, default=1000)
+    parser.add_argument("--edits", type=int, default=3)
+    args = parser.parse_args()
+
+    for name, value in run(args.stored, args.probes, args.edits).items():
+        print(f"{name:>26}: {value:.4f}" if isinstance(value, float) else f"{name:>26}: {value}")
@@ -0,0 +1,317 @@
+"""
+End-to-end benchmarks of the identify pipeline, the evaluator and the Gradio tab loaders, run
+against the local stand-ins in benchmarks.stand_ins (no network or API keys needed).
+
+Scenarios, each in its own subprocess so peak RSS is measured per scenario:
+    identify:<tickers>  analyze_active_stocks over <tickers> most active tickers (identify.py
+                        settings), then append the results to a 1k-row database
+    evaluate:<rows>     evaluate() on a database of <rows> picks, the latest sessions pending
+    app:<rows>          build each Gradio tab and call its refresh handlers on <rows> picks
+
+For every scenario the JSON output has wall time, time and call count per stage, external
+calls by kind, peak RSS and DB write time. With --baseline, scenarios slower (or bigger) than
+the baseline by more than --threshold are reported and the exit status is 1.
+
+benchmarks/results.json is the reference baseline, measured on one machine: its "revision"
+says which tree it measured. Regenerate it (default settings) with any change to a measured
+path, and compare against it only on comparable hardware.
+
+Usage:
+    python -m benchmarks.run_benchmarks [--tickers 20,200,2000] [--rows 1000,100000,1000000]
+        [--scenarios identify,evaluate,app] [--output benchmarks/results.json]
+        [--baseline previous.json] [--threshold 0.25]
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import inspect
+import shutil
+import logging
+import argparse
+import platform
+import resource
+import tempfile
+import threading
+import subprocess
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Differences below this many seconds are never reported as regressions
+MIN_DELTA_SECONDS = 0.05
+
+STAND_IN_ENV = {
+    "ALPHA_VANTAGE_API": "stand-in",
+    "NEWSDATA_API": "stand-in",
+    "HTTP_CACHE_DISABLED": "1",
+    "LLM_CACHE_BYPASS": "1",
+}
+
+
+class StageTimer:
+    """Wraps functions in place to add up their time and calls per stage (thread-safe); restore() undoes it."""
+
+    def __init__(self):
+        self.stages = {}
+        self._lock = threading.Lock()
+        self._patched = []
+
+    def wrap(self, owner, name, stage):
+        original = getattr(owner, name)
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                self.record(stage, time.perf_counter() - start)
+
+        setattr(owner, name, timed)
+        self._patched.append((owner, name, original))
+
+    def record(self, stage, seconds):
+        with self._lock:
+            entry = self.stages.setdefault(stage, {"calls": 0, "seconds": 0.0})
+            entry["calls"] += 1
+            entry["seconds"] += seconds
+
+    def restore(self):
+        for owner, name, original in reversed(self._patched):
+            setattr(owner, name, original)
+        self._patched = []
+
+
+def _time(timer, stage, fn, *args, **kwargs):
+    start = time.perf_counter()
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        timer.record(stage, time.perf_counter() - start)
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process. ru_maxrss would include the parent's peak on Linux."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _wrap_db(timer):
+    from src.clients.sqllite import SQLiteClient
+    timer.wrap(SQLiteClient, "query", "db_read")
+    timer.wrap(SQLiteClient, "append_df", "db_write")
+    timer.wrap(SQLiteClient, "update_rows", "db_write")
+
+
+def run_identify(tickers, workdir, timer):
+    import identify
+    from src.agents import zero_shot_agent
+    from src.clients.sqllite import SQLiteClient
+    from src.clients.advantage import AlphaVantageClient
+    from src.clients.new_data import NewsDataClient
+    from src.workflows import analze_active_stocks as pipeline
+    from benchmarks.stand_ins import stand_in_runtime, build_database
+
+    zero_shot_agent.runtime = stand_in_runtime()
+    _wrap_db(timer)
+    timer.wrap(AlphaVantageClient, "get_most_active_tickers", "most_active")
+    timer.wrap(AlphaVantageClient, "get_insider_transactions", "insider")
+    timer.wrap(NewsDataClient, "get_ticker_news_summaries", "news")
+    timer.wrap(pipeline, "get_current_day_metrics_bulk", "market_data")
+    timer.wrap(pipeline, "score_articles", "sentiment")
+    timer.wrap(pipeline, "_analyze_ticker", "analyst")
+
+    results = pipeline.analyze_active_stocks(
+        model="stand-in", temperature=identify.TEMPERATURE, max_workers=identify.MAX_WORKERS,
+        sentiment_batch_size=identify.SENTIMENT_BATCH_SIZE,
+    )
+    client = SQLiteClient(build_database(os.path.join(workdir, "identify.db"), 1000))
+    client.append_df(results, "data")
+    return {"results": len(results)}
+
+
+def run_evaluate(rows, workdir, timer):
+    import evaluate
+    from src.clients.sqllite import SQLiteClient
+    from src.workflows import evaluate_picks
+
+    _wrap_db(timer)
+    timer.wrap(evaluate_picks, "fetch_closes", "fetch_closes")
+    timer.wrap(evaluate_picks, "compute_evaluations", "compute_evaluations")
+    client = SQLiteClient()
+    evaluate.evaluate(client)
+    pending = client.query("SELECT COUNT(*) AS pending FROM data WHERE evaluation IS NULL")
+    return {"rows": rows, "still_pending": int(pending["pending"].iloc[0]) if pending is not None else None}
+
+
+def _call_handler(fn, *args):
+    """Calls a Gradio handler, running it to completion if it is a coroutine function."""
+    return asyncio.run(fn(*args)) if inspect.iscoroutinefunction(fn) else fn(*args)
+
+
+def run_app(rows, workdir, timer, repeats=3):
+    import gradio as gr
+    from benchmarks.stand_ins import ticker_names
+
+    _wrap_db(timer)
+    from app import current_picks, current_passes, evaluation, performance
+    handlers = {
+        "current_picks": ["update_dropdown_choices", "get_stock_price_and_data"],
+        "current_passes": ["update_dropdown_choices", "get_stock_price_and_data"],
+        "evaluation": ["refresh_data"],
+        "performance": ["refresh_data"],
+    }
+    tabs = (("current_picks", current_picks), ("current_passes", current_passes), ("evaluation", evaluation),
+            ("performance", performance))
+    for tab, module in tabs:
+        with gr.Blocks() as demo:
+            _time(timer, f"{tab}.build", module.create_tab)
+        fns = {block_fn.name: block_fn.fn for block_fn in demo.fns.values()}
+        for name in handlers[tab]:
+            args = (ticker_names(1)[0],) if name == "get_stock_price_and_data" else ()
+            for _ in range(repeats):
+                _time(timer, f"{tab}.{name}", _call_handler, fns[name], *args)
+    return {"rows": rows}
+
+
+SCENARIOS = {"identify": run_identify, "evaluate": run_evaluate, "app": run_app}
+
+
+def run_scenario(name, scale, workdir):
+    """Runs one scenario in this process (a fresh subprocess) and returns its metrics."""
+    logging.basicConfig(level=logging.WARNING)
+    from src.utils.cassette import set_cassette
+    from benchmarks.stand_ins import StandInCassette
+
+    cassette = StandInCassette(tickers=scale if name == "identify" else 20)
+    set_cassette(cassette)
+    timer = StageTimer()
+    start = time.perf_counter()
+    details = SCENARIOS[name](scale, workdir, timer)
+    wall = time.perf_counter() - start
+    timer.restore()
+    return {
+        "scenario": name,
+        "scale": scale,
+        "wall_seconds": wall,
+        "stages": timer.stages,
+        "external_calls": cassette.stats,
+        "db_write_seconds": timer.stages.get("db_write", {}).get("seconds", 0.0),
+        "peak_rss_mb": peak_rss_mb(),
+        **details,
+    }
+
+
+def _spawn(name, scale, workdir, database=None):
+    env = {**os.environ, **STAND_IN_ENV}
+    env.pop("CASSETTE_MODE", None)
+    if database is not None:
+        copy = os.path.join(workdir, f"{name}-{scale}.db")
+        shutil.copyfile(database, copy)
+        env["SQLITE_DB_PATH"] = copy
+    result_file = os.path.join(workdir, f"{name}-{scale}.json")
+    subprocess.run(
+        [sys.executable, "-m", "benchmarks.run_benchmarks", "--run", f"{name}:{scale}", "--workdir", workdir, "--result-file", result_file],
+        cwd=ROOT, env=env, check=True, stdout=subprocess.DEVNULL,
+    )
+    with open(result_file) as f:
+        return json.load(f)
+
+
+def compare(results, baseline, threshold):
+    """Returns the regressions of `results` against `baseline` as printable lines."""
+    previous = {(entry["scenario"], entry["scale"]): entry for entry in baseline["scenarios"]}
+    regressions = []
+    for entry in results["scenarios"]:
+        old = previous.get((entry["scenario"], entry["scale"]))
+        if old is None:
+            continue
+        metrics = [("wall_seconds", entry["wall_seconds"], old["wall_seconds"])]
+        metrics += [
+            (f"stages.{stage}", values["seconds"], old["stages"][stage]["seconds"])
+            for stage, values in entry["stages"].items() if stage in old["stages"]
+        ]
+        for metric, new_value, old_value in metrics:
+            if new_value > old_value * (1 + threshold) and new_value - old_value > MIN_DELTA_SECONDS:
+                regressions.append(f"{entry['scenario']}:{entry['scale']} {metric}: {old_value:.3f}s -> {new_value:.3f}s")
+        if entry["peak_rss_mb"] > old["peak_rss_mb"] * (1 + threshold):
+            regressions.append(f"{entry['scenario']}:{entry['scale']} peak_rss_mb: {old['peak_rss_mb']:.0f} -> {entry['peak_rss_mb']:.0f}")
+    return regressions
+
+
+def _git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def _scales(value):
+    return [int(part) for part in value.split(",") if part]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickers", type=_scales, default=[20, 200, 2000])
+    parser.add_argument("--rows", type=_scales, default=[1000, 100000, 1000000])
+    parser.add_argument("--scenarios", default="identify,evaluate,app")
+    parser.add_argument("--output", default=os.path.join(ROOT, "benchmarks", "results.json"))
+    parser.add_argument("--baseline")
+    parser.add_argument("--threshold", type=float, default=0.25)
+    parser.add_argument("--run", help=argparse.SUPPRESS)
+    parser.add_argument("--workdir", help=argparse.SUPPRESS)
+    parser.add_argument("--result-file", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        name, scale = args.run.split(":")
+        metrics = run_scenario(name, int(scale), args.workdir)
+        with open(args.result_file, "w") as f:
+            json.dump(metrics, f)
+        sys.exit(0)
+
+    from benchmarks.stand_ins import build_database
+
+    scenarios = [name for name in args.scenarios.split(",") if name]
+    results = {
+        "revision": _git_revision(),
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "scenarios": [],
+    }
+    with tempfile.TemporaryDirectory() as workdir:
+        databases = {}
+        for rows in args.rows if {"evaluate", "app"} & set(scenarios) else []:
+            databases[rows] = build_database(os.path.join(workdir, f"template-{rows}.db"), rows)
+        for name in scenarios:
+            for scale in args.tickers if name == "identify" else args.rows:
+                entry = _spawn(name, scale, workdir, databases.get(scale) if name != "identify" else None)
+                results["scenarios"].append(entry)
+                print(f"{name}:{scale:<8} wall {entry['wall_seconds']:8.2f}s  db write {entry['db_write_seconds']:6.3f}s  "
+                      f"peak RSS {entry['peak_rss_mb']:7.1f} MB  calls {entry['external_calls']}")
+                for stage, values in sorted(entry["stages"].items()):
+                    print(f"    {stage:<40} {values['calls']:>6} calls {values['seconds']:9.3f}s")
+
+    # Read before the results are written, which may replace the baseline file
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write("\n")
+    print(f"Results written to {args.output}")
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,252 @@
+"""
+Local stand-ins for every external dependency, for benchmarks that need no network or API keys.
+
+- StandInCassette answers the HTTP (AlphaVantage, NewsData) and yfinance calls that go
+  through src.utils.cassette with synthetic, deterministic data and a configurable latency.
+- StandInChatModel answers the sentiment, batch sentiment and analyst prompts.
+- build_database writes a main.db-shaped SQLite file (current schema) with any number of picks
+  and the run metrics of the last sessions.
+"""
+import os
+import re
+import json
+import time
+import zlib
+import sqlite3
+import threading
+import numpy as np
+import requests
+import pandas as pd
+from datetime import date, timedelta
+from langchain_core.messages import AIMessage
+from langchain_core.prompts import ChatPromptTemplate
+from src.agents.zero_shot_agent import AgentRuntime
+from src.clients.sqllite import SQLiteClient
+from src.clients.migrations import migrate
+from src.clients.daily_performance import refresh_daily_performance
+from src.llm.prompt_registry import get_prompt
+from src.utils.cassette import Cassette
+from src.utils.trading_calendar import get_calendar
+from benchmarks.agent_runtime_overhead import StubChatModel
+
+# Seconds added to each stand-in call, by kind
+LATENCY = {"http": 0.02, "yahoo": 0.1, "llm": 0.05}
+
+ARTICLES_PER_TICKER = 4
+
+WORDS = ("shares rose fell after the company reported quarterly revenue guidance analysts expect demand "
+         "growth margins investors market sector outlook earnings rates consumer regulators deal").split()
+
+PROMPTS = {
+    "article_sentiment": ChatPromptTemplate.from_messages([
+        ("system", "You are a financial news analyst. Rate the sentiment of the article for {ticker} as "
+                   "POSITIVE, NEGATIVE or NEUTRAL and explain why. Respond with JSON: "
+                   "{{\"sentiment\": \"...\", \"explanation\": \"...\"}}"),
+        ("human", "Title: {title}\nSummary: {summary}"),
+    ]),
+    "finance_analyst": ChatPromptTemplate.from_messages([
+        ("system", "You are a financial analyst. Recommend BUY, HOLD or SELL for the next trading day. "
+                   "Respond with JSON: {{\"action\": \"...\", \"explanation\": \"...\"}}"),
+        ("human", "Ticker: {ticker}\nStock analysis: {stock_analysis}\nRecent news: {recent_news}\n"
+                  "Insider transactions: {insider_transactions}"),
+    ]),
+}
+
+
+def _seed(*parts):
+    return zlib.crc32("|".join(map(str, parts)).encode("utf-8"))
+
+
+def ticker_names(count):
+    return [f"T{index:04d}" for index in range(count)]
+
+
+def description(ticker, index, words=45):
+    rng = np.random.default_rng(_seed(ticker, index))
+    return " ".join(rng.choice(WORDS, size=words))
+
+
+class StandInCassette(Cassette):
+    """
+    Cassette that synthesizes responses instead of replaying a recording. Counts calls per kind
+    and sleeps LATENCY[kind] per call. LLM calls pass through to the (stand-in) chat model.
+    """
+
+    def __init__(self, tickers=20, latency=None, sleep=time.sleep):
+        self.path = None
+        self.mode = "replay"
+        self.latency = dict(LATENCY if latency is None else latency)
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self.tickers = ticker_names(tickers)
+        self.stats = {"http": 0, "yahoo": 0, "llm": 0, "hub": 0}
+
+    def call(self, kind, route, key_parts, fn, encode=None, decode=None):
+        with self._lock:
+            self.stats[kind] = self.stats.get(kind, 0) + 1
+        if self.latency.get(kind):
+            self._sleep(self.latency[kind])
+        if kind == "http":
+            return _json_response(self._http(route, key_parts[1]))
+        if kind == "yahoo":
+            args, kwargs = key_parts
+            return daily_bars(args[0], **kwargs)
+        return fn()
+
+    def _http(self, route, params):
+        if "alphavantage" in route and params.get("function") == "TOP_GAINERS_LOSERS":
+            return {"most_actively_traded": [{"ticker": ticker} for ticker in self.tickers]}
+        if "alphavantage" in route and params.get("function") == "INSIDER_TRANSACTIONS":
+            today = date.today()
+            return {"data": [
+                {"transaction_date": (today - timedelta(days=3 * n)).isoformat(), "executive": f"Executive {n}",
+                 "acquisition_or_disposal": "D" if n % 2 else "A", "shares": str(1000 * (n + 1)), "share_price": "10.0"}
+                for n in range(4)
+            ]}
+        if "newsdata" in route:
+            ticker = params.get("q", "").split()[0]
+            return {"status": "success", "results": [
+                {"article_id": f"{ticker}-{n}", "link": f"https://example.com/{ticker}/{n}", "title": f"{ticker} headline {n}",
+                 "description": description(ticker, n), "pubDate": date.today().isoformat()}
+                for n in range(ARTICLES_PER_TICKER)
+            ]}
+        raise ValueError(f"No stand-in for {route}")
+
+
+def _json_response(body):
+    response = requests.Response()
+    response.status_code = 200
+    response.headers["Content-Type"] = "application/json"
+    response._content = json.dumps(body).encode("utf-8")
+    response.encoding = "utf-8"
+    return response
+
+
+def daily_bars(tickers, period=None, start=None, end=None, **kwargs):
+    """yf.download-shaped daily bars ((field, ticker) columns) for the stand-in tickers."""
+    tickers = [tickers] if isinstance(tickers, str) else list(tickers)
+    if start is not None:
+        last = pd.Timestamp(end) - pd.Timedelta(days=1) if end is not None else pd.Timestamp.today().normalize()
+        sessions = get_calendar().sessions_between(pd.Timestamp(start).date(), last.date())
+    else:
+        days = {"5d": 5, "1mo": 21, "1y": 252}.get(period, 252)
+        sessions = get_calendar().sessions_between(date.today() - timedelta(days=2 * days), date.today())[-days:]
+    index = pd.DatetimeIndex(pd.to_datetime(sessions), name="Date")
+    # Prices are a function of (ticker, date) only, so every request sees the same history
+    days = (index - pd.Timestamp("2000-01-01")).days.to_numpy()
+    frames = {}
+    for ticker in tickers:
+        seed = _seed(ticker)
+        phase, period, base = seed % 628 / 100, 20 + seed % 80, 5 + seed % 300
+        close = base * (1 + 0.2 * np.sin(days / period + phase) + 0.02 * np.sin(days * 1.7 + phase))
+        frames[ticker] = pd.DataFrame({
+            "Open": close * 0.99, "High": close * 1.02, "Low": close * 0.97,
+            "Close": close, "Adj Close": close, "Volume": np.full(len(close), 1_000_000.0),
+        }, index=index)
+    bars = pd.concat(frames, axis=1).swaplevel(axis=1).sort_index(axis=1)
+    return bars
+
+
+class StandInChatModel(StubChatModel):
+    """Answers the stand-in sentiment, batch sentiment and analyst prompts with valid JSON."""
+
+    def invoke(self, messages, config=None, **kwargs):
+        human = messages[-1].content
+        count = len(re.findall(r"^Article \d+$", human, re.MULTILINE))
+        if count:
+            results = [{"index": index, "sentiment": "NEUTRAL", "explanation": "stand-in"} for index in range(1, count + 1)]
+            return AIMessage(content=json.dumps({"results": results}))
+        if "Recent news:" in human:
+            action = ("BUY", "HOLD", "SELL")[_seed(human[:40]) % 3]
+            return AIMessage(content=json.dumps({"action": action, "explanation": "stand-in analysis"}))
+        return AIMessage(content='{"sentiment": "NEUTRAL", "explanation": "stand-in"}')
+
+
+def prompt_loader(prompt_name):
+    return PROMPTS[prompt_name] if prompt_name in PROMPTS else get_prompt(prompt_name)
+
+
+def stand_in_runtime():
+    """AgentRuntime backed by the stand-in chat model and prompts, without the LLM cache."""
+    return AgentRuntime(
+        llm_factory=lambda model, temperature: StandInChatModel(responses=[""]),
+        prompt_loader=prompt_loader,
+        use_llm_cache=False,
+    )
+
+
+# Stages of the traced runs written by build_database, as (run, stage, per ticker)
+RUN_STAGES = (
+    ("identify", "most_active", False), ("identify", "market_data", False), ("identify", "news", True),
+    ("identify", "sentiment_batch", True), ("identify", "analyst_llm", True),
+    ("evaluate", "fetch_closes", False), ("evaluate", "write", False),
+)
+
+
+def run_metrics(sessions, tickers, rng):
+    """run_metrics rows of one identify and one evaluate run per session, like tracing.run writes."""
+    rows = []
+    for session in sessions:
+        for run_name in ("identify", "evaluate"):
+            run_id = f"{run_name}-{session.isoformat()}"
+            started_at = f"{session.isoformat()}T14:00:00+00:00"
+            stages = [(stage, ticker) for name, stage, per_ticker in RUN_STAGES if name == run_name
+                      for ticker in (tickers if per_ticker else [None])]
+            durations = np.round(rng.uniform(5, 2000, len(stages)), 1)
+            rows.append((run_id, run_name, "run", None, started_at, float(durations.sum()), None, None, 0, 0, "ok"))
+            rows += [
+                (run_id, run_name, stage, ticker, started_at, float(duration), 900 if "llm" in stage else None,
+                 150 if "llm" in stage else None, 0, 0, "ok")
+                for (stage, ticker), duration in zip(stages, durations)
+            ]
+    return rows
+
+
+def build_database(path, rows, tickers_per_day=None, pending_days=5, run_sessions=30):
+    """
+    Writes a main.db-shaped `data` table with `rows` picks, `tickers_per_day` per session
+    (default: enough to span at most ~1000 sessions) going back from the last completed session.
+    The picks of the latest `pending_days` sessions are left unevaluated, and the last
+    `run_sessions` sessions get traced identify and evaluate runs in run_metrics. Returns the path.
+    """
+    tickers_per_day = tickers_per_day or max(20, rows // 1000)
+    calendar = get_calendar()
+    days = -(-rows // tickers_per_day)
+    sessions = calendar.sessions_between(calendar.sessions[0], calendar.previous_session(date.today()))[-days:]
+
+    rng = np.random.default_rng(rows)
+    day = np.repeat(np.arange(days), tickers_per_day)[:rows]
+    ticker = rng.integers(0, 2000, rows)
+    record_date = np.array([session.isoformat() for session in sessions])[day]
+    previous_close = np.round(rng.uniform(1, 500, rows), 4)
+    percent_change = np.round(rng.normal(0, 3, rows), 2)
+    evaluated = day < days - pending_days
+    df = pd.DataFrame({
+        "ticker": np.char.add("T", np.char.zfill(ticker.astype(str), 4)),
+        "action": np.array(["BUY", "HOLD", "SELL"])[rng.integers(0, 3, rows)],
+        "explanation": "stand-in analysis of the stock's recent performance and news",
+        "record_date": record_date,
+        "article_links_and_sentiments": "[{'link': 'https://example.com/a', 'sentiment': 'NEUTRAL'}]",
+        "previous_close": previous_close,
+        "current_close": np.where(evaluated, np.round(previous_close * (1 + percent_change / 100), 4), np.nan),
+        "percent_change": np.where(evaluated, percent_change, np.nan),
+        "s&p500_percent_change": np.where(evaluated, np.round(rng.normal(0, 1, rows), 2), np.nan),
+        "evaluation": np.where(evaluated, np.array(["WIN", "LOSS"])[rng.integers(0, 2, rows)], None),
+    })
+    if os.path.exists(path):
+        os.remove(path)
+    client = SQLiteClient(path)
+    migrate(client)
+    client.close()
+    columns = ", ".join(f'"{column}"' for column in df.columns)
+    values = df.astype(object).where(df.notna(), None).itertuples(index=False, name=None)
+    with sqlite3.connect(path) as connection:
+        connection.executemany(f"INSERT INTO data ({columns}) VALUES ({', '.join('?' * len(df.columns))})", values)
+        # Picks written here bypass evaluate(), which keeps the aggregates current
+        refresh_daily_performance(connection)
+        connection.executemany(
+            "INSERT INTO run_metrics (run_id, run_name, stage, ticker, started_at, duration_ms, tokens_in, tokens_out, "
+            "retries, cache_hits, status) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            run_metrics(sessions[-run_sessions:], ticker_names(tickers_per_day), rng),
+        )
+    return path
@@ -0,0 +1,148 @@
+"""
+Cold start of the Gradio app: how long until it answers its first request.
+
+Each run starts `app.py` in a fresh process against a database of --rows picks. Yahoo and the
+HTTP APIs are replaced by a slow stand-in network (--latency, per call) whose calls all fail,
+so anything the app fetches before serving shows up as delay. Reported per run:
+
+    import_seconds    importing app.py (Gradio, the tabs and their dependencies)
+    build_seconds     create_gradio_interface()
+    ttfb_seconds      from process start until GET / returns, as seen by the client
+    warm_seconds      from process start until the background cache warm-up finishes
+    calls_at_ready    external calls made before the app started serving
+
+Usage:
+    python -m benchmarks.startup_time [--runs 3] [--rows 1000] [--latency 1.0] [--root PATH]
+
+--root measures another checkout of the repository (e.g. a git worktree of an older revision).
+"""
+import time
+
+STARTED = time.perf_counter()
+
+import os
+import sys
+import json
+import socket
+import argparse
+import tempfile
+import threading
+import statistics
+import subprocess
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _serve(root, port, latency, report):
+    """Child process: installs the slow network, starts the app and writes its timings to `report`."""
+    sys.path.insert(0, root)
+    os.chdir(root)
+    import runpy
+    from src.utils.cassette import Cassette, CassetteMiss, set_cassette
+
+    class SlowNetwork(Cassette):
+        def __init__(self):
+            self.mode = "replay"
+            self.path = None
+            self.calls = 0
+
+        def call(self, kind, route, key_parts, fn, encode=None, decode=None):
+            self.calls += 1
+            time.sleep(latency)
+            raise CassetteMiss(f"No network in the startup benchmark ({kind} {route})")
+
+    network = SlowNetwork()
+    set_cassette(network)
+
+    start = time.perf_counter()
+    module = runpy.run_path(os.path.join(root, "app.py"), run_name="startup_benchmark")
+    imported = time.perf_counter()
+    demo = module["create_gradio_interface"]()
+    built = time.perf_counter()
+    demo.launch(server_name="127.0.0.1", server_port=port, prevent_thread_lock=True, quiet=True)
+    timings = {
+        "import_seconds": imported - start,
+        "build_seconds": built - imported,
+        "calls_at_ready": network.calls,
+    }
+    warmers = [thread for thread in threading.enumerate() if thread.name == "warm-caches"]
+    for thread in warmers:
+        thread.join()
+    timings["warm_seconds"] = time.perf_counter() - STARTED if warmers else None
+    timings["calls_after_warm"] = network.calls
+    with open(report, "w") as f:
+        json.dump(timings, f)
+    while True:
+        time.sleep(60)
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def measure(root, database, latency, workdir, timeout=120):
+    """Starts the app in a subprocess and returns its timings, with ttfb_seconds measured here."""
+    port = _free_port()
+    report = os.path.join(workdir, f"startup-{port}.json")
+    env = {**os.environ, "SQLITE_DB_PATH": database, "GRADIO_ANALYTICS_ENABLED": "False",
+           "HTTP_CACHE_DISABLED": "1", "ALPHA_VANTAGE_API": "stand-in", "NEWSDATA_API": "stand-in"}
+    env.pop("CASSETTE_MODE", None)
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.startup_time", "--serve", str(port), "--root", root,
+         "--latency", str(latency), "--report", report],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        ttfb = None
+        while ttfb is None:
+            if process.poll() is not None:
+                raise RuntimeError(f"The app exited with status {process.returncode}")
+            if time.perf_counter() - start > timeout:
+                raise TimeoutError(f"The app did not answer within {timeout}s")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=5) as response:
+                    response.read(1)
+                    ttfb = time.perf_counter() - start
+            except OSError:
+                time.sleep(0.02)
+        while not os.path.exists(report):
+            if time.perf_counter() - start > timeout:
+                raise TimeoutError("The app did not report its timings")
+            time.sleep(0.05)
+        time.sleep(0.05)
+        with open(report) as f:
+            timings = json.load(f)
+        return {"ttfb_seconds": ttfb, **timings}
+    finally:
+        process.kill()
+        process.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=1.0, help="Seconds per external call")
+    parser.add_argument("--root", default=ROOT)
+    parser.add_argument("--serve", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--report", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        _serve(os.path.abspath(args.root), args.serve, args.latency, args.report)
+
+    from benchmarks.stand_ins import build_database
+
+    with tempfile.TemporaryDirectory() as workdir:
+        database = build_database(os.path.join(workdir, "startup.db"), args.rows)
+        runs = [measure(os.path.abspath(args.root), database, args.latency, workdir) for _ in range(args.runs)]
+    for index, run in enumerate(runs, 1):
+        print(f"run {index}: " + "  ".join(f"{name} {value:.2f}" if isinstance(value, float) else f"{name} {value}" for name, value in run.items()))
+    for name in ("import_seconds", "build_seconds", "ttfb_seconds", "warm_seconds"):
+        values = [run[name] for run in runs if run.get(name) is not None]
+        if values:
+            print(f"median {name:<15} {statistics.median(values):7.2f}s")
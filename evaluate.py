@@ -1,76 +1,66 @@
-import pandas as pd
+"""
+Fills in the close, percent change and evaluation of past picks, against the S&P 500.
+
+Meant to run from cron: on days the market is closed it exits before loading pandas or yfinance.
+"""
+import argparse
 import logging
-import yfinance as yf
-from src.clients.sqllite import SQLiteClient
 from src.utils.market_status import is_us_market_open
-from src.clients.yahoo import get_sp500_percent_change
 
-def evaluate():
+def evaluate(db_client=None):
     """
     Populates null columns (current_close, percent_change, evaluation) in evaluated_data using yfinance and pandas,
-    comparing to S&P 500 performance.
+    comparing to S&P 500 performance. Only the evaluated rows are updated; the rest of the table is untouched.
+    The daily performance aggregates of the evaluated dates are then refreshed. Uses main.db unless another SQLiteClient is given.
     """
+    # Imported here so market-closed runs and --help do not load pandas, SQLAlchemy or yfinance
+    from src.clients.sqllite import SQLiteClient
+    from src.clients.migrations import migrate, PENDING_CONDITION
+    from src.clients.benchmark_store import BenchmarkStore
+    from src.clients.daily_performance import DailyPerformance
+    from src.workflows.evaluate_picks import fetch_closes, compute_evaluations
+    from src.utils import tracing
+
     logging.basicConfig(level=logging.INFO)
     logger = logging.getLogger(__name__)
 
-    db_client = SQLiteClient()
+    db_client = db_client or SQLiteClient()
 
     try:
-        query = """
-        SELECT * FROM data 
-        WHERE current_close IS NULL OR percent_change IS NULL OR evaluation IS NULL
-        """
-
-        df = db_client.query(query)
-
-        if df is None or df.empty:
-            logger.info("No records found with null columns.")
-            return
-
-        for idx, row in df.iterrows():
-            try:
-                ticker: str = row['ticker']
-                date: str = row['record_date']
-                id_val: int = row['id']
-                previous_close: float = row['previous_close']
-                action: str = row['action']
-
-                logger.info(f"Processing data for ticker: {ticker}, date: {date}, id: {id_val}")
-
-                try:
-                    stock = yf.Ticker(ticker)
-                    historical_data = stock.history(start=date, end=pd.to_datetime(date) + pd.Timedelta(days=1))
-
-                    sp500 = get_sp500_percent_change(date)
+        with tracing.run("evaluate", db_client):
+            migrate(db_client)
+            # Matches the partial index on pending rows, so only those are read
+            query = f"SELECT * FROM data WHERE {PENDING_CONDITION}"
 
-                    current_close: float = historical_data['Close'].iloc[0]
-                    percent_change: float = ((current_close - previous_close) / previous_close) * 100
+            with tracing.span("query"):
+                df = db_client.query(query)
 
-                    evaluation: str | None = None
-                    if action == 'BUY':
-                        evaluation = 'WIN' if percent_change > sp500 else 'LOSS'
-                    elif action == 'HOLD':
-                        evaluation = 'WIN' if percent_change < sp500 else 'LOSS'
+            if df is None or df.empty:
+                logger.info("No records found with null columns.")
+                return
 
-                    # Update the DataFrame directly
-                    df.loc[idx, 'current_close'] = round(current_close, 2)
-                    df.loc[idx, 'percent_change'] = round(percent_change, 2)
-                    df.loc[idx, 's&p500_percent_change'] = round(sp500, 2)
-                    df.loc[idx, 'evaluation'] = evaluation
+            # One request for every pending ticker over the whole date range; S&P 500 closes are stored locally
+            with tracing.span("fetch_closes"):
+                closes, sp500_closes = fetch_closes(df['ticker'].unique(), df['record_date'].min(), df['record_date'].max(), BenchmarkStore(db_client))
+            with tracing.span("compute_evaluations"):
+                results = compute_evaluations(df, closes, sp500_closes)
 
-                    logger.info(f"Updated data for {ticker}, date: {date}, id: {id_val}")
+            logger.info(f"Evaluated {len(results)} of {len(df)} pending rows.")
 
-                except Exception as yf_error:
-                    logger.warning(f"yfinance error for {ticker} or S&P 500, date: {date}: {yf_error}")
+            skipped = df.loc[df.index.difference(results.index)]
+            for ticker, date, id_val in skipped[['ticker', 'record_date', 'id']].itertuples(index=False):
+                logger.warning(f"No close or S&P 500 data for {ticker}, date: {date}, id: {id_val}")
 
-            except Exception as e:
-                logger.error(f"Error processing {ticker}, date: {date}, id: {id_val}: {e}")
-                continue
+            # Write only the evaluated columns of the evaluated rows back to the database
+            if not results.empty:
+                updates = results.assign(id=df.loc[results.index, 'id'])
+                with tracing.span("write"):
+                    updated = db_client.update_rows('data', 'id', updates)
+                logger.info(f"Updated {updated} rows in the database.")
 
-        # Write the updated DataFrame back to the database
-        if not df.empty:
-            df.to_sql('data', db_client.engine, if_exists='replace', index=False)
-            logger.info("DataFrame updated in the database.")
+                # The Evaluation tab reads these aggregates; only the dates just evaluated change
+                with tracing.span("daily_performance"):
+                    DailyPerformance(db_client).refresh(df.loc[results.index, 'record_date'].unique())
 
     except Exception as e:
         logger.error(f"Error in populate_null_columns: {e}")
@@ -79,6 +69,7 @@ def evaluate():
         db_client.close()
 
 if __name__ == "__main__":
+    argparse.ArgumentParser(description=__doc__).parse_args()
     if is_us_market_open():
         evaluate()
     else:
@@ -1,7 +1,11 @@
-from src.utils.market_status import is_us_market_open
+"""
+Picks the most active US stocks of the day, analyzes them and appends the results to the database.
+
+Meant to run from cron: on days the market is closed it exits before loading the analysis stack.
+"""
+import argparse
 from dotenv import load_dotenv
-from src.clients.sqllite import SQLiteClient
-from src.workflows.analze_active_stocks import analyze_active_stocks
+from src.utils.market_status import is_us_market_open
 
 load_dotenv() 
 
@@ -9,13 +13,38 @@ MODEL = "groq/deepseek-r1-distill-llama-70b"
 TEMPERATURE = 0.1
 DATABASE="main.db"
 TABLE="data"
-
-if __name__ == "__main__":
-    if is_us_market_open():
-        results_df = analyze_active_stocks()
+MAX_WORKERS=4 # Tickers analyzed concurrently; 1 runs the pipeline serially
+SENTIMENT_BATCH_SIZE=8 # Articles scored per sentiment LLM request; 1 scores each article separately
+
+
+def identify():
+    # Imported here so market-closed runs and --help do not load LangChain, pandas or SQLAlchemy
+    from src.clients.sqllite import SQLiteClient
+    from src.clients.migrations import migrate
+    from src.clients.article_store import ArticleStore
+    from src.clients.duplicate_index import NearDuplicateIndex
+    from src.workflows.analze_active_stocks import analyze_active_stocks, PROMPTS
+    from src.llm.prompt_registry import registry
+    from src.utils import tracing
+
+    # Cron runs use pinned prompts only: a missing pin stops the run here instead of pulling from the hub
+    registry.hub_fallback = False
+    for name in PROMPTS:
+        registry.get(name)
+
+    client = SQLiteClient(DATABASE)
+    migrate(client)
+    with tracing.run("identify", client):
+        results_df = analyze_active_stocks(
+            model=MODEL,
+            temperature=TEMPERATURE,
+            max_workers=MAX_WORKERS,
+            sentiment_batch_size=SENTIMENT_BATCH_SIZE,
+            article_store=ArticleStore(client),
+            duplicate_index=NearDuplicateIndex(client),
+        )
 
         if not results_df.empty:
-            client = SQLiteClient(DATABASE)
             client.append_df(results_df, TABLE)
 
             print("\nAnalysis Summary:")
@@ -23,7 +52,10 @@ if __name__ == "__main__":
             print("\nAction Distribution:")
             print(results_df['action'].value_counts())
 
+
+if __name__ == "__main__":
+    argparse.ArgumentParser(description=__doc__).parse_args()
+    if is_us_market_open():
+        identify()
     else:
         print("Markets are closed today")
-
-
@@ -1,47 +1,142 @@
-from langchain_core.messages import SystemMessage, HumanMessage
-from langchain_community.chat_models import ChatLiteLLM
-from langgraph.graph import START, StateGraph, MessagesState
-from langgraph.prebuilt import tools_condition, ToolNode
-from langchain import hub
+import threading
+from functools import cache
+from src.llm.prompt_registry import get_prompt
+from src.llm.llm_cache import LLMCache, get_llm_cache, recorded_llm_call
 
-def invoke_agent(prompt_name: str, user_variables: dict, system_variables: dict = None, tools: list = [], model: str = "groq/llama-3.3-70b-versatile", temperature: float = 0.1) -> dict:
+
+def chat_litellm(**kwargs):
+    """The default chat model. LangChain, LangGraph and LiteLLM are only imported once an agent is built."""
+    from langchain_community.chat_models import ChatLiteLLM
+    return ChatLiteLLM(**kwargs)
+
+
+@cache
+def agent_state():
+    """Graph state: the conversation plus the system message prepended on every LLM call."""
+    from langchain_core.messages import SystemMessage
+    from langgraph.graph import MessagesState
+
+    class AgentState(MessagesState):
+        system_message: SystemMessage
+
+    return AgentState
+
+
+class _CompiledAgent:
+    def __init__(self, graph, system_message_template, human_message_template, prompt_version=None):
+        self.graph = graph
+        self.prompt_version = prompt_version
+        self.system_message_template = system_message_template
+        self.human_message_template = human_message_template
+
+
+class AgentRuntime:
     """
-    Invokes a LangGraph agent with flexible system prompt handling.
+    Builds and compiles one LangGraph agent per (prompt, model, temperature, toolset) and reuses it.
+
+    Prompts come from the local prompt registry and model responses go through the LLM cache.
+    Repeated calls only format the prompt variables and invoke the compiled graph. The system
+    message travels in the graph state, so one compiled graph serves every call and can be
+    shared across threads.
     """
 
-    llm = ChatLiteLLM(model=model, temperature=temperature)
-    llm_with_tools = llm.bind_tools(tools)
+    def __init__(self, llm_factory=chat_litellm, prompt_loader=get_prompt, use_llm_cache=True):
+        self.llm_factory = llm_factory
+        self.prompt_loader = prompt_loader
+        self.use_llm_cache = use_llm_cache
+        self._agents = {}
+        self._lock = threading.Lock()
 
-    prompt = hub.pull(prompt_name)
-    system_message_template = prompt.messages[0]
-    human_message_template = prompt.messages[1]
+    @property
+    def llm_cache(self):
+        """The process-wide LLM cache, opened on first use rather than when the runtime is created."""
+        return get_llm_cache() if self.use_llm_cache else None
 
-    # Handle system prompt formatting based on system_variables
-    if system_variables:
-        system_message = system_message_template.format(**system_variables)
-    else:
-        system_message = system_message_template.format()
+    @staticmethod
+    def _toolset_key(tools):
+        return tuple(getattr(tool, "name", None) or id(tool) for tool in tools)
 
-    human_message = human_message_template.format(**user_variables)
+    def _build_graph(self, model, temperature, tools, prompt_version=None):
+        from langgraph.graph import START, StateGraph
+        from langgraph.prebuilt import tools_condition, ToolNode
 
-    sys_msg = SystemMessage(content=system_message.content)
-    user_msg = HumanMessage(content=human_message.content)
+        AgentState = agent_state()
+        llm = self.llm_factory(model=model, temperature=temperature)
+        llm_with_tools = llm.bind_tools(tools)
+        llm_cache = self.llm_cache
+        toolset = self._toolset_key(tools)
 
-    def assistant(state: MessagesState):
-        messages = [sys_msg, user_msg] + state["messages"][1:]
-        return {"messages": [llm_with_tools.invoke(messages)]}
+        def assistant(state: AgentState):
+            messages = [state["system_message"]] + state["messages"]
+            if llm_cache is None:
+                fingerprint = LLMCache.fingerprint(model, temperature, messages, prompt_version, toolset)
+                return {"messages": [recorded_llm_call(llm_with_tools.invoke, messages, model, fingerprint)]}
+            return {"messages": [llm_cache.invoke(llm_with_tools.invoke, messages, model, temperature, prompt_version, toolset)]}
 
-    builder = StateGraph(MessagesState)
-    builder.add_node("assistant", assistant)
-    builder.add_node("tools", ToolNode(tools))
-    builder.add_edge(START, "assistant")
-    builder.add_conditional_edges(
-        "assistant",
-        tools_condition,
-    )
-    builder.add_edge("tools", "assistant")
-    graph = builder.compile()
+        builder = StateGraph(AgentState)
+        builder.add_node("assistant", assistant)
+        builder.add_node("tools", ToolNode(tools))
+        builder.add_edge(START, "assistant")
+        builder.add_conditional_edges(
+            "assistant",
+            tools_condition,
+        )
+        builder.add_edge("tools", "assistant")
+        return builder.compile()
+
+    def get_agent(self, prompt_name, model, temperature, tools=()):
+        """Returns the compiled agent for this configuration, building it on first use."""
+        key = (prompt_name, model, temperature, self._toolset_key(tools))
+        agent = self._agents.get(key)
+        if agent is None:
+            with self._lock:
+                agent = self._agents.get(key)
+                if agent is None:
+                    prompt = self.prompt_loader(prompt_name)
+                    prompt_version = getattr(prompt, "version", None)
+                    agent = _CompiledAgent(
+                        self._build_graph(model, temperature, list(tools), prompt_version),
+                        prompt.messages[0],
+                        prompt.messages[1],
+                        prompt_version,
+                    )
+                    self._agents[key] = agent
+        return agent
 
-    state = MessagesState(messages=[user_msg])
-    result = graph.invoke(state)
-    return result
\ No newline at end of file
+    def invoke(self, prompt_name, user_variables, system_variables=None, tools=(), model="groq/llama-3.3-70b-versatile", temperature=0.1):
+        from langchain_core.messages import SystemMessage, HumanMessage
+
+        agent = self.get_agent(prompt_name, model, temperature, tools)
+
+        # Handle system prompt formatting based on system_variables
+        if system_variables:
+            system_message = agent.system_message_template.format(**system_variables)
+        else:
+            system_message = agent.system_message_template.format()
+
+        human_message = agent.human_message_template.format(**user_variables)
+
+        state = {
+            "messages": [HumanMessage(content=human_message.content)],
+            "system_message": SystemMessage(content=system_message.content),
+        }
+        return agent.graph.invoke(state)
+
+
+# Shared by every caller in the process
+runtime = AgentRuntime()
+
+
+def invoke_agent(prompt_name: str, user_variables: dict, system_variables: dict = None, tools: list = [], model: str = "groq/llama-3.3-70b-versatile", temperature: float = 0.1) -> dict:
+    """
+    Invokes a LangGraph agent with flexible system prompt handling.
+    The compiled agent for each prompt/model/temperature/toolset is built once per process.
+    """
+    return runtime.invoke(
+        prompt_name,
+        user_variables,
+        system_variables=system_variables,
+        tools=tools,
+        model=model,
+        temperature=temperature,
+    )
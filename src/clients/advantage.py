@@ -1,13 +1,19 @@
 import os
 import requests
 from datetime import datetime, timedelta
+from src.clients.rate_limiter import get_limiter
+from src.clients.http_cache import pooled_session, get_response_cache, response_key, endpoint_ttl
+from src.utils import tracing
 
 class AlphaVantageClient:
-    def __init__(self):
+    def __init__(self, session=None, cache=None):
         self.api_key = os.getenv("ALPHA_VANTAGE_API")
         if not self.api_key:
             raise ValueError("ALPHA_VANTAGE_API environment variable or api_key argument must be set.")
         self.base_url = "https://www.alphavantage.co/query"
+        self.limiter = get_limiter("alphavantage")
+        self.session = session or pooled_session()
+        self.cache = cache if cache is not None else get_response_cache()
 
     def _make_request(self, function, params=None):
         """Internal method to make requests to the AlphaVantage API."""
@@ -16,10 +22,21 @@ class AlphaVantageClient:
         if params:
             all_params.update(params)  # Add any user-supplied parameters
 
+        cache_key = response_key(function, all_params)
+        if self.cache is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                tracing.add("cache_hits")
+                return cached
+
         try:
-            response = requests.get(self.base_url, params=all_params)
+            response = self.limiter.request("GET", self.base_url, key=self.api_key, session=self.session, params=all_params)
             response.raise_for_status() # Raise an exception for bad status codes (4xx or 5xx)
-            return response.json()
+            data = response.json()
+            # Error and throttle messages come back as 200s; only real payloads are cached
+            if self.cache is not None and isinstance(data, dict) and not {"Error Message", "Note", "Information"} & data.keys():
+                self.cache.set(cache_key, data, ttl=endpoint_ttl(function))
+            return data
         except requests.exceptions.RequestException as e:
             print(f"Error: {e}")
             return None  # Or raise the exception if you prefer
@@ -0,0 +1,104 @@
+import hashlib
+import logging
+from datetime import datetime, timezone
+from src.clients.sqllite import SQLiteClient
+from src.clients.migrations import migrate
+
+ARTICLES_TABLE = "articles"
+SENTIMENT_TABLE = "article_sentiment"
+
+
+def article_id(article):
+    """NewsData's article_id, or a hash of the link for articles without one."""
+    if article.get("article_id"):
+        return article["article_id"]
+    return hashlib.sha256((article.get("link") or "").encode("utf-8")).hexdigest()[:32]
+
+
+def cluster_key(article):
+    """The article's near-duplicate cluster when it has been assigned one, else its own id."""
+    return article.get("cluster_id") or article_id(article)
+
+
+class ArticleStore:
+    """
+    News articles and their sentiment, kept in SQLite.
+
+    Sentiment is keyed by (article_id, ticker, prompt_version), so an article already scored for
+    a ticker with the current prompt is never sent to the LLM again, whichever day or ticker
+    list it shows up in. Articles carrying a near-duplicate `cluster_id` also reuse the
+    sentiment of any other article in their cluster.
+    """
+
+    def __init__(self, db_client=None):
+        self.logger = logging.getLogger(__name__)
+        self.db_client = db_client or SQLiteClient()
+        migrate(self.db_client)
+
+    def lookup(self, items, prompt_versions):
+        """
+        Returns stored SentimentResult dicts for (ticker, article) pairs, in input order, None where
+        the pair has not been scored with any of `prompt_versions`.
+        """
+        prompt_versions = [version for version in prompt_versions if version]
+        if not items or not prompt_versions:
+            return [None] * len(items)
+        ids = sorted({article_id(article) for _, article in items})
+        clusters = sorted({cluster_key(article) for _, article in items})
+        id_placeholders = ", ".join("?" * len(ids))
+        cluster_placeholders = ", ".join("?" * len(clusters))
+        version_placeholders = ", ".join("?" * len(prompt_versions))
+        df = self.db_client.query(
+            f"SELECT s.article_id, a.cluster_id, s.ticker, s.sentiment, s.explanation FROM {SENTIMENT_TABLE} s "
+            f"LEFT JOIN {ARTICLES_TABLE} a ON a.article_id = s.article_id "
+            f"WHERE (s.article_id IN ({id_placeholders}) OR a.cluster_id IN ({cluster_placeholders})) "
+            f"AND s.prompt_version IN ({version_placeholders}) ORDER BY s.scored_at",
+            params=tuple(ids) + tuple(clusters) + tuple(prompt_versions),
+        )
+        if df is None or df.empty:
+            return [None] * len(items)
+        # Latest score wins when several prompt versions or cluster members have one
+        by_article, by_cluster = {}, {}
+        for row in df.itertuples(index=False):
+            result = {"explanation": row.explanation, "sentiment": row.sentiment}
+            by_article[(row.article_id, row.ticker)] = result
+            by_cluster[(row.cluster_id or row.article_id, row.ticker)] = result
+        return [
+            by_article.get((article_id(article), ticker)) or by_cluster.get((cluster_key(article), ticker))
+            for ticker, article in items
+        ]
+
+    def save(self, items, results, model=None):
+        """
+        Stores the articles and their sentiment.
+        `results` holds (SentimentResult dict or None, prompt_version) per (ticker, article) pair.
+        """
+        now = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        articles = {}
+        sentiments = []
+        for (ticker, article), (result, prompt_version) in zip(items, results):
+            key = article_id(article)
+            articles[key] = (key, article.get("link"), article.get("title"), article.get("description"), article.get("pubDate"), now, cluster_key(article))
+            if result is not None and prompt_version:
+                sentiments.append((key, ticker, prompt_version, model, result.get("sentiment"), result.get("explanation"), now))
+        if articles:
+            self.db_client.execute_query(
+                f"INSERT OR IGNORE INTO {ARTICLES_TABLE} (article_id, link, title, description, pubDate, first_seen, cluster_id) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                list(articles.values()),
+            )
+        if sentiments:
+            self.db_client.execute_query(
+                f"INSERT OR REPLACE INTO {SENTIMENT_TABLE} (article_id, ticker, prompt_version, model, sentiment, explanation, scored_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                sentiments,
+            )
+            self.logger.info(f"Stored sentiment for {len(sentiments)} articles")
+
+    def history(self, ticker):
+        """Sentiment history of a ticker, newest first, joined with the article details."""
+        return self.db_client.query(
+            f"SELECT s.ticker, s.sentiment, s.explanation, s.prompt_version, s.model, s.scored_at, "
+            f"a.article_id, a.cluster_id, a.link, a.title, a.pubDate FROM {SENTIMENT_TABLE} s "
+            f"JOIN {ARTICLES_TABLE} a ON a.article_id = s.article_id WHERE s.ticker = ? ORDER BY s.scored_at DESC",
+            params=(ticker,),
+        )
@@ -0,0 +1,165 @@
+import os
+import time
+import threading
+import logging
+from datetime import datetime
+from zoneinfo import ZoneInfo
+import pandas as pd
+from src.clients.sqllite import SQLiteClient
+from src.clients.migrations import migrate
+from src.clients.yahoo import download_daily_bars
+from src.utils.trading_calendar import get_calendar
+
+SP500_TICKER = "^GSPC"
+TABLE = "benchmark_prices"
+
+# First date fetched when the table is empty
+BACKFILL_START = "2025-01-01"
+# Seconds today's bar (an intraday price until the close) is reused before it is downloaded again
+INTRADAY_TTL_SECONDS = float(os.getenv("BENCHMARK_INTRADAY_TTL_SECONDS", "60"))
+
+
+def _today():
+    """Today's date in New York, where the sessions are."""
+    return pd.Timestamp(datetime.now(ZoneInfo("America/New_York")).date())
+
+
+class BenchmarkStore:
+    """
+    Daily closes of a benchmark index, kept in SQLite and mirrored in memory.
+
+    The table is backfilled once, then topped up with only the missing sessions; the trading
+    calendar tells which days are sessions, so weekends and holidays are never probed. Lookups
+    are binary searches over the in-memory series and need no network once the range is stored.
+    Today's bar is held in memory only, apart from the stored closes, since before the close it
+    is an intraday price: it is downloaded again once older than `intraday_ttl` seconds, and its
+    session is fetched and stored as a close once the date has moved on.
+    """
+
+    def __init__(self, db_client=None, symbol=SP500_TICKER, backfill_start=BACKFILL_START, intraday_ttl=INTRADAY_TTL_SECONDS):
+        self.logger = logging.getLogger(__name__)
+        self.db_client = db_client or SQLiteClient()
+        self.symbol = symbol
+        self.backfill_start = pd.Timestamp(backfill_start)
+        self.calendar = get_calendar()
+        self.intraday_ttl = intraday_ttl
+        self._lock = threading.Lock()
+        self._closes = None
+        self._intraday = None  # (date, price or None, monotonic time fetched)
+        self._checked_from = None
+        self._checked_through = None
+        migrate(self.db_client)
+
+    def _load(self):
+        df = self.db_client.query(
+            f"SELECT date, close FROM {TABLE} WHERE symbol = ? ORDER BY date", params=(self.symbol,)
+        )
+        if df is None or df.empty:
+            return pd.Series(dtype=float, index=pd.DatetimeIndex([], name='date'))
+        return pd.Series(df['close'].to_numpy(dtype=float), index=pd.DatetimeIndex(pd.to_datetime(df['date']), name='date'))
+
+    def _stored(self):
+        with self._lock:
+            if self._closes is None:
+                self._closes = self._load()
+            return self._closes
+
+    @property
+    def closes(self):
+        """Daily closes as a pandas Series indexed by date (sorted), ending with today's bar once fetched."""
+        closes = self._stored()
+        with self._lock:
+            intraday = self._intraday
+        if intraday is None or intraday[1] is None or intraday[0] != _today() or intraday[0] in closes.index:
+            return closes
+        return pd.concat([closes, pd.Series([intraday[1]], index=pd.DatetimeIndex([intraday[0]], name='date'))])
+
+    def _fetch(self, start, end):
+        """Downloads closes for [start, end] and stores every completed session."""
+        bars = download_daily_bars([self.symbol], start=start.strftime('%Y-%m-%d'), end=(end + pd.Timedelta(days=1)).strftime('%Y-%m-%d'))
+        fetched = bars['Close'][self.symbol].dropna() if not bars.empty else pd.Series(dtype=float)
+        fetched.index = pd.to_datetime(fetched.index).tz_localize(None).normalize()
+
+        today = _today()
+        completed = fetched[fetched.index < today]
+        if not completed.empty:
+            rows = [(self.symbol, date.strftime('%Y-%m-%d'), float(close)) for date, close in completed.items()]
+            self.db_client.execute_query(f"INSERT OR REPLACE INTO {TABLE} (symbol, date, close) VALUES (?, ?, ?)", rows)
+            self.logger.info(f"Stored {len(rows)} {self.symbol} closes from {rows[0][1]} to {rows[-1][1]}")
+        return completed, (fetched[fetched.index == today].iloc[-1] if (fetched.index == today).any() else None)
+
+    def ensure(self, start, end=None):
+        """
+        Makes sure closes from `start` through `end` (default today) are available, fetching only
+        the dates before the first stored session or from the first session not stored yet on.
+        Today's bar is refetched once it is older than the intraday TTL.
+        """
+        today = _today()
+        start = pd.Timestamp(start).normalize()
+        end = pd.Timestamp(end).normalize() if end is not None else today
+        closes = self._stored()
+        with self._lock:
+            ranges = []
+            if closes.empty:
+                ranges.append((min(start, self.backfill_start), end))
+            else:
+                checked_from = min(closes.index[0], self._checked_from or closes.index[0])
+                if start < checked_from:
+                    ranges.append((start, closes.index[0] - pd.Timedelta(days=1)))
+                checked_through = max(closes.index[-1], self._checked_through or closes.index[-1])
+                if end > checked_through:
+                    ranges.append((closes.index[-1] + pd.Timedelta(days=1), end))
+            intraday_fresh = (
+                self._intraday is not None and self._intraday[0] == today
+                and time.monotonic() - self._intraday[2] < self.intraday_ttl
+            )
+            # Nothing to download for stretches without a trading session, or with only today's fresh bar
+            ranges = [(range_start, range_end) for range_start, range_end in ranges
+                      if [session for session in self.calendar.sessions_between(range_start, range_end)
+                          if not (intraday_fresh and pd.Timestamp(session) == today)]]
+            if not ranges:
+                return
+            fetched = [self._fetch(range_start, range_end) for range_start, range_end in ranges]
+            merged = pd.concat([closes] + [completed for completed, _ in fetched])
+            self._closes = merged[~merged.index.duplicated(keep='last')].sort_index()
+            if any(range_end >= today for _, range_end in ranges):
+                self._intraday = (today, next((float(bar) for _, bar in fetched if bar is not None), None), time.monotonic())
+            self._checked_from = min(start, self._checked_from or start)
+            # Only completed sessions count as checked; today's is fetched again as its bar changes
+            checked_through = min(end, today - pd.Timedelta(days=1))
+            self._checked_through = max(checked_through, self._checked_through or checked_through)
+
+    def _close_at_or_before(self, date):
+        closes = self.closes
+        position = closes.index.searchsorted(pd.Timestamp(date).normalize(), side='right')
+        if position == 0:
+            return None, None
+        return closes.index[position - 1], float(closes.iloc[position - 1])
+
+    def close_on(self, date):
+        """Close on `date`, or None if `date` was not a trading session."""
+        session, close = self._close_at_or_before(date)
+        return close if session == pd.Timestamp(date).normalize() else None
+
+    def previous_close(self, date):
+        """Close of the last trading session before `date`, or None if it is not stored."""
+        return self.close_on(self.calendar.previous_session(pd.Timestamp(date)))
+
+    def percent_change(self, date):
+        """Percent change on `date` versus the previous session, or None if `date` was not a session."""
+        current_close = self.close_on(date)
+        previous_close = self.previous_close(date)
+        if current_close is None or previous_close is None:
+            return None
+        return (current_close - previous_close) / previous_close * 100
+
+    def return_between(self, start_date, end_date):
+        """
+        Percent return from the close on `start_date` to the close on `end_date`.
+        Dates that were not sessions fall back to the last session before them.
+        """
+        start_price = self._close_at_or_before(start_date)[1]
+        end_price = self._close_at_or_before(end_date)[1]
+        if start_price is None or end_price is None:
+            return None
+        return (end_price - start_price) / start_price * 100
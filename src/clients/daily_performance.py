@@ -0,0 +1,123 @@
+import os
+import logging
+from collections import deque
+from src.clients.sqllite import SQLiteClient, get_app_client
+from src.clients.migrations import migrate
+from src.utils.lazy import lazy_singleton
+
+# Record dates the rolling win rate is taken over
+ROLLING_WIN_RATE_DATES = int(os.getenv("ROLLING_WIN_RATE_DATES", "20"))
+
+# Picks the Evaluation tab counts: evaluated, or with at least their percent change filled in
+COUNTED = "(evaluation IS NOT NULL OR percent_change IS NOT NULL)"
+
+
+def refresh_daily_performance(connection, dates=None):
+    """
+    Recomputes the daily aggregates of `dates` (record_date values as stored; every date when None)
+    from the data table, then the cumulative and rolling columns from the first of them on.
+    Runs on a sqlite3 connection, inside the caller's transaction.
+    """
+    if dates is None:
+        where, params = "", ()
+        connection.execute("DELETE FROM daily_evaluations")
+        connection.execute("DELETE FROM daily_performance")
+    else:
+        dates = sorted({str(date) for date in dates})
+        if not dates:
+            return
+        in_dates, params = f"record_date IN ({', '.join('?' * len(dates))})", tuple(dates)
+        connection.execute(f"DELETE FROM daily_evaluations WHERE {in_dates}", params)
+        connection.execute(f"DELETE FROM daily_performance WHERE {in_dates}", params)
+        where = f"AND {in_dates}"
+    connection.execute(
+        "INSERT INTO daily_evaluations (record_date, action, evaluation, picks) "
+        f"SELECT record_date, action, evaluation, COUNT(*) FROM data WHERE {COUNTED} {where} "
+        "GROUP BY record_date, action, evaluation",
+        params,
+    )
+    # Equal weight: a day's BUY return is the mean percent change of its BUY picks
+    connection.execute(
+        "INSERT INTO daily_performance (record_date, picks, evaluated, wins, buys, buy_return, sp500_change) "
+        "SELECT record_date, COUNT(*), SUM(evaluation IS NOT NULL), SUM(evaluation = 'WIN'), "
+        "SUM(action = 'BUY' AND percent_change IS NOT NULL), AVG(CASE WHEN action = 'BUY' THEN percent_change END), "
+        f'AVG("s&p500_percent_change") FROM data WHERE {COUNTED} {where} GROUP BY record_date',
+        params,
+    )
+    _accumulate(connection, dates[0] if dates else None)
+
+
+def _accumulate(connection, since=None):
+    """Compounds the daily returns in date order and writes the running columns of the dates from `since` on."""
+    rows = connection.execute(
+        "SELECT record_date, evaluated, wins, buy_return, sp500_change FROM daily_performance ORDER BY record_date"
+    ).fetchall()
+    growth = sp500_growth = 1.0
+    window = deque(maxlen=ROLLING_WIN_RATE_DATES)
+    updates = []
+    for record_date, evaluated, wins, buy_return, sp500_change in rows:
+        # Days without BUY picks or S&P 500 data count as flat
+        growth *= 1 + (buy_return or 0) / 100
+        sp500_growth *= 1 + (sp500_change or 0) / 100
+        window.append((evaluated or 0, wins or 0))
+        if since is None or record_date >= since:
+            evaluated_in_window = sum(count for count, _ in window)
+            win_rate = 100 * sum(won for _, won in window) / evaluated_in_window if evaluated_in_window else None
+            updates.append(((growth - 1) * 100, (sp500_growth - 1) * 100, win_rate, record_date))
+    connection.executemany(
+        "UPDATE daily_performance SET cumulative_return = ?, sp500_cumulative_return = ?, rolling_win_rate = ? "
+        "WHERE record_date = ?",
+        updates,
+    )
+
+
+class DailyPerformance:
+    """
+    Daily aggregates of the evaluated picks, kept in SQLite for the Evaluation tab.
+
+    daily_evaluations counts the picks of each record_date by action and evaluation.
+    daily_performance has one row per record_date: the equal-weight return of its BUY picks,
+    the S&P 500 change of the same session, both compounded since the first date, and the
+    share of WINs over the last ROLLING_WIN_RATE_DATES dates. evaluate() refreshes the dates it
+    wrote, so readers get a few hundred rows instead of the whole history.
+    """
+
+    def __init__(self, db_client=None):
+        self.logger = logging.getLogger(__name__)
+        self.db_client = db_client or SQLiteClient()
+        migrate(self.db_client)
+
+    def refresh(self, dates=None):
+        """Recomputes the aggregates of `dates` (every date when None) in one transaction."""
+        raw = self.db_client.engine.raw_connection()
+        try:
+            connection = raw.driver_connection
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                refresh_daily_performance(connection, dates)
+                connection.execute("COMMIT")
+            except Exception:
+                connection.execute("ROLLBACK")
+                raise
+        finally:
+            raw.close()
+        self.logger.info(f"Refreshed daily performance for {'all' if dates is None else len(set(dates))} dates")
+
+    def daily(self):
+        """daily_performance rows, oldest first, as a DataFrame (None on error)."""
+        return self.db_client.query(
+            "SELECT record_date, picks, evaluated, wins, buys, buy_return, sp500_change, cumulative_return, "
+            "sp500_cumulative_return, rolling_win_rate FROM daily_performance ORDER BY record_date"
+        )
+
+    def evaluation_counts(self):
+        """Picks by action and evaluation over every date, as a DataFrame (None on error)."""
+        return self.db_client.query(
+            "SELECT action, evaluation, SUM(picks) AS picks FROM daily_evaluations GROUP BY action, evaluation"
+        )
+
+
+@lazy_singleton
+def get_daily_performance():
+    """Returns the process-wide reader of the daily aggregates, for the Gradio app."""
+    return DailyPerformance(get_app_client())
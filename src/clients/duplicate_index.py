@@ -0,0 +1,88 @@
+import threading
+import logging
+import numpy as np
+from src.clients.sqllite import SQLiteClient
+from src.clients.migrations import migrate
+from src.clients.article_store import article_id
+from src.utils.minhash import signature, band_keys, similarity
+
+TABLE = "article_minhash"
+
+# Estimated Jaccard similarity of descriptions (3-word shingles) above which two articles are the same story
+DUPLICATE_THRESHOLD = 0.6
+
+
+class NearDuplicateIndex:
+    """
+    Groups syndicated copies of a news story into clusters, offline.
+
+    Each article description gets a MinHash signature whose bands are LSH bucket keys; an article
+    that shares a bucket with a stored one and is at least `threshold` similar joins its cluster,
+    otherwise it starts a new cluster named after its own article id. Signatures and band keys are
+    persisted in SQLite and loaded into memory on first use, so lookups never touch the disk.
+    """
+
+    def __init__(self, db_client=None, threshold=DUPLICATE_THRESHOLD):
+        self.logger = logging.getLogger(__name__)
+        self.db_client = db_client or SQLiteClient()
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._signatures = None
+        self._clusters = None
+        self._buckets = None
+        migrate(self.db_client)
+
+    def _index(self, key, cluster, sig, keys):
+        self._signatures[key] = sig
+        self._clusters[key] = cluster
+        for band, bucket in enumerate(keys.tolist()):
+            self._buckets.setdefault((band, bucket), []).append(key)
+
+    def _load(self):
+        self._signatures, self._clusters, self._buckets = {}, {}, {}
+        stored = self.db_client.query(f"SELECT article_id, cluster_id, signature, bands FROM {TABLE}")
+        if stored is not None:
+            for key, cluster, sig, keys in stored.itertuples(index=False, name=None):
+                self._index(key, cluster, np.frombuffer(sig, dtype=np.uint32), np.frombuffer(keys, dtype=np.int64))
+        self.logger.info(f"Loaded {len(self._signatures)} article signatures")
+
+    def _match(self, sig, keys):
+        best, best_similarity = None, self.threshold
+        candidates = {candidate for band, key in enumerate(keys.tolist()) for candidate in self._buckets.get((band, key), ())}
+        for candidate in candidates:
+            score = similarity(sig, self._signatures[candidate])
+            if score >= best_similarity:
+                best, best_similarity = candidate, score
+        return best
+
+    def assign(self, articles):
+        """
+        Returns the cluster id of each article, indexing the ones not seen before.
+        Articles without a description are their own cluster.
+        """
+        with self._lock:
+            if self._signatures is None:
+                self._load()
+            clusters, new_rows = [], []
+            for article in articles:
+                key = article_id(article)
+                if key in self._clusters:
+                    clusters.append(self._clusters[key])
+                    continue
+                sig = signature(article.get("description"))
+                if sig is None:
+                    clusters.append(key)
+                    continue
+                keys = band_keys(sig)
+                match = self._match(sig, keys)
+                cluster = self._clusters[match] if match is not None else key
+
+                self._index(key, cluster, sig, keys)
+                new_rows.append((key, cluster, sig.tobytes(), keys.tobytes()))
+                clusters.append(cluster)
+
+        if new_rows:
+            self.db_client.execute_query(
+                f"INSERT OR IGNORE INTO {TABLE} (article_id, cluster_id, signature, bands) VALUES (?, ?, ?, ?)", new_rows
+            )
+        return clusters
@@ -0,0 +1,52 @@
+import os
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from src.utils.disk_cache import DiskCache, CACHE_DIR, make_key
+from src.utils.cassette import is_active
+
+# Seconds a response stays fresh, per endpoint. Keys are AlphaVantage functions or provider names.
+ENDPOINT_TTLS = {
+    "TOP_GAINERS_LOSERS": 5 * 60,
+    "INSIDER_TRANSACTIONS": 24 * 60 * 60,
+    "newsdata": 30 * 60,
+}
+DEFAULT_TTL = 15 * 60
+
+HTTP_CACHE_PATH = os.getenv("HTTP_CACHE_PATH", os.path.join(CACHE_DIR, "http_cache.db"))
+HTTP_CACHE_MAX_ENTRIES = int(os.getenv("HTTP_CACHE_MAX_ENTRIES", 5000))
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def pooled_session(pool_maxsize=10):
+    """Returns a requests.Session that keeps up to `pool_maxsize` connections per host alive."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_maxsize)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_response_cache():
+    """
+    Returns the process-wide on-disk response cache, or None when disabled
+    with HTTP_CACHE_DISABLED=1 or while a cassette records or replays.
+    """
+    global _cache
+    if os.getenv("HTTP_CACHE_DISABLED") == "1" or is_active():
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = DiskCache(HTTP_CACHE_PATH, max_entries=HTTP_CACHE_MAX_ENTRIES, table="responses")
+        return _cache
+
+
+def response_key(endpoint, params):
+    """Cache key for a request. API keys are left out so rotating a key keeps the cache valid."""
+    return make_key(endpoint, {k: v for k, v in params.items() if k != "apikey"})
+
+
+def endpoint_ttl(endpoint):
+    return ENDPOINT_TTLS.get(endpoint, DEFAULT_TTL)
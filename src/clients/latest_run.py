@@ -0,0 +1,65 @@
+import sqlite3
+import threading
+import logging
+from src.clients.sqllite import SQLiteClient, get_app_client
+from src.clients.migrations import migrate
+from src.utils.lazy import lazy_singleton
+
+TABLE = "latest_run"
+
+
+class LatestRun:
+    """
+    In-memory snapshot of the newest run's picks, for the picks and passes tabs.
+
+    The latest_run table is kept current by triggers on `data`, so it only ever holds the rows
+    of the newest record_date. Like QueryCache, the snapshot reads PRAGMA data_version on a
+    connection of its own and reloads that small table whenever another connection has committed
+    since (new rows or edits alike); lookups are then dictionary reads.
+    """
+
+    def __init__(self, db_client=None):
+        self.logger = logging.getLogger(__name__)
+        self.db_client = db_client or SQLiteClient()
+        self._lock = threading.Lock()
+        self._conn = None
+        self._version = None
+        self._by_ticker = {}
+        self._by_action = {}
+        migrate(self.db_client)
+
+    def _load(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_client.db_path, check_same_thread=False)
+        # Read before the rows: a write in between only causes one more reload
+        version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if version == self._version:
+            return
+        rows = self.db_client.query(f"SELECT ticker, action, explanation, previous_close, record_date FROM {TABLE} ORDER BY id")
+        if rows is None:
+            return
+        self._by_ticker = {row["ticker"]: row for row in rows.to_dict("records")}
+        self._by_action = {}
+        for row in self._by_ticker.values():
+            self._by_action.setdefault(row["action"], []).append(row["ticker"])
+        self._version = version
+        self.logger.info(f"Loaded {len(self._by_ticker)} picks of the latest run")
+
+    def tickers(self, action):
+        """Tickers given `action` (BUY, HOLD, SELL) in the latest run, in the order they were written."""
+        with self._lock:
+            self._load()
+            return list(self._by_action.get(action, []))
+
+    def get(self, ticker):
+        """The latest run's row for `ticker` (ticker, action, explanation, previous_close, record_date), or None."""
+        with self._lock:
+            self._load()
+            row = self._by_ticker.get(ticker)
+            return dict(row) if row is not None else None
+
+
+@lazy_singleton
+def get_latest_run():
+    """Returns the process-wide latest run snapshot, for the Gradio app."""
+    return LatestRun(get_app_client())
@@ -0,0 +1,213 @@
+"""
+Versioned schema of the SQLite database (main.db).
+
+The schema version is kept in PRAGMA user_version. Each migration runs once, in order, in its
+own transaction together with the version bump, so a failed migration leaves the database at
+the previous version. New tables or columns are added as a new migration at the end of
+MIGRATIONS; applied migrations are never edited.
+
+    python db_management.py            # upgrade main.db to the latest version
+    python db_management.py --status   # show the current version and pending migrations
+"""
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+DATA_COLUMNS = (
+    "id INTEGER PRIMARY KEY, ticker TEXT, action TEXT, explanation TEXT, record_date DATE, "
+    "article_links_and_sentiments TEXT, previous_close REAL, current_close REAL, percent_change REAL, "
+    '"s&p500_percent_change" REAL, evaluation TEXT'
+)
+
+# Rows the evaluator still has to fill in; the partial index below holds only these
+PENDING_CONDITION = "current_close IS NULL OR percent_change IS NULL OR evaluation IS NULL"
+
+
+def _table_exists(connection, table):
+    return connection.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone() is not None
+
+
+def _columns(connection, table):
+    return {row[1] for row in connection.execute(f"PRAGMA table_info({table})")}
+
+
+def _real(column):
+    return f"CAST(NULLIF(TRIM({column}), '') AS REAL)"
+
+
+def _typed_data(connection):
+    """Creates `data` with INTEGER/REAL/DATE columns, converting an existing all-TEXT table in place."""
+    if not _table_exists(connection, "data"):
+        connection.execute(f"CREATE TABLE data ({DATA_COLUMNS})")
+        return
+    # Ids were never filled in by the pipeline, so every row keeps its rowid as its id
+    connection.execute(f"CREATE TABLE data_typed ({DATA_COLUMNS})")
+    prices = ", ".join(_real(column) for column in ("previous_close", "current_close", "percent_change", '"s&p500_percent_change"'))
+    connection.execute(
+        "INSERT INTO data_typed (id, ticker, action, explanation, record_date, article_links_and_sentiments, "
+        'previous_close, current_close, percent_change, "s&p500_percent_change", evaluation) '
+        "SELECT rowid, ticker, action, explanation, COALESCE(date(record_date), record_date), article_links_and_sentiments, "
+        f"{prices}, evaluation FROM data ORDER BY rowid"
+    )
+    connection.execute("DROP TABLE data")
+    connection.execute("ALTER TABLE data_typed RENAME TO data")
+
+
+def _articles(connection):
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS articles ("
+        "article_id TEXT PRIMARY KEY, link TEXT, title TEXT, description TEXT, pubDate TEXT, first_seen TEXT, cluster_id TEXT)"
+    )
+    # Databases that stored articles before near-duplicate clustering lack cluster_id
+    if "cluster_id" not in _columns(connection, "articles"):
+        connection.execute("ALTER TABLE articles ADD COLUMN cluster_id TEXT")
+    connection.execute("CREATE INDEX IF NOT EXISTS idx_articles_cluster_id ON articles (cluster_id)")
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS article_sentiment ("
+        "article_id TEXT NOT NULL, ticker TEXT NOT NULL, prompt_version TEXT NOT NULL, model TEXT, "
+        "sentiment TEXT, explanation TEXT, scored_at TEXT, PRIMARY KEY (article_id, ticker, prompt_version))"
+    )
+
+
+# Refills latest_run with the rows of the newest record_date (the same ticker twice keeps the later row)
+LATEST_RUN_REBUILD = (
+    "DELETE FROM latest_run",
+    "INSERT OR REPLACE INTO latest_run (ticker, id, action, explanation, previous_close, record_date) "
+    "SELECT ticker, id, action, explanation, previous_close, record_date FROM data "
+    "WHERE record_date = (SELECT MAX(record_date) FROM data) ORDER BY id",
+)
+_LATEST_RUN_REBUILD_BODY = " ".join(f"{statement};" for statement in LATEST_RUN_REBUILD)
+
+
+# Daily aggregates as of version 8, backfilled from the picks evaluated so far; evaluate() keeps them
+# current from then on through src.clients.daily_performance
+DAILY_PERFORMANCE = [
+    "CREATE TABLE IF NOT EXISTS daily_evaluations ("
+    "record_date DATE NOT NULL, action TEXT, evaluation TEXT, picks INTEGER NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS idx_daily_evaluations_record_date ON daily_evaluations (record_date)",
+    "CREATE TABLE IF NOT EXISTS daily_performance ("
+    "record_date DATE PRIMARY KEY, picks INTEGER, evaluated INTEGER, wins INTEGER, buys INTEGER, "
+    "buy_return REAL, sp500_change REAL, cumulative_return REAL, sp500_cumulative_return REAL, rolling_win_rate REAL)",
+    "INSERT INTO daily_evaluations (record_date, action, evaluation, picks) "
+    "SELECT record_date, action, evaluation, COUNT(*) FROM data "
+    "WHERE evaluation IS NOT NULL OR percent_change IS NOT NULL GROUP BY record_date, action, evaluation",
+    "INSERT INTO daily_performance (record_date, picks, evaluated, wins, buys, buy_return, sp500_change) "
+    "SELECT record_date, COUNT(*), SUM(evaluation IS NOT NULL), SUM(evaluation = 'WIN'), "
+    "SUM(action = 'BUY' AND percent_change IS NOT NULL), AVG(CASE WHEN action = 'BUY' THEN percent_change END), "
+    'AVG("s&p500_percent_change") FROM data WHERE evaluation IS NOT NULL OR percent_change IS NOT NULL GROUP BY record_date',
+    # Dates numbered in order, with the win rate over the last 20 of them
+    "CREATE TEMP TABLE daily_performance_backfill ("
+    "n INTEGER PRIMARY KEY, record_date DATE, buy_return REAL, sp500_change REAL, rolling_win_rate REAL)",
+    "INSERT INTO daily_performance_backfill "
+    "SELECT ROW_NUMBER() OVER (ORDER BY record_date), record_date, buy_return, sp500_change, "
+    "100.0 * SUM(COALESCE(wins, 0)) OVER last_dates / NULLIF(SUM(COALESCE(evaluated, 0)) OVER last_dates, 0) "
+    "FROM daily_performance WINDOW last_dates AS (ORDER BY record_date ROWS 19 PRECEDING)",
+    # Returns compounded in date order; days without BUY picks or S&P 500 data count as flat
+    "WITH RECURSIVE compounded (n, record_date, growth, sp500_growth, rolling_win_rate) AS ("
+    "SELECT 0, NULL, 1.0, 1.0, NULL "
+    "UNION ALL "
+    "SELECT b.n, b.record_date, c.growth * (1 + COALESCE(b.buy_return, 0) / 100.0), "
+    "c.sp500_growth * (1 + COALESCE(b.sp500_change, 0) / 100.0), b.rolling_win_rate "
+    "FROM compounded c JOIN daily_performance_backfill b ON b.n = c.n + 1) "
+    "UPDATE daily_performance SET cumulative_return = (compounded.growth - 1) * 100, "
+    "sp500_cumulative_return = (compounded.sp500_growth - 1) * 100, rolling_win_rate = compounded.rolling_win_rate "
+    "FROM compounded WHERE compounded.record_date = daily_performance.record_date",
+    "DROP TABLE temp.daily_performance_backfill",
+]
+
+
+# (version, description, statements or a function taking the sqlite3 connection)
+MIGRATIONS = [
+    (1, "typed data table", _typed_data),
+    (2, "data indexes", [
+        "CREATE INDEX IF NOT EXISTS idx_data_record_date_action ON data (record_date, action)",
+        "CREATE INDEX IF NOT EXISTS idx_data_ticker_record_date ON data (ticker, record_date)",
+        f"CREATE INDEX IF NOT EXISTS idx_data_pending ON data (record_date) WHERE {PENDING_CONDITION}",
+    ]),
+    (3, "benchmark prices", [
+        "CREATE TABLE IF NOT EXISTS benchmark_prices ("
+        "symbol TEXT NOT NULL, date DATE NOT NULL, close REAL NOT NULL, PRIMARY KEY (symbol, date))",
+    ]),
+    (4, "articles and their sentiment", _articles),
+    (5, "article near-duplicate signatures", [
+        "CREATE TABLE IF NOT EXISTS article_minhash ("
+        "article_id TEXT PRIMARY KEY, cluster_id TEXT NOT NULL, signature BLOB NOT NULL, bands BLOB NOT NULL)",
+    ]),
+    (6, "run metrics", [
+        "CREATE TABLE IF NOT EXISTS run_metrics ("
+        "run_id TEXT NOT NULL, run_name TEXT NOT NULL, stage TEXT NOT NULL, ticker TEXT, started_at TEXT NOT NULL, "
+        "duration_ms REAL NOT NULL, tokens_in INTEGER, tokens_out INTEGER, retries INTEGER, cache_hits INTEGER, status TEXT)",
+        "CREATE INDEX IF NOT EXISTS idx_run_metrics_run ON run_metrics (run_name, stage, started_at)",
+    ]),
+    (7, "latest run snapshot", [
+        "CREATE TABLE IF NOT EXISTS latest_run ("
+        "ticker TEXT PRIMARY KEY, id INTEGER, action TEXT, explanation TEXT, previous_close REAL, record_date DATE)",
+        *LATEST_RUN_REBUILD,
+        # New picks replace the snapshot once a newer record_date arrives, and join it for the same date
+        "CREATE TRIGGER IF NOT EXISTS data_latest_run_insert AFTER INSERT ON data "
+        "WHEN NEW.record_date >= COALESCE((SELECT MAX(record_date) FROM latest_run), NEW.record_date) "
+        "BEGIN "
+        "DELETE FROM latest_run WHERE record_date < NEW.record_date; "
+        "INSERT OR REPLACE INTO latest_run (ticker, id, action, explanation, previous_close, record_date) "
+        "VALUES (NEW.ticker, NEW.id, NEW.action, NEW.explanation, NEW.previous_close, NEW.record_date); "
+        "END",
+        f"CREATE TRIGGER IF NOT EXISTS data_latest_run_update AFTER UPDATE OF ticker, action, explanation, previous_close, record_date ON data "
+        f"BEGIN {_LATEST_RUN_REBUILD_BODY} END",
+        f"CREATE TRIGGER IF NOT EXISTS data_latest_run_delete AFTER DELETE ON data BEGIN {_LATEST_RUN_REBUILD_BODY} END",
+    ]),
+    (8, "daily performance aggregates", DAILY_PERFORMANCE),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+# Databases already upgraded by this process, by path
+_upgraded = set()
+_upgrade_lock = threading.Lock()
+
+
+def current_version(db_client):
+    with db_client.engine.connect() as connection:
+        return connection.exec_driver_sql("PRAGMA user_version").scalar()
+
+
+def pending_migrations(db_client):
+    version = current_version(db_client)
+    return [(number, description) for number, description, _ in MIGRATIONS if number > version]
+
+
+def migrate(db_client, target=LATEST_VERSION):
+    """
+    Applies the migrations the database behind `db_client` is missing, up to `target`.
+    Cheap after the first call per database in a process. Returns the resulting version.
+    """
+    with _upgrade_lock:
+        if target == LATEST_VERSION and db_client.db_path in _upgraded:
+            return LATEST_VERSION
+        raw = db_client.engine.raw_connection()
+        try:
+            connection = raw.driver_connection
+            version = connection.execute("PRAGMA user_version").fetchone()[0]
+            for number, description, steps in MIGRATIONS:
+                if number <= version or number > target:
+                    continue
+                connection.execute("BEGIN IMMEDIATE")
+                try:
+                    if callable(steps):
+                        steps(connection)
+                    else:
+                        for statement in steps:
+                            connection.execute(statement)
+                    connection.execute(f"PRAGMA user_version = {number}")
+                    connection.execute("COMMIT")
+                except Exception:
+                    connection.execute("ROLLBACK")
+                    logger.error(f"Migration {number} ({description}) failed on {db_client.db_path}")
+                    raise
+                version = number
+                logger.info(f"Applied migration {number} ({description}) to {db_client.db_path}")
+        finally:
+            raw.close()
+        if version == LATEST_VERSION:
+            _upgraded.add(db_client.db_path)
+        return version
@@ -1,15 +1,21 @@
 import requests
 import os
+from src.clients.rate_limiter import get_limiter, RateLimitExceeded
+from src.clients.http_cache import pooled_session, get_response_cache, response_key, endpoint_ttl
+from src.utils import tracing
 
 class NewsDataClient:
-    def __init__(self):
+    def __init__(self, session=None, cache=None):
         self.api_key = os.getenv("NEWSDATA_API")
         if not self.api_key:
             raise ValueError("NEWSDATA_API environment variable or api_key argument must be set.")
         self.base_url = "https://newsdata.io/api/1/news"
+        self.limiter = get_limiter("newsdata")
+        self.session = session or pooled_session()
+        self.cache = cache if cache is not None else get_response_cache()
 
     def get_ticker_news_summaries(self, ticker, num_articles=3):
-        """Gets news summaries for a ticker."""
+        """Gets news summaries for a ticker. num_articles=None returns every article with a long enough description."""
 
         query = f"{ticker} news"  # Construct the query
 
@@ -21,13 +27,21 @@ class NewsDataClient:
         }
 
         try:
-            response = requests.get(self.base_url, params=params)
-            response.raise_for_status()  # Raise HTTPError for bad responses (4xx or 5xx)
-            data = response.json()
+            cache_key = response_key("newsdata", params)
+            data = self.cache.get(cache_key) if self.cache is not None else None
+            if data is not None:
+                tracing.add("cache_hits")
+            else:
+                response = self.limiter.request("GET", self.base_url, key=self.api_key, session=self.session, params=params)
+                response.raise_for_status()  # Raise HTTPError for bad responses (4xx or 5xx)
+                data = response.json()
 
-            if data.get("status") != "success":
-                print(f"Error with the news API call: {data.get('message')}")
-                return []
+                if data.get("status") != "success":
+                    print(f"Error with the news API call: {data.get('message')}")
+                    return []
+
+                if self.cache is not None:
+                    self.cache.set(cache_key, data, ttl=endpoint_ttl("newsdata"))
 
             results = data.get('results', [])
 
@@ -43,6 +57,9 @@ class NewsDataClient:
             print(f"Error fetching news: {e}")
             return []
 
+        except RateLimitExceeded:
+            raise  # Don't let throttling pass for "no news"
+
         except Exception as e: # Catch any other errors
             print(f"An unexpected error occurred: {e}")
             return []
@@ -0,0 +1,143 @@
+import os
+import time
+import logging
+import threading
+from src.clients.yahoo import get_latest_prices
+from src.utils.lazy import lazy_singleton
+
+# Seconds a quote is served as fresh; watched tickers are refreshed in the background at half of it
+QUOTE_TTL_SECONDS = float(os.getenv("QUOTE_TTL_SECONDS", "60"))
+# Background refreshes stop after this many seconds without a request, until the next one
+QUOTE_IDLE_SECONDS = float(os.getenv("QUOTE_IDLE_SECONDS", "600"))
+# Longest a request waits for a quote that is not in memory yet
+QUOTE_WAIT_SECONDS = float(os.getenv("QUOTE_WAIT_SECONDS", "10"))
+
+
+class QuoteService:
+    """
+    Latest prices for the UI, served from memory.
+
+    Tickers passed to watch() are fetched in one bulk request and kept fresh by a background
+    thread, one bulk request per refresh for all of them, while the UI is in use. Each watch()
+    replaces the tickers of its group (e.g. a tab's action), so only the current lists are kept;
+    tickers asked for through get() alone are dropped, with their quotes, once nobody has asked
+    for them in `idle` seconds. A quote older than the TTL is still returned right away while
+    its refresh runs. Quotes not in memory at all are fetched once however many requests ask for
+    them at the same time, so Yahoo traffic does not grow with the number of viewers or uptime.
+    """
+
+    def __init__(self, ttl=QUOTE_TTL_SECONDS, idle=QUOTE_IDLE_SECONDS, fetch=get_latest_prices, clock=time.monotonic):
+        self.logger = logging.getLogger(__name__)
+        self.ttl = ttl
+        self.idle = idle
+        self._fetch_prices = fetch
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._quotes = {}  # ticker -> (price, fetched at)
+        self._pending = {}  # ticker -> Event set when its fetch in flight completes
+        self._watched = {}  # group -> tickers
+        self._requested = {}  # ticker -> last get(), for tickers outside the watched groups
+        self._last_request = self._clock()
+        self._wake = threading.Event()
+        self._refresher = None
+        self.stats = {"fresh": 0, "stale": 0, "missed": 0, "fetches": 0}
+
+    def _fetch(self, tickers, timeout=QUOTE_WAIT_SECONDS):
+        """Fetches `tickers` in one request, joining fetches already in flight instead of repeating them."""
+        with self._lock:
+            waiting = {self._pending[ticker] for ticker in tickers if ticker in self._pending}
+            todo = [ticker for ticker in dict.fromkeys(tickers) if ticker not in self._pending]
+            done = threading.Event()
+            for ticker in todo:
+                self._pending[ticker] = done
+            if todo:
+                self.stats["fetches"] += 1
+        if todo:
+            try:
+                prices = self._fetch_prices(todo)
+                fetched_at = self._clock()
+                with self._lock:
+                    self._quotes.update({ticker: (prices.get(ticker), fetched_at) for ticker in todo})
+            except Exception as e:
+                self.logger.error(f"Error fetching quotes for {len(todo)} tickers: {e}")
+            finally:
+                with self._lock:
+                    for ticker in todo:
+                        self._pending.pop(ticker, None)
+                done.set()
+        for event in waiting:
+            event.wait(timeout)
+
+    def _start_refresher(self):
+        if self._refresher is None:
+            self._refresher = threading.Thread(target=self._refresh_loop, name="quote-refresh", daemon=True)
+            self._refresher.start()
+
+    def _kept(self, now):
+        """Watched tickers and the ones requested within the idle time; drops every other ticker and quote. Holds the lock."""
+        self._requested = {ticker: at for ticker, at in self._requested.items() if now - at <= self.idle}
+        kept = set(self._requested).union(*self._watched.values())
+        self._quotes = {ticker: quote for ticker, quote in self._quotes.items() if ticker in kept}
+        return kept
+
+    def _refresh_loop(self):
+        while True:
+            self._wake.wait(self.ttl / 2)
+            self._wake.clear()
+            self.refresh()
+
+    def refresh(self):
+        """One refresh pass of the background thread: refetches the kept tickers due for it, in one request."""
+        now = self._clock()
+        with self._lock:
+            if now - self._last_request > self.idle:
+                return
+            due = [
+                ticker for ticker in self._kept(now)
+                if ticker not in self._quotes or now - self._quotes[ticker][1] >= self.ttl / 2
+            ]
+        if due:
+            self._fetch(due)
+
+    def watch(self, tickers, group=None):
+        """
+        Keeps `tickers` fresh from now on, in place of the tickers last watched for `group`;
+        the ones not in memory are fetched in the background, in one request.
+        """
+        with self._lock:
+            self._watched[group] = set(tickers)
+            self._last_request = now = self._clock()
+            self._kept(now)
+            self._start_refresher()
+        self._wake.set()
+
+    def get(self, ticker):
+        """The latest price of `ticker`, or None when Yahoo has none."""
+        with self._lock:
+            self._last_request = now = self._clock()
+            self._requested[ticker] = now
+            quote = self._quotes.get(ticker)
+            if quote is not None and now - quote[1] < self.ttl:
+                self.stats["fresh"] += 1
+                return quote[0]
+            self.stats["stale" if quote is not None else "missed"] += 1
+            self._start_refresher()
+        if quote is not None:
+            self._wake.set()
+            return quote[0]
+        self._fetch([ticker])
+        with self._lock:
+            quote = self._quotes.get(ticker)
+        return quote[0] if quote is not None else None
+
+    def cached(self, ticker):
+        """The last price fetched for `ticker`, however old, or None; never waits on Yahoo."""
+        with self._lock:
+            quote = self._quotes.get(ticker)
+        return quote[0] if quote is not None else None
+
+
+@lazy_singleton
+def get_quote_service():
+    """Returns the process-wide quote service."""
+    return QuoteService()
@@ -0,0 +1,230 @@
+import os
+import random
+import threading
+import time
+import logging
+import requests
+from src.utils.cassette import recorded, is_replaying, http_key, encode_response, decode_response
+from src.utils import tracing
+
+logger = logging.getLogger(__name__)
+
+# HTTP statuses worth retrying: throttling and transient server errors.
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Default limits per provider. Rates are requests per minute, burst is the bucket size.
+# The free AlphaVantage tier allows 5 requests/minute, NewsData 30 credits per 15 minutes.
+PROVIDER_LIMITS = {
+    "alphavantage": {"requests_per_minute": float(os.getenv("ALPHA_VANTAGE_RPM", 5)), "burst": 5, "max_concurrent": 2},
+    "newsdata": {"requests_per_minute": float(os.getenv("NEWSDATA_RPM", 2)), "burst": 30, "max_concurrent": 2},
+    "yahoo": {"requests_per_minute": float(os.getenv("YAHOO_RPM", 60)), "burst": 10, "max_concurrent": 4},
+}
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a provider keeps throttling (or failing) after all retries are used up."""
+
+
+class TokenBucket:
+    """Thread-safe token bucket. `rate` is tokens per second, `capacity` the maximum burst."""
+
+    def __init__(self, rate, capacity, clock=time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._tokens = capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """Takes one token and returns how many seconds the caller must wait before using it."""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+
+class RateLimiter:
+    """
+    Throttles calls to one provider: a token bucket per API key, a cap on concurrent
+    in-flight calls, and exponential backoff with full jitter that honors Retry-After.
+
+    `is_throttled(response)` flags provider-specific throttling worth retrying;
+    `is_exhausted(response)` flags a quota that retrying cannot help with (e.g. a daily cap).
+    """
+
+    def __init__(self, name, requests_per_minute=60, burst=1, max_concurrent=4, max_retries=4,
+                 backoff_base=1.0, backoff_max=60.0, timeout=30, is_throttled=None,
+                 is_exhausted=None, sleep=time.sleep, rng=None):
+        self.name = name
+        self.rate = requests_per_minute / 60.0
+        self.burst = burst
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.is_throttled = is_throttled
+        self.is_exhausted = is_exhausted
+        self._sleep = sleep
+        self._rng = rng or random.Random()
+        self._buckets = {}
+        self._buckets_lock = threading.Lock()
+        self._semaphore = threading.BoundedSemaphore(max_concurrent)
+        self._counters = {"requests": 0, "retries": 0, "throttled_waits": 0, "failures": 0}
+        self._counters_lock = threading.Lock()
+
+    def _count(self, counter, amount=1):
+        with self._counters_lock:
+            self._counters[counter] += amount
+        if counter == "retries":
+            tracing.add("retries", amount)
+
+    def stats(self):
+        """Returns a copy of the request, retry, throttled wait and failure counters."""
+        with self._counters_lock:
+            return dict(self._counters)
+
+    def _bucket(self, key):
+        with self._buckets_lock:
+            if key not in self._buckets:
+                self._buckets[key] = TokenBucket(self.rate, self.burst)
+            return self._buckets[key]
+
+    def _wait_for_token(self, key):
+        if is_replaying():
+            return  # Recorded responses are not subject to provider quotas
+        wait = self._bucket(key).reserve()
+        if wait > 0:
+            self._count("throttled_waits")
+            logger.debug(f"{self.name}: waiting {wait:.2f}s for rate limit token")
+            self._sleep(wait)
+
+    def _backoff(self, attempt, retry_after=None):
+        """Seconds to sleep before retry number `attempt` (0-based)."""
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        return self._rng.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    @staticmethod
+    def _retry_after(response):
+        value = response.headers.get("Retry-After")
+        if value is None:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            return None  # HTTP-date form is not used by our providers
+
+    def request(self, method, url, key=None, session=None, **kwargs):
+        """
+        Sends an HTTP request through the limiter and returns the `requests.Response`.
+
+        Retries throttled (429 or provider-specific), transient 5xx and connection errors.
+        Raises RateLimitExceeded when the provider is still throttling after the last retry, or
+        right away when its quota is exhausted; other failures surface as the usual `requests` exceptions.
+        """
+        http = session or requests
+        kwargs.setdefault("timeout", self.timeout)
+        for attempt in range(self.max_retries + 1):
+            self._wait_for_token(key)
+            try:
+                with self._semaphore:
+                    self._count("requests")
+                    route, key_parts = http_key(method, url, kwargs)
+                    response = recorded(
+                        "http", route, key_parts, lambda: http.request(method, url, **kwargs),
+                        encode=encode_response, decode=decode_response,
+                    )
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if attempt == self.max_retries:
+                    self._count("failures")
+                    raise
+                delay = self._backoff(attempt)
+                logger.warning(f"{self.name}: {e}; retrying in {delay:.2f}s")
+            else:
+                if self.is_exhausted is not None and self.is_exhausted(response):
+                    self._count("failures")
+                    raise RateLimitExceeded(f"{self.name}: quota exhausted, not retrying")
+                throttled = response.status_code == 429 or (self.is_throttled is not None and self.is_throttled(response))
+                if not throttled and response.status_code not in RETRY_STATUSES:
+                    return response
+                if attempt == self.max_retries:
+                    self._count("failures")
+                    if throttled:
+                        raise RateLimitExceeded(f"{self.name}: still throttled after {self.max_retries} retries")
+                    return response  # Caller's raise_for_status reports the 5xx
+                delay = self._backoff(attempt, self._retry_after(response))
+                logger.warning(f"{self.name}: HTTP {response.status_code}{' (throttled)' if throttled else ''}; retrying in {delay:.2f}s")
+            self._count("retries")
+            self._sleep(delay)
+
+    def call(self, fn, *args, key=None, retry_on=(), **kwargs):
+        """
+        Runs a non-HTTP call (e.g. yfinance) through the limiter.
+        Exceptions listed in `retry_on` are treated as throttling and retried with backoff.
+        """
+        for attempt in range(self.max_retries + 1):
+            self._wait_for_token(key)
+            try:
+                with self._semaphore:
+                    self._count("requests")
+                    return fn(*args, **kwargs)
+            except retry_on as e:
+                if attempt == self.max_retries:
+                    self._count("failures")
+                    raise RateLimitExceeded(f"{self.name}: still throttled after {self.max_retries} retries") from e
+                delay = self._backoff(attempt)
+                logger.warning(f"{self.name}: {e}; retrying in {delay:.2f}s")
+            self._count("retries")
+            self._sleep(delay)
+
+
+def _alphavantage_message(response):
+    """AlphaVantage reports limits with HTTP 200 and a 'Note'/'Information' message instead of data."""
+    try:
+        data = response.json()
+    except ValueError:
+        return ""
+    if not isinstance(data, dict):
+        return ""
+    return str(data.get("Note") or data.get("Information") or "").lower()
+
+
+def _alphavantage_exhausted(response):
+    """The daily quota ("... 25 requests per day ...") only resets the next day."""
+    message = _alphavantage_message(response)
+    return "per day" in message or "daily" in message
+
+
+def _alphavantage_throttled(response):
+    """The per-minute limit, which clears after a short wait."""
+    message = _alphavantage_message(response)
+    return "frequency" in message or "rate limit" in message
+
+
+_PROVIDER_HOOKS = {
+    "alphavantage": {"is_throttled": _alphavantage_throttled, "is_exhausted": _alphavantage_exhausted},
+}
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(provider):
+    """Returns the process-wide RateLimiter for a provider, creating it on first use."""
+    with _limiters_lock:
+        if provider not in _limiters:
+            settings = {**PROVIDER_LIMITS.get(provider, {}), **_PROVIDER_HOOKS.get(provider, {})}
+            _limiters[provider] = RateLimiter(provider, **settings)
+        return _limiters[provider]
+
+
+def all_stats():
+    """Returns the counters of every limiter created so far, keyed by provider."""
+    with _limiters_lock:
+        limiters = dict(_limiters)
+    return {provider: limiter.stats() for provider, limiter in limiters.items()}
@@ -1,41 +1,153 @@
 import os
-import pandas as pd
-from sqlalchemy import create_engine, Column, Integer, String, Float, Date, MetaData, Table, Index
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
 import logging
+from src.utils.disk_cache import make_key
+from src.utils.lazy import lazy_singleton
+
+# Database used when no path is given; relative paths are resolved from the repository root
+DEFAULT_DB_PATH = os.getenv("SQLITE_DB_PATH", "main.db")
+
+# Bounds of the optional query result cache (per client)
+QUERY_CACHE_MAX_ENTRIES = int(os.getenv("QUERY_CACHE_MAX_ENTRIES", "256"))
+QUERY_CACHE_MAX_BYTES = int(os.getenv("QUERY_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+# Quoted SQL literals and identifiers, left untouched when normalizing whitespace
+_QUOTED = re.compile(r"""('(?:[^']|'')*'|"(?:[^"]|"")*")""")
+
+
+def normalize_sql(query):
+    """Collapses whitespace outside quoted strings, so reformatted copies of a query share a cache entry."""
+    parts = _QUOTED.split(query.strip().rstrip(";").strip())
+    return "".join(part if index % 2 else re.sub(r"\s+", " ", part) for index, part in enumerate(parts))
+
+
+class QueryCache:
+    """
+    LRU cache of query results (DataFrames), bounded by entry count and memory.
+
+    Every lookup reads PRAGMA data_version on a connection of its own, which changes whenever any
+    other connection (this process or another one) commits to the database; the cache is then
+    emptied. Between writes, cached queries never touch the database tables.
+    """
+
+    def __init__(self, db_path, max_entries=QUERY_CACHE_MAX_ENTRIES, max_bytes=QUERY_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.db_path = db_path
+        self._conn = None
+        self._version = None
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self.stats = {"hits": 0, "misses": 0, "invalidations": 0, "evictions": 0}
+
+    def _check_version(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._version = None
+        version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if version != self._version:
+            if self._entries:
+                self.stats["invalidations"] += 1
+            self._entries.clear()
+            self._bytes = 0
+            self._version = version
+
+    def get(self, key):
+        """Returns (a copy of the cached result or None, the data version it is valid for)."""
+        with self._lock:
+            self._check_version()
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None, self._version
+            self._entries.move_to_end(key)
+            df, version = entry[0], self._version
+            self.stats["hits"] += 1
+        return df.copy(), version
+
+    def put(self, key, df, version):
+        """Stores a result read at `version`, unless the database has changed since."""
+        size = int(df.memory_usage(index=True, deep=True).sum())
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if version != self._version:
+                return
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (df.copy(), size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.stats["evictions"] += 1
+
+    def close(self):
+        """Empties the cache and closes its connection; the next lookup reopens it."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
 
 class SQLiteClient:
-    def __init__(self, db_path="main.db"):
+    def __init__(self, db_path=None, cache_queries=False):
+        """
+        With `cache_queries`, query() results are kept in a QueryCache until the database changes,
+        for read-mostly callers such as the Gradio app. Callers get their own copy of each result.
+        """
+        # SQLAlchemy and pandas are imported by the first client, not by modules importing this one
+        from sqlalchemy import create_engine
+
         self.logger = logging.getLogger(__name__)
+        db_path = db_path or DEFAULT_DB_PATH
         self.db_path = os.path.abspath(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), db_path))
         self.engine = create_engine(f'sqlite:///{self.db_path}')
-        self.metadata = MetaData()
+        self.query_cache = QueryCache(self.db_path) if cache_queries else None
         self.logger.info(f"SQLiteClient initialized with database: {self.db_path}")
 
-    def query(self, query):
+    def query(self, query, params=None):
+        import pandas as pd
+
+        key = None
+        if self.query_cache is not None:
+            key = make_key(normalize_sql(query), params)
+            df, version = self.query_cache.get(key)
+            if df is not None:
+                return df
         try:
             self.logger.info(f"Executing query: {query}")
-            df = pd.read_sql_query(query, self.engine)
+            df = pd.read_sql_query(query, self.engine, params=params)
             self.logger.info("Query executed successfully.")
-            return df
         except Exception as e:
             self.logger.error(f"Error executing query: {e}")
             return None
+        if key is not None:
+            self.query_cache.put(key, df, version)
+        return df
 
     def execute_query(self, query, params=None):
+        """Executes a statement with optional qmark params; a list of tuples runs it once per tuple (executemany)."""
         try:
             self.logger.info(f"Executing query: {query}")
-            with self.engine.connect() as connection:
-                print(f"Executing SQL: {query}") #print statement added.
+            with self.engine.begin() as connection:
                 if params:
-                    connection.execute(query, (params,))
+                    connection.exec_driver_sql(query, params)
                 else:
-                    connection.execute(query)
-                connection.commit()
+                    connection.exec_driver_sql(query)
             self.logger.info("Query executed successfully.")
         except Exception as e:
             self.logger.error(f"Error executing query: {e}")
 
     def close(self):
+        if self.query_cache is not None:
+            self.query_cache.close()
         self.engine.dispose()
         self.logger.info("SQLite connection closed.")
 
@@ -47,22 +159,36 @@ class SQLiteClient:
         except Exception as e:
             self.logger.error(f"Error appending DataFrame: {e}")
 
-    def create_table(self, table_name, columns):
-        try:
-            table_columns = [Column(name, col_type) for name, col_type in columns.items()]
-            table = Table(table_name, self.metadata, *table_columns)
-            self.metadata.create_all(self.engine)
-            self.logger.info(f"Table {table_name} created successfully.")
-            self.add_indexes(table_name, list(columns.keys()))
+    def update_rows(self, table_name, key, df):
+        """
+        Updates existing rows in one transaction with executemany.
 
+        Every column of `df` other than `key` is written to the row whose `key` matches;
+        other rows and columns are left untouched. NaN values are stored as NULL.
+        Returns the number of rows updated.
+        """
+        columns = [col for col in df.columns if col != key]
+        if df.empty or not columns:
+            return 0
+        assignments = ", ".join(f'"{col}" = ?' for col in columns)
+        sql = f'UPDATE "{table_name}" SET {assignments} WHERE "{key}" = ?'
+        values = df[columns + [key]].astype(object).where(df[columns + [key]].notna(), None)
+        params = [tuple(v.item() if hasattr(v, "item") else v for v in row) for row in values.itertuples(index=False)]
+        try:
+            self.logger.info(f"Updating {len(params)} rows in {table_name}")
+            with self.engine.begin() as connection:
+                updated = connection.exec_driver_sql(sql, params).rowcount
+            self.logger.info(f"Updated {updated} rows in {table_name} successfully.")
+            return updated
         except Exception as e:
-            self.logger.error(f"Error creating table {table_name}: {e}")
-
-    def add_indexes(self, table_name, columns):
-        for col in columns:
-            index_name = f"idx_{table_name}_{col}"
-            try:
-                Index(index_name, Table(table_name, self.metadata, autoload_with=self.engine), Column(col)).create(self.engine)
-                self.logger.info(f"Index {index_name} created successfully.")
-            except Exception as e:
-                self.logger.error(f"Error creating index {index_name}: {e}")
\ No newline at end of file
+            self.logger.error(f"Error updating rows in {table_name}: {e}")
+            return 0
+
+
+@lazy_singleton
+def get_app_client():
+    """
+    The Gradio app's client on the default database, shared by its tabs. The app only reads,
+    so query results are cached (QueryCache) until another connection commits to the database.
+    """
+    return SQLiteClient(cache_queries=True)
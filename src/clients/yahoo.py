@@ -1,81 +1,156 @@
-import yfinance as yf
-import pandas as pd
+from src.clients.rate_limiter import get_limiter, RateLimitExceeded
+from src.utils.cassette import recorded
 
-def get_current_day_metrics(ticker):
+
+def _yfinance():
+    """yfinance, imported on first use since it is slow to import and the UI can start without it."""
+    import yfinance
+    return yfinance
+
+
+def _pandas():
+    """pandas, imported on first use for the same reason as yfinance."""
+    import pandas
+    return pandas
+
+
+def _retry_on():
+    try:
+        from yfinance.exceptions import YFRateLimitError
+        return (YFRateLimitError,)
+    except ImportError:  # Older yfinance releases have no dedicated rate limit exception
+        return ()
+
+
+def yahoo_call(fn, *args, **kwargs):
+    """Runs a yfinance call through the shared Yahoo rate limiter, retrying when Yahoo throttles."""
+    route = f"{fn.__module__}.{fn.__qualname__}"
+    return get_limiter("yahoo").call(
+        lambda: recorded("yahoo", route, [args, kwargs], lambda: fn(*args, **kwargs)),
+        retry_on=_retry_on(),
+    )
+
+def download_daily_bars(tickers, period="1y", **kwargs):
     """
-    Retrieves current day's metrics (Open, High, Low, Close, Volume), 200-day average,
-    and 52-week high and low.
+    Downloads daily OHLCV bars for several tickers in a single request.
 
     Args:
-        ticker (str): The stock ticker symbol (e.g., "AAPL", "MSFT").
+        tickers (list[str]): Ticker symbols.
+        period (str): yfinance period string (e.g. "5d", "1y"). Ignored if `start` is passed.
 
     Returns:
-        pandas.DataFrame: A DataFrame containing the current day's metrics, 200-day average,
-                          and 52-week high/low, or None if an error occurs.
-                          The DataFrame will only have one row (the current day).
-        Prints an error message if the ticker is invalid or data retrieval fails.
+        pandas.DataFrame: Bars indexed by date with (field, ticker) MultiIndex columns,
+                          e.g. bars['Close'] is a date x ticker frame. Unadjusted prices.
     """
-    try:
-        ticker_info = yf.Ticker(ticker).info
-
-        if not ticker_info:
-            print(f"No information found for ticker {ticker}.")
-            return None
-
-        # Extract relevant metrics from ticker_info
-        current_data = {
-            'Open': ticker_info.get('regularMarketOpen'),
-            'High': ticker_info.get('regularMarketDayHigh'),
-            'Low': ticker_info.get('regularMarketDayLow'),
-            'Close': ticker_info.get('regularMarketPrice'),
-            'Volume': ticker_info.get('regularMarketVolume'),
-            '52W_High': ticker_info.get('fiftyTwoWeekHigh'),
-            '52W_Low': ticker_info.get('fiftyTwoWeekLow'),
-            '200DayAverage': ticker_info.get('twoHundredDayAverage')
-        }
+    pd = _pandas()
 
-        return current_data
+    tickers = list(dict.fromkeys(tickers))
+    if "start" in kwargs:
+        period = None
+    bars = yahoo_call(
+        _yfinance().download, tickers, period=period, interval="1d", group_by="column",
+        auto_adjust=False, progress=False, threads=True, **kwargs
+    )
+    if not isinstance(bars.columns, pd.MultiIndex):
+        # Older yfinance releases return flat columns for a single ticker
+        bars = pd.concat({tickers[0]: bars}, axis=1).swaplevel(axis=1)
+    return bars
 
-    except Exception as e:
-        print(f"Error retrieving data for {ticker}: {e}")
-        return None
-    
-def get_sp500_percent_change(date):
+
+def _as_number(value):
+    """Converts NumPy scalars to plain Python numbers and NaN to None."""
+    pd = _pandas()
+
+    return None if pd.isna(value) else value.item() if hasattr(value, "item") else value
+
+
+def get_current_day_metrics_bulk(tickers):
     """
-    Calculates the percent change in the S&P 500 between the given date and the last market open day before it.
+    Retrieves the metrics of get_current_day_metrics for many tickers from one daily-bar download.
+
+    Open/High/Low/Close/Volume come from each ticker's latest bar, the 52-week high/low from
+    the past year of bars and the 200-day average from the last 200 closes.
 
     Args:
-        date (str or pandas.Timestamp): The date for which to calculate the S&P 500 percent change.
+        tickers (list[str]): Ticker symbols.
 
     Returns:
-        float or None: The percent change in the S&P 500, or None if data retrieval fails.
+        dict: {ticker: metrics dict}, with None for tickers without data.
     """
+    pd = _pandas()
+
     try:
-        date = pd.to_datetime(date)  # Ensure date is a pandas Timestamp
+        bars = download_daily_bars(tickers, period="1y")
+    except RateLimitExceeded:
+        raise
+    except Exception as e:
+        print(f"Error retrieving data for {tickers}: {e}")
+        return {ticker: None for ticker in tickers}
+
+    metrics = {ticker: None for ticker in tickers}
+    if bars.empty:
+        return metrics
+
+    close = bars['Close']
+    latest_bar = close.notna()
+    # Last valid value of each field on the rows that have a close, per ticker
+    latest = {field: bars[field].where(latest_bar).ffill().iloc[-1] for field in ('Open', 'High', 'Low', 'Close', 'Volume')}
+    high_52w = bars['High'].max()
+    low_52w = bars['Low'].min()
+    average_200d = close.iloc[-200:].mean()
+
+    for ticker in close.columns:
+        if ticker not in metrics or pd.isna(latest['Close'].get(ticker)):
+            continue
+        volume = _as_number(latest['Volume'][ticker])
+        metrics[ticker] = {
+            'Open': _as_number(latest['Open'][ticker]),
+            'High': _as_number(latest['High'][ticker]),
+            'Low': _as_number(latest['Low'][ticker]),
+            'Close': _as_number(latest['Close'][ticker]),
+            'Volume': int(volume) if volume is not None else None,
+            '52W_High': _as_number(high_52w[ticker]),
+            '52W_Low': _as_number(low_52w[ticker]),
+            '200DayAverage': _as_number(average_200d[ticker])
+        }
 
-        sp500 = yf.Ticker("^GSPC")
+    missing = [ticker for ticker, data in metrics.items() if data is None]
+    if missing:
+        print(f"No information found for tickers {missing}.")
+    return metrics
+
+
+def get_current_day_metrics(ticker):
+    """
+    Retrieves current day's metrics (Open, High, Low, Close, Volume), 200-day average,
+    and 52-week high and low.
 
-        # Get S&P 500 data for the given date
-        current_day_data = sp500.history(start=date, end=date + pd.Timedelta(days=1))
+    Args:
+        ticker (str): The stock ticker symbol (e.g., "AAPL", "MSFT").
 
-        if current_day_data.empty:
-            print(f"No S&P 500 data found for {date.strftime('%Y-%m-%d')}.")
-            return None
+    Returns:
+        dict: The current day's metrics, 200-day average and 52-week high/low,
+              or None if an error occurs.
+        Prints an error message if the ticker is invalid or data retrieval fails.
+    """
+    return get_current_day_metrics_bulk([ticker])[ticker]
 
-        current_close = current_day_data['Close'].iloc[0]
 
-        # Find the last market open day before the given date
-        previous_date = date - pd.Timedelta(days=1)
-        while True:
-            previous_day_data = sp500.history(start=previous_date, end=previous_date + pd.Timedelta(days=1))
-            if not previous_day_data.empty:
-                previous_close = previous_day_data['Close'].iloc[0]
-                break
-            previous_date -= pd.Timedelta(days=1)
+def get_latest_prices(tickers):
+    """
+    Gets the latest price (today's close so far, or the last close) for several tickers in one request.
 
-        percent_change = ((current_close - previous_close) / previous_close) * 100
-        return percent_change
+    Returns:
+        dict: {ticker: price}, with None for tickers without data.
+    """
+    pd = _pandas()
 
+    try:
+        close = download_daily_bars(tickers, period="5d")['Close'].ffill()
+    except RateLimitExceeded:
+        raise
     except Exception as e:
-        print(f"Error retrieving S&P 500 data: {e}")
-        return None
\ No newline at end of file
+        print(f"Error retrieving prices for {tickers}: {e}")
+        return {ticker: None for ticker in tickers}
+    latest = close.iloc[-1] if not close.empty else pd.Series(dtype=float)
+    return {ticker: _as_number(latest.get(ticker)) for ticker in tickers}
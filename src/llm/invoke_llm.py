@@ -1,15 +1,21 @@
-from langchain_community.chat_models import ChatLiteLLM
-from langchain_core.messages import HumanMessage, SystemMessage
+from src.llm.llm_cache import LLMCache, get_llm_cache, recorded_llm_call
 
-def chat(system_prompt, human_prompt, model, temperature=0.7):
+def chat(system_prompt, human_prompt, model, temperature=0.7, use_cache=True):
+    """Sends one system + human message exchange to the model. Low-temperature calls are served from the LLM cache when possible."""
+    from langchain_community.chat_models import ChatLiteLLM
+    from langchain_core.messages import HumanMessage, SystemMessage
 
-    chat = ChatLiteLLM(model=model, temperature=temperature)
-    
     prompt = [
         SystemMessage(content=system_prompt),
         HumanMessage(content=human_prompt)
     ]
 
-    response = chat.invoke(prompt)
+    def call(messages):
+        return ChatLiteLLM(model=model, temperature=temperature).invoke(messages)
+
+    if use_cache:
+        response = get_llm_cache().invoke(call, prompt, model, temperature)
+    else:
+        response = recorded_llm_call(call, prompt, model, LLMCache.fingerprint(model, temperature, prompt))
 
     return response
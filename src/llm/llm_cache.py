@@ -0,0 +1,88 @@
+import os
+import threading
+from src.utils.disk_cache import DiskCache, CACHE_DIR, make_key
+from src.utils.cassette import recorded, is_active
+from src.utils import tracing
+from src.utils.lazy import lazy_singleton
+
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(CACHE_DIR, "llm_cache.db"))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", 20000))
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", 7 * 24 * 60 * 60))
+
+# Responses sampled above this temperature are not meant to be replayed
+MAX_CACHEABLE_TEMPERATURE = 0.3
+
+
+class LLMCache:
+    """
+    Persistent LLM response cache keyed by a fingerprint of
+    (model, temperature, rendered messages, prompt version, toolset).
+
+    Entries expire after `ttl` seconds and the least recently used ones are evicted past
+    `max_entries`. Set LLM_CACHE_BYPASS=1 (or `bypass = True`) to always call the model; the
+    cache is also bypassed while recording a cassette. Model calls go through the cassette.
+    """
+
+    def __init__(self, path=LLM_CACHE_PATH, max_entries=LLM_CACHE_MAX_ENTRIES, ttl=LLM_CACHE_TTL,
+                 max_temperature=MAX_CACHEABLE_TEMPERATURE, bypass=None):
+        self.store = DiskCache(path, max_entries=max_entries, table="llm_responses")
+        self.ttl = ttl
+        self.max_temperature = max_temperature
+        self.bypass = os.getenv("LLM_CACHE_BYPASS") == "1" if bypass is None else bypass
+        self._counters = {"bypassed": 0, "uncacheable": 0}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def fingerprint(model, temperature, messages, prompt_version=None, toolset=()):
+        rendered = [(message.type, message.content) for message in messages]
+        return make_key(model, temperature, rendered, prompt_version, list(toolset))
+
+    def _count(self, counter):
+        with self._lock:
+            self._counters[counter] += 1
+
+    def invoke(self, call, messages, model, temperature, prompt_version=None, toolset=()):
+        """
+        Returns the cached response for these messages, or runs `call(messages)` and caches its result.
+        Responses that request tool calls are never cached.
+        """
+        from langchain_core.messages import message_to_dict, messages_from_dict
+
+        key = self.fingerprint(model, temperature, messages, prompt_version, toolset)
+        if self.bypass or is_active():
+            self._count("bypassed")
+            return recorded_llm_call(call, messages, model, key)
+        if temperature is None or temperature > self.max_temperature:
+            self._count("uncacheable")
+            return recorded_llm_call(call, messages, model, key)
+
+        cached = self.store.get(key)
+        if cached is not None:
+            tracing.add("cache_hits")
+            return messages_from_dict([cached])[0]
+
+        response = recorded_llm_call(call, messages, model, key)
+        if not getattr(response, "tool_calls", None):
+            self.store.set(key, message_to_dict(response), ttl=self.ttl)
+        return response
+
+    def stats(self):
+        """Hit/miss/eviction counters of the store plus bypassed and uncacheable calls."""
+        with self._lock:
+            return {**self.store.stats(), **self._counters}
+
+
+def recorded_llm_call(call, messages, model, fingerprint):
+    """
+    Runs `call(messages)` through the active cassette, if any, keyed by the prompt fingerprint,
+    and adds its token usage to the current tracing span.
+    """
+    response = recorded("llm", model, fingerprint, lambda: call(messages))
+    tracing.record_llm_usage(response)
+    return response
+
+
+@lazy_singleton
+def get_llm_cache():
+    """Returns the process-wide LLM response cache."""
+    return LLMCache()
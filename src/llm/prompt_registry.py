@@ -0,0 +1,186 @@
+"""
+Local, versioned prompt registry.
+
+Prompts live in prompts/<name>/<version>.json and prompts/pins.json says which version each
+name resolves to. They are parsed once per process; the LangChain hub is only contacted by an
+explicit sync:
+
+    python -m src.llm.prompt_registry sync article_sentiment finance_analyst
+    python -m src.llm.prompt_registry list
+"""
+import os
+import sys
+import json
+import hashlib
+import logging
+import threading
+from datetime import datetime, timezone
+from functools import cache
+from src.utils.cassette import recorded
+
+logger = logging.getLogger(__name__)
+
+PROMPTS_DIR = os.getenv(
+    "PROMPTS_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "prompts"),
+)
+
+
+@cache
+def _roles():
+    # LangChain is imported once a prompt is parsed or serialized, not when the registry is imported
+    from langchain_core.prompts import SystemMessagePromptTemplate, HumanMessagePromptTemplate, AIMessagePromptTemplate
+    return {
+        SystemMessagePromptTemplate: "system",
+        HumanMessagePromptTemplate: "human",
+        AIMessagePromptTemplate: "ai",
+    }
+
+
+class RegisteredPrompt:
+    """A pinned prompt: its name, version and the parsed chat template (ready to format)."""
+
+    def __init__(self, name, version, template):
+        self.name = name
+        self.version = version
+        self.template = template
+
+    @property
+    def messages(self):
+        return self.template.messages
+
+
+def _serialize(template):
+    messages = []
+    for message in template.messages:
+        role = _roles().get(type(message))
+        if role is None:
+            raise ValueError(f"Unsupported prompt message type: {type(message).__name__}")
+        messages.append({
+            "role": role,
+            "template": message.prompt.template,
+            "template_format": message.prompt.template_format,
+        })
+    return messages
+
+
+def _parse(messages):
+    from langchain_core.prompts import ChatPromptTemplate
+    template_format = messages[0].get("template_format", "f-string") if messages else "f-string"
+    return ChatPromptTemplate.from_messages(
+        [(message["role"], message["template"]) for message in messages],
+        template_format=template_format,
+    )
+
+
+def content_version(messages):
+    """Version id derived from the prompt content, used when the hub gives no commit hash."""
+    raw = json.dumps(messages, sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:12]
+
+
+class PromptRegistry:
+    def __init__(self, path=PROMPTS_DIR, hub_fallback=True):
+        self.path = path
+        self.hub_fallback = hub_fallback
+        self._prompts = {}
+        self._lock = threading.Lock()
+
+    @property
+    def pins_path(self):
+        return os.path.join(self.path, "pins.json")
+
+    def pins(self):
+        if not os.path.exists(self.pins_path):
+            return {}
+        with open(self.pins_path) as f:
+            return json.load(f)
+
+    def _read(self, name, version):
+        with open(os.path.join(self.path, name, f"{version}.json")) as f:
+            return json.load(f)
+
+    def get(self, name, version=None):
+        """
+        Returns the RegisteredPrompt for `name` (the pinned version unless `version` is given).
+
+        Prompts missing locally are pulled from the hub once and kept in memory, with a
+        warning to run `sync`, unless the registry was created with hub_fallback=False.
+        """
+        key = (name, version)
+        prompt = self._prompts.get(key)
+        if prompt is not None:
+            return prompt
+        with self._lock:
+            prompt = self._prompts.get(key)
+            if prompt is None:
+                prompt = self._load(name, version)
+                self._prompts[key] = prompt
+        return prompt
+
+    def _load(self, name, version):
+        version = version or self.pins().get(name)
+        if version is not None:
+            record = self._read(name, version)
+            return RegisteredPrompt(name, version, _parse(record["messages"]))
+        if not self.hub_fallback:
+            raise KeyError(f"Prompt '{name}' is not in the local registry; run: python -m src.llm.prompt_registry sync {name}")
+        logger.warning(f"Prompt '{name}' is not in the local registry, pulling it from the hub. Run: python -m src.llm.prompt_registry sync {name}")
+        template, hub_version = self._pull(name)
+        return RegisteredPrompt(name, hub_version or content_version(_serialize(template)), template)
+
+    @staticmethod
+    def _pull(name):
+        from langchain import hub
+        template = recorded("hub", name, [], lambda: hub.pull(name))
+        return template, (template.metadata or {}).get("lc_hub_commit_hash", "")[:12] or None
+
+    def add(self, name, messages, version=None, source="local"):
+        """Stores a prompt version on disk and pins it. Returns the version id."""
+        version = version or content_version(messages)
+        os.makedirs(os.path.join(self.path, name), exist_ok=True)
+        record = {
+            "name": name,
+            "version": version,
+            "source": source,
+            "saved_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "messages": messages,
+        }
+        with open(os.path.join(self.path, name, f"{version}.json"), "w") as f:
+            json.dump(record, f, indent=2)
+            f.write("\n")
+        pins = self.pins()
+        pins[name] = version
+        with open(self.pins_path, "w") as f:
+            json.dump(pins, f, indent=2, sort_keys=True)
+            f.write("\n")
+        with self._lock:
+            self._prompts = {key: value for key, value in self._prompts.items() if key[0] != name}
+        return version
+
+    def sync(self, name):
+        """Pulls the latest version of a prompt from the hub, stores it and pins it."""
+        template, hub_version = self._pull(name)
+        messages = _serialize(template)
+        return self.add(name, messages, version=hub_version or content_version(messages), source="hub")
+
+
+# Shared by every caller in the process
+registry = PromptRegistry()
+
+
+def get_prompt(name, version=None):
+    """Returns the pinned RegisteredPrompt for `name` from the process-wide registry."""
+    return registry.get(name, version)
+
+
+if __name__ == "__main__":
+    command, names = (sys.argv[1], sys.argv[2:]) if len(sys.argv) > 1 else ("list", [])
+    if command == "sync" and names:
+        for name in names:
+            print(f"{name}: pinned {registry.sync(name)}")
+    elif command == "list":
+        for name, version in sorted(registry.pins().items()):
+            print(f"{name}: {version}")
+    else:
+        print(__doc__)
@@ -0,0 +1,28 @@
+import os
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from src.utils.lazy import lazy_singleton
+
+# Threads running the Gradio handlers' blocking I/O (SQLite, Yahoo), shared by all viewers
+UI_IO_WORKERS = int(os.getenv("UI_IO_WORKERS", "8"))
+# Seconds a handler waits for blocking I/O before it falls back to a cached or stale value
+UI_IO_TIMEOUT_SECONDS = float(os.getenv("UI_IO_TIMEOUT_SECONDS", "3"))
+
+@lazy_singleton
+def get_executor():
+    """Returns the process-wide executor for the UI's blocking I/O."""
+    return ThreadPoolExecutor(max_workers=UI_IO_WORKERS, thread_name_prefix="ui-io")
+
+
+async def run_blocking(fn, *args, timeout=UI_IO_TIMEOUT_SECONDS, **kwargs):
+    """
+    Runs `fn(*args, **kwargs)` on the bounded executor, off the event loop, and returns its result.
+
+    Raises TimeoutError after `timeout` seconds. A call that already started keeps running in its
+    thread, so whatever it caches (quotes, query results) is there for the next request; one still
+    waiting for a thread is dropped.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(get_executor(), functools.partial(fn, *args, **kwargs))
+    return await asyncio.wait_for(future, timeout)
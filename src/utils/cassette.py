@@ -0,0 +1,244 @@
+"""
+Record/replay of external calls (HTTP APIs, yfinance, LLM completions, hub prompts).
+
+    CASSETTE_MODE=record python identify.py       # run live and capture every response
+    CASSETTE_MODE=replay python identify.py       # serve them back, no network needed
+
+CASSETTE_PATH picks the file (default cache/cassette.pkl.gz). In replay, CASSETTE_LATENCY
+sets the delay injected per call: milliseconds for every call ("300"), per kind
+("http=200,yahoo=800,llm=1500"), or "recorded" to replay the latency measured while recording.
+
+A call is matched on its kind, route (endpoint, function or model) and arguments; repeated
+identical calls are served in recorded order. A call with no exact match gets the next unused
+recording of the same route, so a replay on another day (different date arguments) still
+follows the recorded run. While a cassette is active, the HTTP and LLM response caches are
+bypassed: recording, every call reaches the provider and lands in the cassette; replaying,
+every call is served by the cassette (with its latency), whatever the local cache holds.
+"""
+import os
+import gzip
+import time
+import pickle
+import atexit
+import logging
+import threading
+from collections import defaultdict, deque
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+import requests
+from src.utils.disk_cache import CACHE_DIR, make_key
+
+logger = logging.getLogger(__name__)
+
+CASSETTE_MODE = os.getenv("CASSETTE_MODE", "").lower()
+CASSETTE_PATH = os.getenv("CASSETTE_PATH", os.path.join(CACHE_DIR, "cassette.pkl.gz"))
+CASSETTE_LATENCY = os.getenv("CASSETTE_LATENCY", "0")
+
+# Request parameters that are never written to a cassette
+SECRET_PARAMS = {"apikey", "api_key", "token", "key"}
+
+
+class CassetteMiss(Exception):
+    """Raised in replay mode for a call that was never recorded."""
+
+
+class _RecordedError:
+    """An exception raised by a recorded call, re-raised on replay."""
+
+    def __init__(self, error):
+        try:
+            pickle.dumps(error)
+            self.error = error
+        except Exception:
+            self.error = RuntimeError(f"{type(error).__name__}: {error}")
+
+
+def parse_latency(spec):
+    """Parses CASSETTE_LATENCY into seconds: a float, a {kind: seconds} dict, or "recorded"."""
+    spec = (spec or "0").strip()
+    if spec == "recorded":
+        return spec
+    if "=" not in spec:
+        return float(spec) / 1000
+    return {kind.strip(): float(ms) / 1000 for kind, ms in (part.split("=") for part in spec.split(","))}
+
+
+class Cassette:
+    """
+    Recordings of external calls, kept in memory and saved as one gzipped pickle.
+
+    Each recording is (kind, route, key, seconds, value), where value is the call's return
+    value or a _RecordedError.
+    """
+
+    def __init__(self, path=CASSETTE_PATH, mode="replay", latency=0.0, sleep=time.sleep):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.latency = latency
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self.recordings = []
+        self._by_key = defaultdict(deque)
+        self._by_route = defaultdict(deque)
+        self._used = set()
+        self.stats = {"recorded": 0, "replayed": 0, "fallback": 0, "missed": 0}
+        if mode == "replay":
+            self.load()
+
+    def load(self):
+        with gzip.open(self.path, "rb") as f:
+            self.recordings = pickle.load(f)
+        for position, (kind, route, key, _, _) in enumerate(self.recordings):
+            self._by_key[key].append(position)
+            self._by_route[(kind, route)].append(position)
+        logger.info(f"Loaded {len(self.recordings)} recorded calls from {self.path}")
+
+    def save(self):
+        with self._lock:
+            recordings = list(self.recordings)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with gzip.open(self.path, "wb") as f:
+            pickle.dump(recordings, f, protocol=pickle.HIGHEST_PROTOCOL)
+        logger.info(f"Saved {len(recordings)} recorded calls to {self.path}")
+
+    def _delay(self, kind, recorded_seconds):
+        if self.latency == "recorded":
+            return recorded_seconds
+        if isinstance(self.latency, dict):
+            return self.latency.get(kind, 0.0)
+        return self.latency
+
+    def _next(self, queue):
+        while queue and queue[0] in self._used:
+            queue.popleft()
+        return queue.popleft() if queue else None
+
+    def _replay(self, kind, route, key):
+        with self._lock:
+            position = self._next(self._by_key[key])
+            if position is None:
+                position = self._next(self._by_route[(kind, route)])
+                self.stats["fallback" if position is not None else "missed"] += 1
+            if position is None:
+                raise CassetteMiss(f"No recorded {kind} call for {route}")
+            self._used.add(position)
+            self.stats["replayed"] += 1
+        _, _, _, seconds, value = self.recordings[position]
+        delay = self._delay(kind, seconds)
+        if delay:
+            self._sleep(delay)
+        if isinstance(value, _RecordedError):
+            raise value.error
+        return value
+
+    def _record(self, kind, route, key, fn, encode=None):
+        start = time.perf_counter()
+        try:
+            value = fn()
+        except Exception as e:
+            self._append(kind, route, key, time.perf_counter() - start, _RecordedError(e))
+            raise
+        self._append(kind, route, key, time.perf_counter() - start, encode(value) if encode else value)
+        return value
+
+    def _append(self, kind, route, key, seconds, value):
+        with self._lock:
+            self.recordings.append((kind, route, key, seconds, value))
+            self.stats["recorded"] += 1
+
+    def call(self, kind, route, key_parts, fn, encode=None, decode=None):
+        """
+        Records or replays `fn()`. `encode`/`decode` convert the return value to and from its
+        stored form (e.g. a requests.Response to plain data).
+        """
+        key = make_key(kind, route, key_parts)
+        if self.mode == "replay":
+            value = self._replay(kind, route, key)
+            return decode(value) if decode else value
+        return self._record(kind, route, key, fn, encode)
+
+
+_cassette = None
+_cassette_lock = threading.Lock()
+
+
+def get_cassette():
+    """
+    Returns the process-wide cassette: the one installed with set_cassette, else one set up from
+    CASSETTE_MODE, or None when not recording or replaying.
+    """
+    global _cassette
+    with _cassette_lock:
+        if _cassette is None and CASSETTE_MODE in ("record", "replay"):
+            _cassette = Cassette(CASSETTE_PATH, CASSETTE_MODE, parse_latency(CASSETTE_LATENCY))
+            if CASSETTE_MODE == "record":
+                atexit.register(_cassette.save)
+        return _cassette
+
+
+def set_cassette(cassette):
+    """Installs `cassette` (or None) as the process-wide cassette. Returns the previous one."""
+    global _cassette
+    with _cassette_lock:
+        previous, _cassette = _cassette, cassette
+        return previous
+
+
+def is_active():
+    """True while a cassette records or replays calls; the response caches are bypassed meanwhile."""
+    return get_cassette() is not None
+
+
+def is_recording():
+    cassette = get_cassette()
+    return cassette is not None and cassette.mode == "record"
+
+
+def is_replaying():
+    cassette = get_cassette()
+    return cassette is not None and cassette.mode == "replay"
+
+
+def recorded(kind, route, key_parts, fn, encode=None, decode=None):
+    """Runs `fn()` through the active cassette, or just runs it when there is none."""
+    cassette = get_cassette()
+    if cassette is None:
+        return fn()
+    return cassette.call(kind, route, key_parts, fn, encode=encode, decode=decode)
+
+
+def _strip_secrets(url):
+    parts = urlsplit(url or "")
+    query = [(name, value) for name, value in parse_qsl(parts.query) if name.lower() not in SECRET_PARAMS]
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def http_key(method, url, kwargs):
+    """Route and key parts of an HTTP request, without API keys."""
+    params = {name: value for name, value in (kwargs.get("params") or {}).items() if name.lower() not in SECRET_PARAMS}
+    return _strip_secrets(url), [method.upper(), params, kwargs.get("json"), kwargs.get("data")]
+
+
+def encode_response(response):
+    """Plain data of a requests.Response (status, headers, body), without API keys."""
+    return {
+        "status_code": response.status_code,
+        "headers": dict(response.headers),
+        "content": response.content,
+        "encoding": response.encoding,
+        "url": _strip_secrets(response.url),
+        "reason": response.reason,
+    }
+
+
+def decode_response(data):
+    """Rebuilds a requests.Response from encode_response data."""
+    response = requests.Response()
+    response.status_code = data["status_code"]
+    response.headers = requests.structures.CaseInsensitiveDict(data["headers"])
+    response._content = data["content"]
+    response.encoding = data["encoding"]
+    response.url = data["url"]
+    response.reason = data["reason"]
+    return response
@@ -0,0 +1,100 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Default location for on-disk caches, relative to the repository root (kept out of git)
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "cache")
+
+
+def make_key(*parts):
+    """Builds a stable cache key from JSON-serializable parts (dict ordering does not matter)."""
+    raw = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class DiskCache:
+    """
+    Persistent key/value cache stored in a SQLite file.
+
+    Values are JSON-serializable objects. Every entry has its own TTL, and once the cache holds
+    more than `max_entries` rows, expired entries go first, then the least recently used ones.
+    Safe to share between threads.
+    """
+
+    def __init__(self, path, max_entries=10000, table="cache"):
+        self.path = path
+        self.max_entries = max_entries
+        self.table = table
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_last_access ON {table} (last_access)")
+        self._size = self._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, key):
+        """Returns the cached value, or None when the key is missing or expired."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)).fetchone()
+            if row is None or row[1] <= now:
+                self._counters["misses"] += 1
+                return None
+            self._conn.execute(f"UPDATE {self.table} SET last_access = ? WHERE key = ?", (now, key))
+            self._counters["hits"] += 1
+        return json.loads(row[0])
+
+    def set(self, key, value, ttl):
+        """Stores `value` for `ttl` seconds, evicting old entries if the cache is over its size limit."""
+        now = time.time()
+        payload = json.dumps(value, default=str)
+        with self._lock:
+            existed = self._conn.execute(f"SELECT 1 FROM {self.table} WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, payload, now + ttl, now),
+            )
+            if not existed:
+                self._size += 1
+            if self._size > self.max_entries:
+                self._evict(now)
+
+    def _evict(self, now):
+        """Drops expired rows, then least recently used rows down to 90% of max_entries."""
+        removed = self._conn.execute(f"DELETE FROM {self.table} WHERE expires_at <= ?", (now,)).rowcount
+        keep = int(self.max_entries * 0.9)
+        size = self._size - removed
+        if size > keep:
+            removed += self._conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN "
+                f"(SELECT key FROM {self.table} ORDER BY last_access ASC LIMIT ?)",
+                (size - keep,),
+            ).rowcount
+        self._size -= removed
+        self._counters["evictions"] += removed
+        logger.debug(f"Evicted {removed} entries from {self.path}")
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table}")
+            self._size = 0
+
+    def stats(self):
+        """Returns hit/miss/eviction counters and the current number of entries."""
+        with self._lock:
+            return {**self._counters, "entries": self._size}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
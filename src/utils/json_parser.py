@@ -1,9 +1,10 @@
 import json
 import re
-from langchain.schema import BaseOutputParser
 from pydantic import BaseModel  # Import BaseModel if you haven't already
 
-class JsonExtractor(BaseOutputParser):
+# A plain class rather than a LangChain output parser: it is only ever called directly,
+# and subclassing BaseOutputParser imported all of LangChain with the workflows
+class JsonExtractor:
     def parse(self, text: str):
         json_match = re.search(r'```json\s*({.*?})\s*```', text, re.DOTALL | re.IGNORECASE)
         if json_match:
@@ -0,0 +1,22 @@
+import threading
+import functools
+
+
+def lazy_singleton(factory):
+    """
+    Turns a no-argument factory into the accessor of a process-wide object: the first call
+    builds it (once, however many threads ask at the same time) and every later call returns
+    the same object. Importing a module that defines one costs nothing until it is used.
+    """
+    lock = threading.Lock()
+    instance = []
+
+    @functools.wraps(factory)
+    def get():
+        if not instance:
+            with lock:
+                if not instance:
+                    instance.append(factory())
+        return instance[0]
+
+    return get
@@ -1,8 +1,8 @@
 import datetime
-import holidays
+from src.utils.trading_calendar import get_calendar
 
 def is_us_market_open(date=None):
-    """Checks if the US stock market is open on a given date.
+    """Checks if the US stock market (NYSE) has a trading session on a given date.
 
     Args:
         date: datetime.date object. If None, defaults to today.
@@ -13,14 +13,4 @@ def is_us_market_open(date=None):
     if date is None:
         date = datetime.date.today()
 
-    us_holidays = holidays.US()  # Get US holidays
-
-    # Weekends
-    if date.weekday() in (5, 6):  # Saturday or Sunday
-        return False
-
-    # Holidays
-    if date in us_holidays:
-        return False
-
-    return True
\ No newline at end of file
+    return get_calendar().is_session(date)
@@ -0,0 +1,52 @@
+import re
+import zlib
+import numpy as np
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_WORDS = 3
+
+_PRIME = np.uint64((1 << 31) - 1)
+_rng = np.random.default_rng(20250101)
+_A = _rng.integers(1, (1 << 31) - 1, size=NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, (1 << 31) - 1, size=NUM_PERM, dtype=np.uint64)
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def shingles(text, k=SHINGLE_WORDS):
+    """Hashes of the k-word shingles of a text, after lowercasing and dropping punctuation."""
+    words = _WORD.findall((text or "").lower())
+    if not words:
+        return np.empty(0, dtype=np.uint64)
+    grams = [" ".join(words[i:i + k]) for i in range(max(1, len(words) - k + 1))]
+    return np.fromiter((zlib.crc32(gram.encode("utf-8")) for gram in grams), dtype=np.uint64, count=len(grams))
+
+
+def signature(text):
+    """MinHash signature (NUM_PERM uint32 values) of a text, or None if it has no words."""
+    hashes = shingles(text)
+    if hashes.size == 0:
+        return None
+    # (a * x + b) mod p stays below 2**63 for 31-bit a, b, p and 32-bit x
+    permuted = (np.outer(hashes, _A) + _B) % _PRIME
+    return permuted.min(axis=0).astype(np.uint32)
+
+
+_BAND_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+
+def band_keys(sig):
+    """One LSH bucket key per band of a signature (BANDS int64 values)."""
+    rows = sig.reshape(BANDS, ROWS).astype(np.uint64)
+    keys = np.zeros(BANDS, dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for column in range(ROWS):
+            keys = (keys ^ rows[:, column]) * _BAND_MULTIPLIER
+    return keys.view(np.int64)
+
+
+def similarity(sig1, sig2):
+    """Estimated Jaccard similarity of the two texts behind the signatures."""
+    return float(np.count_nonzero(sig1 == sig2)) / NUM_PERM
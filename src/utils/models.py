@@ -6,4 +6,12 @@ class AnalysisResult(BaseModel):
 
 class SentimentResult(BaseModel):
     explanation: str = Field(description="Detailed explanation of the analysis")
-    sentiment: str = Field(description="The sentiment of the article")
\ No newline at end of file
+    sentiment: str = Field(description="The sentiment of the article")
+
+class ArticleSentiment(BaseModel):
+    index: int = Field(description="Number of the article in the request, starting at 1")
+    explanation: str = Field(description="Detailed explanation of the analysis")
+    sentiment: str = Field(description="The sentiment of the article")
+
+class BatchSentimentResult(BaseModel):
+    results: list[ArticleSentiment] = Field(description="One sentiment result per article")
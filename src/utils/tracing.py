@@ -0,0 +1,223 @@
+"""
+Lightweight per-stage tracing for pipeline runs.
+
+    with tracing.run("identify", db_client):
+        with tracing.span("news", ticker):
+            ...
+        tracing.add("retries")          # counted on the innermost open span of this thread
+
+Spans only record inside a run. Outside one (or with TRACING_DISABLED=1), span() returns a
+shared no-op and add() returns immediately. When a run ends its spans are written to the
+run_metrics table, and to a Prometheus text file when METRICS_TEXTFILE is set (for the
+node_exporter textfile collector).
+"""
+import os
+import time
+import uuid
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from src.clients.migrations import migrate
+
+logger = logging.getLogger(__name__)
+
+TABLE = "run_metrics"
+TRACING_DISABLED = os.getenv("TRACING_DISABLED") == "1"
+METRICS_TEXTFILE = os.getenv("METRICS_TEXTFILE")
+
+COUNTERS = ("tokens_in", "tokens_out", "retries", "cache_hits")
+
+
+class _NoopSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+class _Span:
+    def __init__(self, tracer, stage, ticker):
+        self.tracer = tracer
+        self.stage = stage
+        self.ticker = ticker
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.status = "ok"
+
+    def __enter__(self):
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self.tracer._stack().append(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration = time.perf_counter() - self._start
+        self.tracer._stack().pop()
+        if exc_type is not None:
+            self.status = "error"
+        self.tracer._finish(self)
+        return False
+
+
+class Tracer:
+    def __init__(self):
+        self._run = None
+        self._spans = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    @property
+    def active(self):
+        return self._run is not None
+
+    def span(self, stage, ticker=None):
+        """Context manager timing one stage (for one ticker, if given)."""
+        if self._run is None:
+            return _NOOP
+        return _Span(self, stage, ticker)
+
+    def add(self, counter, amount=1):
+        """Adds to a counter (tokens_in, tokens_out, retries, cache_hits) of the current span."""
+        if self._run is None or not amount:
+            return
+        stack = getattr(self._local, "stack", None)
+        if stack:
+            stack[-1].counters[counter] += amount
+
+    def traced(self, stage, fn, ticker=None):
+        """Returns `fn` wrapped in a span, or `fn` itself when not tracing (for executor submits)."""
+        if self._run is None:
+            return fn
+
+        def wrapper(*args, **kwargs):
+            with self.span(stage, ticker):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    def _finish(self, span):
+        with self._lock:
+            self._spans.append(span)
+
+    @contextmanager
+    def run(self, name, db_client=None, textfile=None):
+        """
+        Traces one pipeline run. On exit the spans are logged per stage, stored in run_metrics
+        through `db_client` and written to `textfile` (default METRICS_TEXTFILE) if set.
+        """
+        if TRACING_DISABLED or self._run is not None:
+            yield None
+            return
+        self._run = {"run_id": uuid.uuid4().hex[:12], "run_name": name}
+        self._spans = []
+        run_span = _Span(self, "run", None)
+        try:
+            with run_span:
+                yield self._run
+        finally:
+            run, spans = self._run, list(self._spans)
+            self._run = None
+            self._spans = []
+            self._report(run, spans)
+            if db_client is not None:
+                self._store(db_client, run, spans)
+            textfile = textfile or METRICS_TEXTFILE
+            if textfile:
+                self._write_textfile(textfile, run, spans)
+
+    @staticmethod
+    def summarize(spans):
+        """Per stage: calls, errors, total/max seconds and counter totals."""
+        stages = {}
+        for span in spans:
+            entry = stages.setdefault(span.stage, {"calls": 0, "errors": 0, "seconds": 0.0, "max_seconds": 0.0, **dict.fromkeys(COUNTERS, 0)})
+            entry["calls"] += 1
+            entry["errors"] += span.status != "ok"
+            entry["seconds"] += span.duration
+            entry["max_seconds"] = max(entry["max_seconds"], span.duration)
+            for counter, value in span.counters.items():
+                entry[counter] += value
+        return stages
+
+    def _report(self, run, spans):
+        for stage, entry in self.summarize(spans).items():
+            logger.info(
+                f"[{run['run_name']} {run['run_id']}] {stage}: {entry['calls']} calls, {entry['seconds']:.2f}s total, "
+                f"max {entry['max_seconds']:.2f}s, tokens {entry['tokens_in']}/{entry['tokens_out']}, "
+                f"retries {entry['retries']}, cache hits {entry['cache_hits']}, errors {entry['errors']}"
+            )
+
+    @staticmethod
+    def _store(db_client, run, spans):
+        try:
+            migrate(db_client)
+        except Exception as e:
+            logger.error(f"Error storing run metrics: {e}")
+            return
+        rows = [
+            (run["run_id"], run["run_name"], span.stage, span.ticker,
+             datetime.fromtimestamp(span.started_at, timezone.utc).isoformat(timespec="milliseconds"),
+             round(span.duration * 1000, 3), *(span.counters[counter] for counter in COUNTERS), span.status)
+            for span in spans
+        ]
+        db_client.execute_query(
+            f"INSERT INTO {TABLE} (run_id, run_name, stage, ticker, started_at, duration_ms, tokens_in, tokens_out, "
+            "retries, cache_hits, status) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+
+    def _write_textfile(self, path, run, spans):
+        labels = f'run="{run["run_name"]}"'
+        lines = [
+            "# HELP wanderer_stage_seconds Time spent per pipeline stage in the last run.",
+            "# TYPE wanderer_stage_seconds summary",
+        ]
+        stages = self.summarize(spans)
+        for stage, entry in stages.items():
+            lines.append(f'wanderer_stage_seconds_sum{{{labels},stage="{stage}"}} {entry["seconds"]:.6f}')
+            lines.append(f'wanderer_stage_seconds_count{{{labels},stage="{stage}"}} {entry["calls"]}')
+        for counter in COUNTERS + ("errors",):
+            lines.append(f"# TYPE wanderer_stage_{counter} gauge")
+            lines.extend(f'wanderer_stage_{counter}{{{labels},stage="{stage}"}} {entry[counter]}' for stage, entry in stages.items())
+        lines.append("# TYPE wanderer_last_run_timestamp_seconds gauge")
+        lines.append(f"wanderer_last_run_timestamp_seconds{{{labels}}} {time.time():.0f}")
+        try:
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            temporary = f"{path}.{os.getpid()}.tmp"
+            with open(temporary, "w") as f:
+                f.write("\n".join(lines) + "\n")
+            os.replace(temporary, path)  # The collector never sees a partial file
+        except OSError as e:
+            logger.error(f"Error writing metrics to {path}: {e}")
+
+
+# Shared by every caller in the process
+tracer = Tracer()
+span = tracer.span
+add = tracer.add
+traced = tracer.traced
+run = tracer.run
+
+
+def record_llm_usage(response):
+    """Adds the token usage reported on an LLM response message to the current span."""
+    if tracer._run is None:
+        return
+    usage = getattr(response, "usage_metadata", None)
+    if usage:
+        add("tokens_in", usage.get("input_tokens", 0))
+        add("tokens_out", usage.get("output_tokens", 0))
+        return
+    usage = (getattr(response, "response_metadata", None) or {}).get("token_usage") or {}
+    add("tokens_in", usage.get("prompt_tokens", 0) or 0)
+    add("tokens_out", usage.get("completion_tokens", 0) or 0)
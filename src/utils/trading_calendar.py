@@ -0,0 +1,165 @@
+import datetime
+from bisect import bisect_left, bisect_right
+
+# Regular and early (half-day) closing times, US/Eastern
+REGULAR_CLOSE = datetime.time(16, 0)
+EARLY_CLOSE = datetime.time(13, 0)
+
+# One-off closures that no calendar rule produces
+SPECIAL_CLOSURES = {
+    datetime.date(2001, 9, 11), datetime.date(2001, 9, 12), datetime.date(2001, 9, 13), datetime.date(2001, 9, 14),  # September 11
+    datetime.date(2004, 6, 11),  # Reagan national day of mourning
+    datetime.date(2007, 1, 2),  # Ford national day of mourning
+    datetime.date(2012, 10, 29), datetime.date(2012, 10, 30),  # Hurricane Sandy
+    datetime.date(2018, 12, 5),  # George H.W. Bush national day of mourning
+    datetime.date(2025, 1, 9),  # Carter national day of mourning
+}
+
+
+def _easter(year):
+    """Gregorian Easter Sunday (anonymous Gregorian algorithm)."""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return datetime.date(year, month, day + 1)
+
+
+def _nth_weekday(year, month, weekday, n):
+    """n-th (1-based) weekday of a month; n=-1 is the last one."""
+    if n > 0:
+        first = datetime.date(year, month, 1)
+        return first + datetime.timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = datetime.date(year + month // 12, month % 12 + 1, 1) - datetime.timedelta(days=1)
+    return last - datetime.timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _observed(day):
+    """Saturday holidays are observed on Friday, Sunday holidays on Monday."""
+    if day.weekday() == 5:
+        return day - datetime.timedelta(days=1)
+    if day.weekday() == 6:
+        return day + datetime.timedelta(days=1)
+    return day
+
+
+def nyse_holidays(year):
+    """Full-day NYSE holidays for a year (observed dates)."""
+    new_years = datetime.date(year, 1, 1)
+    holidays = {
+        _nth_weekday(year, 1, 0, 3),  # Martin Luther King Jr. Day
+        _nth_weekday(year, 2, 0, 3),  # Washington's Birthday
+        _easter(year) - datetime.timedelta(days=2),  # Good Friday
+        _nth_weekday(year, 5, 0, -1),  # Memorial Day
+        _observed(datetime.date(year, 7, 4)),  # Independence Day
+        _nth_weekday(year, 9, 0, 1),  # Labor Day
+        _nth_weekday(year, 11, 3, 4),  # Thanksgiving
+        _observed(datetime.date(year, 12, 25)),  # Christmas
+    }
+    # NYSE does not close the Friday before a Saturday New Year's Day
+    if new_years.weekday() != 5:
+        holidays.add(_observed(new_years))
+    if year >= 2022:
+        holidays.add(_observed(datetime.date(year, 6, 19)))  # Juneteenth
+    return holidays
+
+
+def nyse_early_closes(year):
+    """1 PM closes: July 3rd (Mon-Thu), the day after Thanksgiving and Christmas Eve (Mon-Thu)."""
+    early = {_nth_weekday(year, 11, 3, 4) + datetime.timedelta(days=1)}
+    for day in (datetime.date(year, 7, 3), datetime.date(year, 12, 24)):
+        if day.weekday() < 4:
+            early.add(day)
+    return early
+
+
+def _to_date(value):
+    """Accepts datetime.date, datetime.datetime, pandas.Timestamp or an ISO date string."""
+    if isinstance(value, str):
+        return datetime.date.fromisoformat(value[:10])
+    if isinstance(value, datetime.datetime) or hasattr(value, "to_pydatetime"):
+        return value.date()
+    return value
+
+
+class TradingCalendar:
+    """
+    NYSE trading sessions for a range of years, precomputed into a sorted list.
+
+    is_session and is_early_close are set lookups; previous_session, next_session and
+    sessions_between are binary searches.
+    """
+
+    def __init__(self, start_year=2000, end_year=2035):
+        self.start = datetime.date(start_year, 1, 1)
+        self.end = datetime.date(end_year, 12, 31)
+        closed = set(SPECIAL_CLOSURES)
+        early = set()
+        for year in range(start_year, end_year + 1):
+            closed |= nyse_holidays(year)
+            early |= nyse_early_closes(year)
+
+        sessions = []
+        day = self.start
+        while day <= self.end:
+            if day.weekday() < 5 and day not in closed:
+                sessions.append(day)
+            day += datetime.timedelta(days=1)
+        self.sessions = sessions
+        self._session_set = frozenset(sessions)
+        self._early_closes = frozenset(day for day in early if day in self._session_set)
+
+    def _check_range(self, date):
+        if not self.start <= date <= self.end:
+            raise ValueError(f"{date} is outside the calendar range {self.start} to {self.end}")
+        return date
+
+    def is_session(self, date):
+        """True if the exchange is open on `date`."""
+        return self._check_range(_to_date(date)) in self._session_set
+
+    def is_early_close(self, date):
+        """True if `date` is a half-day session."""
+        return _to_date(date) in self._early_closes
+
+    def close_time(self, date):
+        """Closing time (US/Eastern) of the session on `date`, or None if the exchange is closed."""
+        if not self.is_session(date):
+            return None
+        return EARLY_CLOSE if self.is_early_close(date) else REGULAR_CLOSE
+
+    def previous_session(self, date):
+        """Last session strictly before `date`."""
+        position = bisect_left(self.sessions, self._check_range(_to_date(date)))
+        if position == 0:
+            raise ValueError(f"No session before {date} in the calendar range")
+        return self.sessions[position - 1]
+
+    def next_session(self, date):
+        """First session strictly after `date`."""
+        position = bisect_right(self.sessions, self._check_range(_to_date(date)))
+        if position == len(self.sessions):
+            raise ValueError(f"No session after {date} in the calendar range")
+        return self.sessions[position]
+
+    def sessions_between(self, start, end):
+        """Sessions from `start` through `end`, both inclusive."""
+        start, end = _to_date(start), _to_date(end)
+        return self.sessions[bisect_left(self.sessions, start):bisect_right(self.sessions, end)]
+
+
+_calendar = None
+
+
+def get_calendar():
+    """Returns the process-wide NYSE calendar (built on first use)."""
+    global _calendar
+    if _calendar is None:
+        _calendar = TradingCalendar()
+    return _calendar
@@ -1,119 +1,237 @@
 from src.clients.advantage import AlphaVantageClient
 from src.clients.new_data import NewsDataClient
-from src.clients.yahoo import get_current_day_metrics
+from src.clients.yahoo import get_current_day_metrics_bulk
+from src.clients import rate_limiter
 from src.agents import zero_shot_agent
 from src.utils.financial_analyst import format_stock_data, format_news_articles, format_executive_sales
 from src.utils.json_parser import parse_llm_output
+from src.workflows.sentiment import score_articles, SINGLE_PROMPT, BATCH_PROMPT
+from src.utils import tracing
 import datetime
-import pandas as pd
 from datetime import datetime
+from concurrent.futures import Future, ThreadPoolExecutor
 import logging
-from src.utils.models import AnalysisResult, SentimentResult
+from src.utils.models import AnalysisResult
 
+# Independent stages run side by side for one ticker: news, insider data and article sentiment.
+STAGES_PER_TICKER = 3
 
-def analyze_active_stocks(model = "groq/deepseek-r1-distill-llama-70b", temperature=0.1 ):
+# Distinct stories given to the analyst per ticker
+ARTICLES_PER_TICKER = 2
+
+ANALYST_PROMPT = "finance_analyst"
+
+# Every registry prompt a pipeline run loads
+PROMPTS = (SINGLE_PROMPT, BATCH_PROMPT, ANALYST_PROMPT)
+
+logger = logging.getLogger(__name__)
+
+
+class _InlineExecutor:
+    """Executor stand-in that runs each task immediately in the calling thread (serial mode)."""
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def map(self, fn, iterable):
+        return map(fn, iterable)
+
+
+def _analyze_ticker(ticker, model, temperature, current_date, articles, insider_future, metrics_future):
+    """
+    Asks the analyst agent for an action on one ticker, from its scored articles and the
+    already submitted insider and market data futures. Returns the result row or None on failure.
+    """
+    try:
+        formatted_articles = []
+        article_links_and_sentiments = []
+        for article_with_sentiment in articles:
+            formatted_articles.append(article_with_sentiment)
+
+            # Extract link and sentiment
+            link = article_with_sentiment.get('link')
+            sentiment = article_with_sentiment.get('sentiment')
+            article_links_and_sentiments.append({'link': link, 'sentiment': sentiment}) #add to list.
+
+        formatted_articles = format_news_articles(formatted_articles)
+        stock_data = metrics_future.result().get(ticker)
+
+        # Extract Close Value (Dynamically)
+        if stock_data is not None:
+            previous_close = stock_data.get('Close')  # Directly get Close
+
+            if previous_close is not None:
+                logger.info(f"Close Value for {ticker}: {previous_close}")
+            else:
+                logger.info(f"Close Value not found for {ticker}")
+        else:
+            previous_close = None
+        formatted_stock_info = format_stock_data(stock_data)
+
+        insider_transaction = insider_future.result()
+        formated_insider_transactions = format_executive_sales(insider_transaction)
+
+        user_vars = {
+            "ticker": ticker,
+            "stock_analysis": formatted_stock_info,
+            "recent_news": formatted_articles,
+            "insider_transactions": formated_insider_transactions,
+        }
+
+        # Get analysis
+        with tracing.span("analyst_llm", ticker):
+            response = zero_shot_agent.invoke_agent(user_variables=user_vars, prompt_name=ANALYST_PROMPT, model=model, temperature=temperature)
+        with tracing.span("parse", ticker):
+            content = response['messages'][1].content
+            json_response = parse_llm_output(content, AnalysisResult)
+
+        # Extract explanation and action
+        explanation = json_response["explanation"]
+        action = json_response["action"]
+
+        return {
+            'ticker': ticker,
+            'action': action,
+            'explanation': explanation,
+            'record_date': current_date,
+            'article_links_and_sentiments': str(article_links_and_sentiments),
+            "previous_close": previous_close
+        }
+
+    except Exception as e:
+        logger.error(f"Error processing {ticker}: {e}")
+        return None
+
+
+def _select_articles(articles, duplicate_index=None, limit=ARTICLES_PER_TICKER):
+    """
+    Picks up to `limit` articles per ticker. With a NearDuplicateIndex, every article is tagged
+    with its `cluster_id` and syndicated copies of a story already picked for the ticker are skipped.
+    """
+    if duplicate_index is None:
+        return {ticker: ticker_articles[:limit] for ticker, ticker_articles in articles.items()}
+
+    all_articles = [article for ticker_articles in articles.values() for article in ticker_articles]
+    clusters = iter(duplicate_index.assign(all_articles))
+    selected = {}
+    for ticker, ticker_articles in articles.items():
+        picked, seen = [], set()
+        for article in ticker_articles:
+            cluster_id = next(clusters)
+            if cluster_id in seen or len(picked) == limit:
+                continue
+            seen.add(cluster_id)
+            picked.append({**article, "cluster_id": cluster_id})
+        selected[ticker] = picked
+    return selected
+
+
+def _run_pipeline(tickers, model, temperature, current_date, sentiment_batch_size, ticker_pool, stage_pool, news_client, alpha_client, article_store=None, duplicate_index=None):
+    """
+    Runs the three pipeline phases for all tickers: data gathering, article sentiment and analysis.
+    Results are returned in ticker order, with None for tickers that failed.
+    """
+    # Gather data: market data for all tickers in one bulk download, news and insider
+    # transactions per ticker. None of these depend on each other.
+    metrics_future = stage_pool.submit(tracing.traced("market_data", get_current_day_metrics_bulk), tickers)
+    num_articles = None if duplicate_index is not None else ARTICLES_PER_TICKER
+    news_futures = {
+        ticker: stage_pool.submit(tracing.traced("news", news_client.get_ticker_news_summaries, ticker), ticker, num_articles=num_articles)
+        for ticker in tickers
+    }
+    insider_futures = {
+        ticker: stage_pool.submit(tracing.traced("insider", alpha_client.get_insider_transactions, ticker), ticker)
+        for ticker in tickers
+    }
+
+    articles = {}
+    for ticker in tickers:
+        logger.info(f"Processing ticker: {ticker}")
+        try:
+            articles[ticker] = news_futures[ticker].result()
+        except Exception as e:
+            logger.error(f"Error processing {ticker}: {e}")
+    with tracing.span("select_articles"):
+        articles = _select_articles(articles, duplicate_index)
+
+    # Article sentiment, batched across tickers when sentiment_batch_size > 1
+    items = [(ticker, article) for ticker, ticker_articles in articles.items() for article in ticker_articles]
+    with tracing.span("sentiment"):
+        sentiments = iter(score_articles(items, model, temperature, batch_size=sentiment_batch_size, executor=stage_pool, store=article_store))
+    scored_articles = {}
+    for ticker, ticker_articles in articles.items():
+        scored = [(article, next(sentiments)) for article in ticker_articles]
+        if any(sentiment is None for _, sentiment in scored):
+            logger.error(f"Error processing {ticker}: sentiment analysis failed")
+            continue
+        scored_articles[ticker] = [{**article, **sentiment} for article, sentiment in scored]
+
+    # Analyst call per ticker
+    return list(ticker_pool.map(
+        lambda ticker: _analyze_ticker(
+            ticker, model, temperature, current_date, scored_articles[ticker], insider_futures[ticker], metrics_future
+        ) if ticker in scored_articles else None,
+        tickers
+    ))
+
+
+def analyze_active_stocks(model = "groq/deepseek-r1-distill-llama-70b", temperature=0.1, max_workers=1, sentiment_batch_size=1, article_store=None, duplicate_index=None):
     """
     Automates the analysis of most active stocks and stores results in a DataFrame.
     Returns a DataFrame with tickers and their analysis results.
+
+    Args:
+        model (str): LiteLLM model name used for the sentiment and analyst agents.
+        temperature (float): Sampling temperature for the agents.
+        max_workers (int): Number of tickers analyzed concurrently. With more than one worker,
+                           the independent stages of each ticker also run in parallel.
+                           1 (default) processes tickers serially. Row order is the same either way.
+        sentiment_batch_size (int): Articles scored per sentiment LLM request, across tickers.
+                                    1 (default) scores each article with its own request.
+        article_store (ArticleStore): Optional store of articles and their sentiment. Articles already
+                                      scored for a ticker with the current prompt skip the LLM.
+        duplicate_index (NearDuplicateIndex): Optional near-duplicate detector. Syndicated copies of a story
+                                              count once toward the articles per ticker and share one sentiment.
     """
+    import pandas as pd
+
     # Initialize logging
     logging.basicConfig(level=logging.INFO)
-    logger = logging.getLogger(__name__)
+
+    # Clients are shared by all tickers so their pooled sessions and caches are reused
+    alpha_client = AlphaVantageClient()
+    news_client = NewsDataClient()
 
     # Get active tickers
-    tickers = AlphaVantageClient().get_most_active_tickers()  # Assuming this function is defined elsewhere
+    with tracing.span("most_active"):
+        tickers = alpha_client.get_most_active_tickers()
     #tickers =["NVDA"]
     current_date = datetime.today().date()
     if not tickers:
         logger.error("Failed to retrieve tickers")
         return pd.DataFrame()
 
-    # Initialize results storage
-    results = []
-
     # Process each ticker
-    for ticker in tickers:
-        try:
-            logger.info(f"Processing ticker: {ticker}")
-            # Gather data (your existing data collection code)
-            articles = NewsDataClient().get_ticker_news_summaries(ticker, num_articles=2)
-            # Use zero_shot_agent for article sentiment analysis
-            formatted_articles = []
-            article_links_and_sentiments = [] 
-            for article in articles:
-                user_vars_sentiment = {
-                    "summary": article.get("description"),
-                    "title": article.get("title")
-                }
-                sys_vars_sentiment = {
-                    "ticker": ticker,
-                }
-                sentiment_response = zero_shot_agent.invoke_agent(
-                    user_variables=user_vars_sentiment,
-                    system_variables=sys_vars_sentiment,
-                    prompt_name="article_sentiment",
-                    model=model,
-                    temperature=temperature
-                )
-                content = sentiment_response['messages'][1].content
-                json_response = parse_llm_output(content, SentimentResult)
-                article_with_sentiment = {**article, **json_response}
-                formatted_articles.append(article_with_sentiment)
-
-                # Extract link and sentiment
-                link = article_with_sentiment.get('link')
-                sentiment = article_with_sentiment.get('sentiment')
-                article_links_and_sentiments.append({'link': link, 'sentiment': sentiment}) #add to list.
-                
-            formatted_articles = format_news_articles(formatted_articles)
-            stock_data = get_current_day_metrics(ticker)
-
-            # Extract Close Value (Dynamically)
-            if stock_data is not None:
-                previous_close = stock_data.get('Close')  # Directly get Close
-
-                if previous_close is not None:
-                    logger.info(f"Close Value for {ticker}: {previous_close}")
-                else:
-                    logger.info(f"Close Value not found for {ticker}")
-            else:
-                previous_close = None
-            formatted_stock_info = format_stock_data(stock_data)
-
-            insider_transaction = AlphaVantageClient().get_insider_transactions(ticker)
-            formated_insider_transactions = format_executive_sales(insider_transaction)
-
-            user_vars = {
-                "ticker": ticker,
-                "stock_analysis": formatted_stock_info,
-                "recent_news": formatted_articles,
-                "insider_transactions": formated_insider_transactions,
-            }
-
-            # Get analysis
-            response = zero_shot_agent.invoke_agent(user_variables=user_vars, prompt_name="finance_analyst", model=model, temperature=temperature)
-            content = response['messages'][1].content 
-            json_response = parse_llm_output(content, AnalysisResult)
-
-            # Extract explanation and action
-            explanation = json_response["explanation"]
-            action = json_response["action"]
-                        
-            # Store results
-            results.append({
-                'ticker': ticker,
-                'action': action,
-                'explanation': explanation,
-                'record_date': current_date,
-                'article_links_and_sentiments': str(article_links_and_sentiments),
-                "previous_close": previous_close
-            })
-
-        except Exception as e:
-            logger.error(f"Error processing {ticker}: {e}")
-            continue
+    if max_workers > 1:
+        # Separate pools so that ticker tasks waiting on their stages can never starve the stages
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ticker") as ticker_pool, \
+             ThreadPoolExecutor(max_workers=max_workers * STAGES_PER_TICKER, thread_name_prefix="stage") as stage_pool:
+            results = _run_pipeline(tickers, model, temperature, current_date, sentiment_batch_size, ticker_pool, stage_pool, news_client, alpha_client, article_store, duplicate_index)
+    else:
+        executor = _InlineExecutor()
+        results = _run_pipeline(tickers, model, temperature, current_date, sentiment_batch_size, executor, executor, news_client, alpha_client, article_store, duplicate_index)
 
     # Convert results to DataFrame
-    results_df = pd.DataFrame(results)
+    results_df = pd.DataFrame([result for result in results if result is not None])
+    logger.info(f"Data client request stats: {rate_limiter.all_stats()}")
+    if alpha_client.cache is not None:
+        logger.info(f"HTTP response cache stats: {alpha_client.cache.stats()}")
+    if zero_shot_agent.runtime.llm_cache is not None:
+        logger.info(f"LLM response cache stats: {zero_shot_agent.runtime.llm_cache.stats()}")
 
     return results_df
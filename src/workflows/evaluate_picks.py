@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+from src.clients.yahoo import download_daily_bars
+from src.clients.benchmark_store import BenchmarkStore
+from src.utils.trading_calendar import get_calendar
+
+# Result columns written back to the data table
+EVALUATION_COLUMNS = ['current_close', 'percent_change', 's&p500_percent_change', 'evaluation']
+
+
+def fetch_closes(tickers, start, end, benchmark_store=None):
+    """
+    Fetches daily closes for all tickers in one request; S&P 500 closes come from the local benchmark store.
+
+    The S&P 500 range starts at the session before `start` so its close is available.
+
+    Returns:
+        tuple: (closes, sp500_closes). `closes` is a date x ticker DataFrame and
+               `sp500_closes` a Series indexed by date.
+    """
+    benchmark_store = benchmark_store or BenchmarkStore()
+    start = pd.to_datetime(start)
+    end = pd.to_datetime(end)
+    bars = download_daily_bars(
+        list(tickers),
+        start=start.strftime('%Y-%m-%d'),
+        end=(end + pd.Timedelta(days=1)).strftime('%Y-%m-%d')
+    )
+    closes = bars['Close']
+    closes.index = pd.to_datetime(closes.index).tz_localize(None).normalize()
+
+    benchmark_store.ensure(get_calendar().previous_session(start), end)
+    return closes, benchmark_store.closes
+
+
+def compute_evaluations(pending, closes, sp500_closes):
+    """
+    Computes current_close, percent_change, S&P 500 change and WIN/LOSS for pending rows, column-wise.
+
+    A BUY wins when it beats the S&P 500 on the pick date, a HOLD wins when it trails it.
+
+    Args:
+        pending (pandas.DataFrame): Rows with ticker, record_date, previous_close and action.
+        closes (pandas.DataFrame): Daily closes, date x ticker.
+        sp500_closes (pandas.Series): Daily S&P 500 closes indexed by date.
+
+    Returns:
+        pandas.DataFrame: EVALUATION_COLUMNS for the rows that could be evaluated, indexed like `pending`.
+                          Rows missing a close, a previous close or S&P 500 data are left out.
+    """
+    dates = pd.to_datetime(pending['record_date']).dt.normalize()
+    previous_close = pd.to_numeric(pending['previous_close'], errors='coerce').to_numpy(dtype=float)
+
+    # Look up each (date, ticker) close in one reindex
+    close_lookup = closes.stack()
+    current_close = close_lookup.reindex(pd.MultiIndex.from_arrays([dates, pending['ticker']])).to_numpy(dtype=float)
+
+    # S&P 500 change versus the previous trading session; each distinct date is resolved once
+    calendar = get_calendar()
+    previous_session = {date: pd.Timestamp(calendar.previous_session(date)) for date in dates.unique()}
+    sp500_current = sp500_closes.reindex(dates).to_numpy(dtype=float)
+    sp500_previous = sp500_closes.reindex(dates.map(previous_session)).to_numpy(dtype=float)
+    sp500 = (sp500_current - sp500_previous) / sp500_previous * 100
+
+    percent_change = (current_close - previous_close) / previous_close * 100
+    action = pending['action'].to_numpy()
+    evaluation = np.select(
+        [action == 'BUY', action == 'HOLD'],
+        [np.where(percent_change > sp500, 'WIN', 'LOSS'), np.where(percent_change < sp500, 'WIN', 'LOSS')],
+        default=None
+    )
+
+    ready = ~(np.isnan(current_close) | np.isnan(percent_change) | np.isnan(sp500))
+    results = pd.DataFrame({
+        'current_close': np.round(current_close, 2),
+        'percent_change': np.round(percent_change, 2),
+        's&p500_percent_change': np.round(sp500, 2),
+        'evaluation': evaluation,
+    }, index=pending.index)
+    return results[ready]
@@ -0,0 +1,136 @@
+import logging
+from src.agents import zero_shot_agent
+from src.utils.json_parser import parse_llm_output
+from src.utils.models import SentimentResult, BatchSentimentResult
+from src.clients.article_store import cluster_key
+from src.utils import tracing
+
+logger = logging.getLogger(__name__)
+
+SINGLE_PROMPT = "article_sentiment"
+BATCH_PROMPT = "article_sentiment_batch"
+
+
+def score_article(article, ticker, model, temperature):
+    """Runs the sentiment agent on a single article. Returns the SentimentResult as a dict."""
+    user_vars_sentiment = {
+        "summary": article.get("description"),
+        "title": article.get("title")
+    }
+    sys_vars_sentiment = {
+        "ticker": ticker,
+    }
+    sentiment_response = zero_shot_agent.invoke_agent(
+        user_variables=user_vars_sentiment,
+        system_variables=sys_vars_sentiment,
+        prompt_name=SINGLE_PROMPT,
+        model=model,
+        temperature=temperature
+    )
+    content = sentiment_response['messages'][1].content
+    return parse_llm_output(content, SentimentResult)
+
+
+def format_article_batch(items):
+    """Numbers (ticker, article) pairs into the text block sent with the batch prompt."""
+    return "\n".join(
+        f"Article {index}\nTicker: {ticker}\nTitle: {article.get('title')}\nSummary: {article.get('description')}\n"
+        for index, (ticker, article) in enumerate(items, start=1)
+    )
+
+
+def score_article_batch(items, model, temperature):
+    """
+    Scores several (ticker, article) pairs in one LLM request.
+    Returns SentimentResult dicts in input order; raises ValueError if the response does not cover every article.
+    """
+    response = zero_shot_agent.invoke_agent(
+        user_variables={"articles": format_article_batch(items)},
+        prompt_name=BATCH_PROMPT,
+        model=model,
+        temperature=temperature
+    )
+    content = response['messages'][1].content
+    results = {item['index']: item for item in parse_llm_output(content, BatchSentimentResult)['results']}
+    if set(results) != set(range(1, len(items) + 1)):
+        raise ValueError(f"Batch response covers articles {sorted(results)}, expected 1-{len(items)}")
+    return [SentimentResult(**results[index]).model_dump() for index in range(1, len(items) + 1)]
+
+
+def _score_batch_or_fallback(items, model, temperature):
+    """Returns a (SentimentResult dict or None, prompt name) pair per item."""
+    if len(items) > 1:
+        try:
+            return [(result, BATCH_PROMPT) for result in score_article_batch(items, model, temperature)]
+        except Exception as e:
+            logger.warning(f"Batch sentiment failed for {len(items)} articles, scoring one by one: {e}")
+
+    results = []
+    for ticker, article in items:
+        try:
+            results.append((score_article(article, ticker, model, temperature), SINGLE_PROMPT))
+        except Exception as e:
+            logger.error(f"Sentiment analysis failed for {ticker} article {article.get('link')}: {e}")
+            results.append((None, SINGLE_PROMPT))
+    return results
+
+
+def prompt_versions(model, temperature):
+    """Current versions of the single and batch sentiment prompts, by prompt name."""
+    return {
+        name: zero_shot_agent.runtime.get_agent(name, model, temperature).prompt_version
+        for name in (SINGLE_PROMPT, BATCH_PROMPT)
+    }
+
+
+def score_articles(items, model, temperature, batch_size=1, executor=None, store=None):
+    """
+    Scores (ticker, article) pairs, for one or many tickers.
+
+    With batch_size > 1, up to batch_size articles share one structured LLM request; a batch
+    whose response cannot be parsed falls back to per-article calls. Batches are submitted
+    to `executor` when given.
+
+    Pairs with the same article (or near-duplicate cluster) and ticker are scored once. With an
+    ArticleStore, pairs already scored with the current prompt versions are served from it and
+    only the rest go to the LLM; new results are saved back to the store.
+
+    Returns:
+        list: SentimentResult dicts in input order, None for articles that could not be scored.
+    """
+    results = [None] * len(items)
+    pending = list(range(len(items)))
+    if store is not None:
+        versions = prompt_versions(model, temperature)
+        results = store.lookup(items, list(versions.values()))
+        pending = [index for index, result in enumerate(results) if result is None]
+        tracing.add("cache_hits", len(items) - len(pending))
+        logger.info(f"Sentiment store: {len(items) - len(pending)} of {len(items)} articles already scored")
+
+    # One LLM score per (cluster, ticker); the other members of the group share it
+    groups = {}
+    for index in pending:
+        ticker, article = items[index]
+        groups.setdefault((cluster_key(article), ticker), []).append(index)
+    to_score = [items[indices[0]] for indices in groups.values()]
+    batch_size = max(1, batch_size)
+    batches = [to_score[start:start + batch_size] for start in range(0, len(to_score), batch_size)]
+    score_batch = tracing.traced("sentiment_batch", _score_batch_or_fallback)
+    if executor is None:
+        scored = [score_batch(batch, model, temperature) for batch in batches]
+    else:
+        futures = [executor.submit(score_batch, batch, model, temperature) for batch in batches]
+        scored = [future.result() for future in futures]
+    scored = [pair for batch in scored for pair in batch]
+
+    # Group members are not necessarily adjacent in `pending`, so the pairs to save are built in group order
+    save_items, save_results = [], []
+    for indices, (result, name) in zip(groups.values(), scored):
+        for index in indices:
+            results[index] = result
+            if store is not None:
+                save_items.append(items[index])
+                save_results.append((result, versions[name]))
+    if store is not None and scored:
+        store.save(save_items, save_results, model=model)
+    return results
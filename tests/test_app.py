@@ -0,0 +1,12 @@
+import sys
+import subprocess
+from benchmarks.import_time import ROOT
+
+
+def test_importing_the_tabs_opens_no_database():
+    script = (
+        "import sys\n"
+        "from app import current_picks, current_passes, evaluation, performance\n"
+        "assert 'sqlalchemy' not in sys.modules, 'a tab created a database client at import time'\n"
+    )
+    subprocess.run([sys.executable, "-c", script], cwd=ROOT, check=True)
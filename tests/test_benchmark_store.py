@@ -0,0 +1,54 @@
+import pandas as pd
+from src.clients import benchmark_store
+from src.clients.sqllite import SQLiteClient
+from src.clients.benchmark_store import BenchmarkStore, SP500_TICKER
+
+THURSDAY, FRIDAY, MONDAY = pd.Timestamp("2026-10-15"), pd.Timestamp("2026-10-16"), pd.Timestamp("2026-10-19")
+
+
+class StubBars:
+    """Stands in for download_daily_bars: a fixed close per date, recording each requested range."""
+
+    def __init__(self, prices):
+        self.prices = prices
+        self.requests = []
+
+    def __call__(self, tickers, start, end):
+        self.requests.append((start, end))
+        dates = [date for date in sorted(self.prices) if pd.Timestamp(start) <= date < pd.Timestamp(end)]
+        return pd.DataFrame({("Close", SP500_TICKER): [self.prices[date] for date in dates]}, index=pd.DatetimeIndex(dates))
+
+
+def test_todays_intraday_bar_is_refreshed_and_stored_once_the_session_closes(tmp_path, monkeypatch):
+    bars = StubBars({THURSDAY: 100.0, FRIDAY: 101.0})
+    monkeypatch.setattr(benchmark_store, "download_daily_bars", bars)
+    monkeypatch.setattr(benchmark_store, "_today", lambda: FRIDAY)
+    client = SQLiteClient(str(tmp_path / "main.db"))
+    store = BenchmarkStore(client, backfill_start=THURSDAY, intraday_ttl=0)
+
+    store.ensure(THURSDAY)
+    assert store.close_on(FRIDAY) == 101.0
+    # Later in the session: the intraday price has moved
+    bars.prices[FRIDAY] = 102.0
+    store.ensure(THURSDAY)
+    assert store.close_on(FRIDAY) == 102.0
+    assert bars.requests[-1][0] == "2026-10-16"
+
+    # Next session: Friday's final close replaces the intraday price, in memory and in the table
+    bars.prices[FRIDAY] = 103.0
+    bars.prices[MONDAY] = 104.0
+    monkeypatch.setattr(benchmark_store, "_today", lambda: MONDAY)
+    store.ensure(THURSDAY)
+    assert store.close_on(FRIDAY) == 103.0 and store.close_on(MONDAY) == 104.0
+    stored = client.query("SELECT date, close FROM benchmark_prices ORDER BY date")
+    assert stored.values.tolist() == [["2026-10-15", 100.0], ["2026-10-16", 103.0]]
+
+
+def test_fresh_intraday_bar_is_not_downloaded_again(tmp_path, monkeypatch):
+    bars = StubBars({THURSDAY: 100.0, FRIDAY: 101.0})
+    monkeypatch.setattr(benchmark_store, "download_daily_bars", bars)
+    monkeypatch.setattr(benchmark_store, "_today", lambda: FRIDAY)
+    store = BenchmarkStore(SQLiteClient(str(tmp_path / "main.db")), backfill_start=THURSDAY, intraday_ttl=60)
+    store.ensure(THURSDAY)
+    store.ensure(THURSDAY)
+    assert len(bars.requests) == 1
@@ -0,0 +1,29 @@
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from src.utils.cassette import Cassette, set_cassette
+from src.llm.llm_cache import LLMCache
+from src.clients.http_cache import get_response_cache
+
+
+@pytest.fixture
+def no_cassette(monkeypatch):
+    monkeypatch.delenv("HTTP_CACHE_DISABLED", raising=False)
+    previous = set_cassette(None)
+    yield
+    set_cassette(previous)
+
+
+def test_replay_is_served_by_the_cassette_not_the_local_caches(tmp_path, no_cassette):
+    cache = LLMCache(path=str(tmp_path / "llm_cache.db"), bypass=False)
+    messages = [HumanMessage(content="Rate this article")]
+    # A warm local cache holding another answer for the same prompt
+    cache.invoke(lambda _: AIMessage(content="cached"), messages, "model", 0.1)
+
+    recording = Cassette(str(tmp_path / "cassette.pkl.gz"), mode="record")
+    set_cassette(recording)
+    assert cache.invoke(lambda _: AIMessage(content="recorded"), messages, "model", 0.1).content == "recorded"
+    recording.save()
+
+    set_cassette(Cassette(str(tmp_path / "cassette.pkl.gz"), mode="replay"))
+    assert cache.invoke(lambda _: pytest.fail("replay reached the provider"), messages, "model", 0.1).content == "recorded"
+    assert get_response_cache() is None
@@ -0,0 +1,21 @@
+import os
+import sys
+import subprocess
+import pytest
+from benchmarks.import_time import ENTRY_POINTS, ROOT, measure
+
+
+@pytest.mark.parametrize("module", ENTRY_POINTS)
+def test_entry_point_imports_no_heavy_dependency(module):
+    # The millisecond budget is left to benchmarks/import_time.py: wall-clock time is too noisy for CI
+    result = measure(module, runs=1, help_timing=False)
+    assert result["heavy"] == [], f"{module} imports {result['heavy']} before the market check"
+
+
+def test_importing_the_agents_does_not_open_the_llm_cache(tmp_path):
+    path = tmp_path / "llm_cache.db"
+    subprocess.run(
+        [sys.executable, "-c", "import src.agents.zero_shot_agent, src.workflows.sentiment"],
+        cwd=ROOT, env={**os.environ, "LLM_CACHE_PATH": str(path)}, check=True,
+    )
+    assert not path.exists()
@@ -0,0 +1,20 @@
+import sqlite3
+from src.clients.sqllite import SQLiteClient
+from src.clients.latest_run import LatestRun
+
+
+def test_latest_run_serves_edits_to_existing_rows(tmp_path):
+    database = str(tmp_path / "main.db")
+    latest_run = LatestRun(SQLiteClient(database, cache_queries=True))
+    with sqlite3.connect(database) as connection:
+        connection.execute(
+            "INSERT INTO data (ticker, action, explanation, record_date, previous_close) VALUES (?, ?, ?, ?, ?)",
+            ("AAPL", "BUY", "first take", "2026-10-16", 100.0),
+        )
+    assert latest_run.get("AAPL")["explanation"] == "first take"
+
+    # Neither the row count nor the last id changes
+    with sqlite3.connect(database) as connection:
+        connection.execute("UPDATE data SET action = 'HOLD', explanation = 'second take' WHERE ticker = 'AAPL'")
+    assert latest_run.get("AAPL")["explanation"] == "second take"
+    assert latest_run.tickers("BUY") == [] and latest_run.tickers("HOLD") == ["AAPL"]
@@ -0,0 +1,43 @@
+import random
+import sqlite3
+from datetime import date, timedelta
+from src.clients.sqllite import SQLiteClient
+from src.clients.migrations import migrate
+from src.clients.daily_performance import refresh_daily_performance
+
+DAILY_PERFORMANCE = "SELECT * FROM daily_performance ORDER BY record_date"
+DAILY_EVALUATIONS = "SELECT * FROM daily_evaluations ORDER BY record_date, action, evaluation"
+
+
+def _picks(connection, days=60, per_day=7):
+    rng = random.Random(0)
+    rows = []
+    for day in range(days):
+        record_date = (date(2026, 1, 1) + timedelta(days=day)).isoformat()
+        sp500 = rng.uniform(-2, 2) if day % 9 else None
+        for _ in range(per_day):
+            action = rng.choice(("BUY", "HOLD"))
+            percent_change = rng.uniform(-5, 5) if rng.random() > 0.1 else None
+            evaluation = rng.choice(("WIN", "LOSS")) if percent_change is not None and day < days - 3 else None
+            rows.append((f"T{rng.randrange(500)}", action, record_date, percent_change, sp500, evaluation))
+    connection.executemany(
+        'INSERT INTO data (ticker, action, record_date, percent_change, "s&p500_percent_change", evaluation) '
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        rows,
+    )
+
+
+def test_daily_performance_backfill_matches_a_refresh(tmp_path):
+    database = str(tmp_path / "main.db")
+    client = SQLiteClient(database)
+    assert migrate(client, target=7) == 7
+    with sqlite3.connect(database) as connection:
+        _picks(connection)
+    assert migrate(client) == 8
+
+    with sqlite3.connect(database) as connection:
+        backfilled = connection.execute(DAILY_PERFORMANCE).fetchall(), connection.execute(DAILY_EVALUATIONS).fetchall()
+        refresh_daily_performance(connection)
+        refreshed = connection.execute(DAILY_PERFORMANCE).fetchall(), connection.execute(DAILY_EVALUATIONS).fetchall()
+    assert len(backfilled[0]) == 60
+    assert backfilled == refreshed
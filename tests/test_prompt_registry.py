@@ -0,0 +1,18 @@
+import json
+import pytest
+from src.llm.prompt_registry import PromptRegistry
+from src.workflows.analze_active_stocks import PROMPTS
+
+
+def test_every_prompt_the_pipeline_loads_is_pinned():
+    registry = PromptRegistry(hub_fallback=False)
+    for name in PROMPTS:
+        prompt = registry.get(name)
+        assert prompt.version == registry.pins()[name]
+
+
+def test_missing_pin_raises_without_hub_fallback(tmp_path):
+    (tmp_path / "pins.json").write_text(json.dumps({}))
+    registry = PromptRegistry(path=str(tmp_path), hub_fallback=False)
+    with pytest.raises(KeyError):
+        registry.get("finance_analyst")
@@ -0,0 +1,80 @@
+import threading
+import time
+import pytest
+from src.clients.quote_service import QuoteService
+
+
+class FakeFetcher:
+    """Stands in for get_latest_prices: a price per ticker, recording each bulk request."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.requests = []
+        self._lock = threading.Lock()
+
+    def __call__(self, tickers):
+        with self._lock:
+            self.requests.append(sorted(tickers))
+        time.sleep(self.delay)
+        return {ticker: float(len(ticker)) for ticker in tickers}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def service(monkeypatch):
+    # Refresh passes are run by the test instead of the background thread
+    monkeypatch.setattr(QuoteService, "_start_refresher", lambda self: None)
+    fetcher, clock = FakeFetcher(), Clock()
+    return QuoteService(ttl=60, idle=600, fetch=fetcher, clock=clock), fetcher, clock
+
+
+def test_watch_replaces_the_tickers_of_its_group(service):
+    quotes, fetcher, clock = service
+    quotes.watch(["AAA", "BBB"], group="BUY")
+    quotes.watch(["CCC"], group="HOLD")
+    quotes.refresh()
+    assert fetcher.requests == [["AAA", "BBB", "CCC"]]
+
+    # A new run lists other tickers: the old ones leave the refresh, with their quotes
+    quotes.watch(["DDD"], group="BUY")
+    clock.now += 40
+    quotes.refresh()
+    assert fetcher.requests[-1] == ["CCC", "DDD"]
+    assert quotes.cached("AAA") is None and quotes.cached("CCC") == 3.0
+
+
+def test_tickers_only_requested_are_dropped_once_idle(service):
+    quotes, fetcher, clock = service
+    quotes.watch(["AAA"], group="BUY")
+    assert quotes.get("ZZZZ") == 4.0
+    clock.now += 40
+    quotes.refresh()
+    assert fetcher.requests[-1] == ["AAA", "ZZZZ"]
+
+    clock.now += 601
+    quotes.watch(["AAA"], group="BUY")  # The tab is viewed again; ZZZZ is not
+    quotes.refresh()
+    assert fetcher.requests[-1] == ["AAA"]
+    assert quotes.cached("ZZZZ") is None
+
+
+def test_concurrent_requests_for_a_missing_quote_share_one_fetch(monkeypatch):
+    monkeypatch.setattr(QuoteService, "_start_refresher", lambda self: None)
+    fetcher = FakeFetcher(delay=0.2)
+    quotes = QuoteService(ttl=60, idle=600, fetch=fetcher)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(quotes.get("AAA"))) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [3.0] * 20
+    assert fetcher.requests == [["AAA"]]
+    assert quotes.stats["fetches"] == 1
@@ -0,0 +1,111 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+import requests
+from src.clients.rate_limiter import RateLimiter, RateLimitExceeded, _alphavantage_exhausted, _alphavantage_throttled
+
+DAILY_QUOTA = {"Information": "Thank you for using Alpha Vantage! Our standard API rate limit is 25 requests per day."}
+PER_MINUTE = {"Note": "Thank you for using Alpha Vantage! Our standard API call frequency is 5 calls per minute."}
+
+
+class FakeServer:
+    """Local HTTP server answering each request with the next scripted (status, headers, body), then 200s."""
+
+    def __init__(self):
+        self.script = []
+        self.requests = 0
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                fake.requests += 1
+                status, headers, body = fake.script.pop(0) if fake.script else (200, {}, {"ok": True})
+                payload = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/query"
+        threading.Thread(target=self.httpd.serve_forever, args=(0.05,), daemon=True).start()
+
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.delenv("CASSETTE_MODE", raising=False)
+    fake = FakeServer()
+    yield fake
+    fake.httpd.shutdown()
+    fake.httpd.server_close()
+
+
+def limiter(sleeps, **kwargs):
+    settings = {"requests_per_minute": 6000, "burst": 10, "max_retries": 2, "backoff_base": 0.5, **kwargs}
+    return RateLimiter("fake", sleep=sleeps.append, **settings)
+
+
+def test_token_bucket_makes_callers_wait(server):
+    sleeps = []
+    fake = limiter(sleeps, requests_per_minute=60, burst=1)
+    for _ in range(3):
+        assert fake.request("GET", server.url, key="k").status_code == 200
+    assert len(sleeps) == 2 and all(0.9 < wait <= 2.0 for wait in sleeps)
+    assert fake.stats()["throttled_waits"] == 2
+    # Each API key has its own bucket
+    fake.request("GET", server.url, key="other")
+    assert len(sleeps) == 2
+
+
+def test_retry_after_is_honored(server):
+    sleeps = []
+    server.script = [(429, {"Retry-After": "7"}, {}), (503, {"Retry-After": "2"}, {})]
+    response = limiter(sleeps, backoff_max=60).request("GET", server.url)
+    assert response.status_code == 200
+    assert sleeps == [7.0, 2.0]
+    assert server.requests == 3
+
+
+def test_rate_limit_exceeded_after_retries(server):
+    sleeps = []
+    server.script = [(429, {}, {})] * 3
+    fake = limiter(sleeps)
+    with pytest.raises(RateLimitExceeded):
+        fake.request("GET", server.url)
+    assert server.requests == 3
+    assert fake.stats() == {"requests": 3, "retries": 2, "throttled_waits": 0, "failures": 1}
+
+
+def test_stats_count_requests_retries_and_failures(server):
+    sleeps = []
+    server.script = [(500, {}, {}), (200, {}, {})]
+    fake = limiter(sleeps, max_retries=1)
+    fake.request("GET", server.url)
+    with pytest.raises(requests.exceptions.ConnectionError):
+        fake.request("GET", "http://127.0.0.1:9/unreachable")
+    assert fake.stats() == {"requests": 4, "retries": 2, "throttled_waits": 0, "failures": 1}
+
+
+def test_per_minute_throttling_is_retried(server):
+    sleeps = []
+    server.script = [(200, {}, PER_MINUTE)]
+    fake = limiter(sleeps, is_throttled=_alphavantage_throttled, is_exhausted=_alphavantage_exhausted)
+    assert fake.request("GET", server.url).json() == {"ok": True}
+    assert fake.stats()["retries"] == 1
+
+
+def test_daily_quota_is_not_retried(server):
+    sleeps = []
+    server.script = [(200, {}, DAILY_QUOTA)]
+    fake = limiter(sleeps, is_throttled=_alphavantage_throttled, is_exhausted=_alphavantage_exhausted)
+    with pytest.raises(RateLimitExceeded):
+        fake.request("GET", server.url)
+    assert server.requests == 1 and sleeps == []
+    assert fake.stats()["failures"] == 1
@@ -0,0 +1,35 @@
+from src.workflows import sentiment
+
+
+class RecordingStore:
+    """Stands in for ArticleStore: nothing stored yet, saves recorded."""
+
+    def __init__(self):
+        self.saved = []
+
+    def lookup(self, items, prompt_versions):
+        return [None] * len(items)
+
+    def save(self, items, results, model=None):
+        self.saved.extend(zip(items, results))
+
+
+def test_score_articles_saves_each_duplicate_with_its_own_score(monkeypatch):
+    monkeypatch.setattr(sentiment, "prompt_versions", lambda model, temperature: {
+        sentiment.SINGLE_PROMPT: "single@1", sentiment.BATCH_PROMPT: "batch@1"})
+    monkeypatch.setattr(sentiment, "_score_batch_or_fallback", lambda items, model, temperature: [
+        ({"sentiment": article["title"], "explanation": ""}, sentiment.SINGLE_PROMPT) for _, article in items])
+
+    a = {"article_id": "a", "title": "A", "cluster_id": "story-a"}
+    b = {"article_id": "b", "title": "B"}
+    a_copy = {"article_id": "a2", "title": "A (syndicated)", "cluster_id": "story-a"}
+    c = {"article_id": "c", "title": "C"}
+    # The syndicated copy of A is not next to A
+    items = [("AAPL", a), ("AAPL", b), ("AAPL", a_copy), ("AAPL", c)]
+    store = RecordingStore()
+
+    results = sentiment.score_articles(items, "model", 0.1, store=store)
+
+    assert [result["sentiment"] for result in results] == ["A", "B", "A", "C"]
+    assert {article["article_id"]: (result["sentiment"], version) for (_, article), (result, version) in store.saved} == {
+        "a": ("A", "single@1"), "a2": ("A", "single@1"), "b": ("B", "single@1"), "c": ("C", "single@1")}